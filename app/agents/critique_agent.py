@@ -3,9 +3,10 @@ load_dotenv()
 
 from typing import List, Dict, Any
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from app.agents.registry import get_llm, get_structured_llm
+
 
 # ==========================================
 # OUTPUT SCHEMA
@@ -21,11 +22,7 @@ class CritiqueResult(BaseModel):
 # ==========================================
 class CritiqueAgent:
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0,
-            convert_system_message_to_human=True,
-        )
+        self.llm = get_llm(temperature=0)
 
     # --------------------------------------
     # INTERNAL HELPERS
@@ -52,22 +49,11 @@ class CritiqueAgent:
             ),
         }
 
-    # --------------------------------------
-    # MAIN METHOD
-    # --------------------------------------
-    def generate_feedback(
-        self,
-        cv_data,
-        job_data,
-        missing_keywords: List[str],
-    ) -> List[str]:
-
+    def _messages(self, cv_data, job_data, missing_keywords: List[str]):
         # 🔥 FIX: normalize inputs
         cv_dict = self._to_dict(cv_data)
         job_dict = self._to_dict(job_data)
 
-        structured_llm = self.llm.with_structured_output(CritiqueResult)
-
         payload = self._prepare_payload(
             cv_dict,
             job_dict,
@@ -91,11 +77,40 @@ class CritiqueAgent:
         - Keep suggestions concise.
         """
 
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"DATA:\n{payload}"),
+        ]
+
+    # --------------------------------------
+    # MAIN METHOD
+    # --------------------------------------
+    def generate_feedback(
+        self,
+        cv_data,
+        job_data,
+        missing_keywords: List[str],
+    ) -> List[str]:
+
+        structured_llm = get_structured_llm(CritiqueResult)
+
         result = structured_llm.invoke(
-            [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"DATA:\n{payload}"),
-            ]
+            self._messages(cv_data, job_data, missing_keywords)
+        )
+
+        return result.feedback
+
+    async def agenerate_feedback(
+        self,
+        cv_data,
+        job_data,
+        missing_keywords: List[str],
+    ) -> List[str]:
+
+        structured_llm = get_structured_llm(CritiqueResult)
+
+        result = await structured_llm.ainvoke(
+            self._messages(cv_data, job_data, missing_keywords)
         )
 
         return result.feedback
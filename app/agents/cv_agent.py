@@ -2,19 +2,58 @@
 # STANDARD LIBRARIES
 # ==========================================
 import os
+import json
+import asyncio
+import hashlib
+from typing import List, Optional
 
 # ==========================================
 # THIRD-PARTY LIBRARIES
 # ==========================================
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_community.document_loaders import PyPDFLoader
-import requests
+from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
+
 # ==========================================
 # LOCAL IMPORTS
 # ==========================================
 from app.schemas.cv_schema import CVStructured
+from app.agents.registry import get_llm, get_structured_llm
+from app.utils.cache import content_hash, get_cache
+from app.utils import blobs, db, http
+from app.tools.pdf_parser import PdfSource, extract_pdf
+
+
+SYSTEM_PROMPT = """
+        You are an expert Resume Parser.
+        Extract structured data from the CV text provided.
+
+        Instructions:
+        - Contact: email, phone, LinkedIn, GitHub.
+        - Experience: title, company, duration, description.
+        - Skills: list all technical and soft skills.
+        - Education: degree, university, year.
+        - Projects: title and short description.
+
+        Important:
+        Return ONLY valid JSON matching the schema.
+        """
+
+# Bump when PDF extraction changes; prompt/schema changes are picked up automatically
+PDF_PARSER_VERSION = "pypdf-1"
+CV_PARSER_VERSION = content_hash(
+    PDF_PARSER_VERSION,
+    SYSTEM_PROMPT,
+    json.dumps(CVStructured.model_json_schema(), sort_keys=True),
+)[:16]
+
+# Uploaded CVs larger than this are rejected while downloading
+CV_MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# `cv_file_path` prefix for PDFs uploaded to this process and held in app/utils/blobs
+CV_UPLOAD_PREFIX = "upload://"
+
+# Parsed CVs keyed by SHA-256 of the PDF bytes; no TTL, the bytes never change
+parsed_cv_cache = get_cache("parsed_cv", memory_entries=128, disk_entries=50_000)
 
 
 # ==========================================
@@ -23,42 +62,86 @@ from app.schemas.cv_schema import CVStructured
 class CVAgent:
     def __init__(self) -> None:
         # Gemini Flash (latest) لتجنب 404
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0,
-            convert_system_message_to_human=True
-        )
+        self.llm = get_llm(temperature=0)
 
-    def parse_cv(self, file_path: str) -> CVStructured:
-        """
-        Reads a PDF CV file, extracts text,
-        and converts it into a structured JSON object.
-        """
-        
-        if file_path.startswith("http"):
-            response = requests.get(file_path)
-            with open("temp_cv.pdf", "wb") as f:
-                f.write(response.content)
-            path = "temp_cv.pdf"
-        else:
-            path = file_path
+    # --------------------------------------
+    # HELPERS
+    # --------------------------------------
+    @staticmethod
+    def _read_local(path: str) -> PdfSource:
+        if path.startswith(CV_UPLOAD_PREFIX):
+            content = blobs.get(path)
+            if content is None:
+                raise FileNotFoundError(
+                    f"Uploaded CV is no longer available: {path}"
+                )
+            return content
 
-        # ---------- 1. Validate file ----------
         if not os.path.exists(path):
             raise FileNotFoundError(
                 f"CV file not found at: {path}"
             )
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _cache_key(content: PdfSource) -> str:
+        return f"{hashlib.sha256(content).hexdigest()}:{CV_PARSER_VERSION}"
+
+    @staticmethod
+    def _cached(key: str) -> Optional[CVStructured]:
+        data = parsed_cv_cache.get(key)
+        if data is None:
+            return None
+        print("♻️ CV already parsed, using cached result")
+        return CVStructured.model_validate(data)
 
-        # ---------- 2. Load & clean PDF ----------
+    # ---------- Optional: cvs.structured_data ----------
+    def _db_load(self, cv_id: str, key: str) -> Optional[CVStructured]:
+        """Parsed CV stored on the `cvs` row, if it was parsed from the same bytes."""
         try:
-            print(f"📄 Reading PDF: {file_path}")
+            data = db.fetch_cv_structured_data(cv_id)
+        except Exception as e:
+            print(f"⚠️ Could not read stored CV parse: {e}")
+            return None
 
-            loader = PyPDFLoader(path)
-            pages = loader.load()
+        if data.get("parse_key") != key or not data.get("parsed_cv"):
+            return None
 
-            raw_text = "\n".join(
-                page.page_content for page in pages
-            )
+        parsed = CVStructured.model_validate(data["parsed_cv"])
+        parsed_cv_cache.set(key, parsed.model_dump())
+        print("♻️ CV already parsed, using stored result")
+        return parsed
+
+    def _db_store(self, cv_id: str, key: str, parsed: CVStructured) -> None:
+        try:
+            existing = db.fetch_cv_structured_data(cv_id)
+            db.update_cv_structured_data(cv_id, {
+                **existing,
+                "parse_key": key,
+                "parsed_cv": parsed.model_dump(),
+            })
+        except Exception as e:
+            print(f"⚠️ Could not store CV parse: {e}")
+
+    def _lookup(self, key: str, cv_id: Optional[str]) -> Optional[CVStructured]:
+        parsed = self._cached(key)
+        if parsed is None and cv_id:
+            parsed = self._db_load(cv_id, key)
+        return parsed
+
+    def _remember(self, key: str, parsed: CVStructured, cv_id: Optional[str]) -> None:
+        parsed_cv_cache.set(key, parsed.model_dump())
+        if cv_id:
+            self._db_store(cv_id, key, parsed)
+
+    @staticmethod
+    def _read_pdf_text(content: PdfSource, file_path: str) -> str:
+        # ---------- Extract & clean PDF (in memory, no temp file) ----------
+        try:
+            print(f"📄 Reading PDF: {file_path}")
+
+            raw_text = extract_pdf(content).text
 
             clean_text = "\n".join(
                 line.strip()
@@ -77,44 +160,89 @@ class CVAgent:
                 f"Error reading PDF file: {e}"
             )
 
-        # ---------- 3. Prepare LLM ----------
-        structured_llm = self.llm.with_structured_output(
-            CVStructured
-        )
+        return clean_text
 
-        system_prompt = """
-        You are an expert Resume Parser.
-        Extract structured data from the CV text provided.
+    @staticmethod
+    def _messages(clean_text: str) -> List[BaseMessage]:
+        return [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=clean_text),
+        ]
 
-        Instructions:
-        - Contact: email, phone, LinkedIn, GitHub.
-        - Experience: title, company, duration, description.
-        - Skills: list all technical and soft skills.
-        - Education: degree, university, year.
-        - Projects: title and short description.
+    # --------------------------------------
+    # MAIN ENTRY
+    # --------------------------------------
+    def parse_cv(self, file_path: str, cv_id: Optional[str] = None) -> CVStructured:
+        """
+        Reads a PDF CV file, extracts text,
+        and converts it into a structured JSON object.
 
-        Important:
-        Return ONLY valid JSON matching the schema.
+        Results are cached by PDF content hash; with `cv_id` they are also
+        read from / written to that row's `cvs.structured_data`.
         """
 
-        # ---------- 4. Invoke LLM ----------
+        if file_path.startswith("http"):
+            response = http.fetch(file_path, max_bytes=CV_MAX_BYTES)
+            response.raise_for_status()
+            content = response.content
+        else:
+            content = self._read_local(file_path)
+
+        key = self._cache_key(content)
+        cached = self._lookup(key, cv_id)
+        if cached is not None:
+            return cached
+
+        clean_text = self._read_pdf_text(content, file_path)
+
+        # ---------- 3. Invoke LLM ----------
         try:
             print("🤖 Parsing CV with AI...")
 
-            result = structured_llm.invoke(
-                [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=clean_text),
-                ]
+            parsed = get_structured_llm(CVStructured).invoke(
+                self._messages(clean_text)
+            )
+
+        except Exception as e:
+            raise RuntimeError(
+                f"Error parsing CV with AI: {e}"
             )
 
-            return result
+        self._remember(key, parsed, cv_id)
+        return parsed
+
+    async def aparse_cv(self, file_path: str, cv_id: Optional[str] = None) -> CVStructured:
+        """Async variant of `parse_cv`; PDF parsing runs in a worker thread."""
+
+        if file_path.startswith("http"):
+            response = await http.afetch(file_path, max_bytes=CV_MAX_BYTES)
+            response.raise_for_status()
+            content = response.content
+        else:
+            content = await asyncio.to_thread(self._read_local, file_path)
+
+        key = self._cache_key(content)
+        cached = await asyncio.to_thread(self._lookup, key, cv_id)
+        if cached is not None:
+            return cached
+
+        clean_text = await asyncio.to_thread(self._read_pdf_text, content, file_path)
+
+        try:
+            print("🤖 Parsing CV with AI...")
+
+            parsed = await get_structured_llm(CVStructured).ainvoke(
+                self._messages(clean_text)
+            )
 
         except Exception as e:
             raise RuntimeError(
                 f"Error parsing CV with AI: {e}"
             )
 
+        await asyncio.to_thread(self._remember, key, parsed, cv_id)
+        return parsed
+
 
 # ==========================================
 # TESTING BLOCK
@@ -1,6 +1,5 @@
 import json
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI   
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.schemas.cv_schema import CVStructured
 
@@ -94,19 +93,11 @@ load_dotenv()
 
 # app/agents/cv_optimizer_agent.py
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.schemas.cv_schema import CVStructured
+from app.agents.registry import get_llm, get_structured_llm
 
-class CVOptimizerAgent:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
-
-    def optimize(self, cv_data, critique, job_data) -> dict:
-
-        structured_llm = self.llm.with_structured_output(CVStructured)
-
-        system_prompt = """
+OPTIMIZE_SYSTEM_PROMPT = """
 You are an aggressive ATS-optimization engine.
 
 GOAL:
@@ -124,37 +115,15 @@ IMPORTANT:
 This is for ATS optimization, not human review.
 """
 
-        human_prompt = f"""
-JOB REQUIREMENTS:
-{job_data}
-
-MISSING KEYWORDS (MUST ADD):
-{critique}
-
-CURRENT CV:
-{cv_data}
-
-TASK:
-- Add missing keywords directly into:
-  - skills
-  - experience descriptions
-- Ensure keywords appear verbatim.
-- Keep structure intact.
-"""
-
-        result = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=human_prompt)
-        ])
-
-        return result
-
-    def render_html(self, final_cv: CVStructured) -> str:
-        """Focused strictly on design, Tailwind CSS, and A4 layout."""
-        # We use a slightly higher temperature for better layout variety
-        designer_llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.2)
+# (temperature, extra emphasis) per speculative candidate; cycled when K > len
+CANDIDATE_STRATEGIES = [
+    (0, None),
+    (0.4, "Prioritize adding every missing keyword to the skills section."),
+    (0.7, "Prioritize weaving missing keywords into experience descriptions with measurable impact."),
+    (0.4, "Prioritize rewriting the summary around the job's core requirements."),
+]
 
-        system_prompt = """
+RENDER_SYSTEM_PROMPT = """
 You are a deterministic CV HTML rendering engine.
 
 Your ONLY task is to convert structured CV JSON into a clean, ATS-safe,
@@ -249,7 +218,41 @@ CRITICAL
 - The layout must visually match the required design system exactly.
 """
 
-        
+
+class CVOptimizerAgent:
+    def __init__(self):
+        self.llm = get_llm(temperature=0, convert_system_message_to_human=False)
+
+    # --------------------------------------
+    # PROMPTS
+    # --------------------------------------
+    @staticmethod
+    def _optimize_messages(cv_data, critique, job_data):
+        human_prompt = f"""
+JOB REQUIREMENTS:
+{job_data}
+
+MISSING KEYWORDS (MUST ADD):
+{critique}
+
+CURRENT CV:
+{cv_data}
+
+TASK:
+- Add missing keywords directly into:
+  - skills
+  - experience descriptions
+- Ensure keywords appear verbatim.
+- Keep structure intact.
+"""
+
+        return [
+            SystemMessage(content=OPTIMIZE_SYSTEM_PROMPT),
+            HumanMessage(content=human_prompt)
+        ]
+
+    @staticmethod
+    def _render_messages(final_cv: CVStructured):
         human_prompt = f"""
 Convert this structured CV JSON into a clean Tailwind HTML document:
 
@@ -258,6 +261,64 @@ Convert this structured CV JSON into a clean Tailwind HTML document:
 Generate the HTML now.
 """
 
-        
-        response = designer_llm.invoke([SystemMessage(content=system_prompt), HumanMessage(content=human_prompt)])
-        return response.content.replace("```html", "").replace("```", "").strip()
\ No newline at end of file
+        return [SystemMessage(content=RENDER_SYSTEM_PROMPT), HumanMessage(content=human_prompt)]
+
+    @staticmethod
+    def _strip_fences(content: str) -> str:
+        return content.replace("```html", "").replace("```", "").strip()
+
+    @staticmethod
+    def candidate_strategies(k: int):
+        """(temperature, emphasis) for each of K speculative candidates."""
+        return [CANDIDATE_STRATEGIES[i % len(CANDIDATE_STRATEGIES)] for i in range(k)]
+
+    @staticmethod
+    def with_emphasis(critique, emphasis):
+        if not emphasis:
+            return critique
+        return f"{critique}\n\nEMPHASIS:\n{emphasis}"
+
+    # --------------------------------------
+    # OPTIMIZATION
+    # --------------------------------------
+    def optimize(self, cv_data, critique, job_data, temperature: float = 0) -> dict:
+
+        structured_llm = get_structured_llm(
+            CVStructured, temperature=temperature, convert_system_message_to_human=False
+        )
+
+        return structured_llm.invoke(
+            self._optimize_messages(cv_data, critique, job_data)
+        )
+
+    async def aoptimize(self, cv_data, critique, job_data, temperature: float = 0) -> dict:
+
+        structured_llm = get_structured_llm(
+            CVStructured, temperature=temperature, convert_system_message_to_human=False
+        )
+
+        return await structured_llm.ainvoke(
+            self._optimize_messages(cv_data, critique, job_data)
+        )
+
+    # --------------------------------------
+    # HTML RENDERING
+    # --------------------------------------
+    def render_html(self, final_cv: CVStructured) -> str:
+        """Focused strictly on design, Tailwind CSS, and A4 layout."""
+        # We use a slightly higher temperature for better layout variety,
+        # but an unchanged CV reuses its previous render
+        designer_llm = get_llm(
+            temperature=0.2, convert_system_message_to_human=False, cache=True
+        )
+
+        response = designer_llm.invoke(self._render_messages(final_cv))
+        return self._strip_fences(response.content)
+
+    async def arender_html(self, final_cv: CVStructured) -> str:
+        designer_llm = get_llm(
+            temperature=0.2, convert_system_message_to_human=False, cache=True
+        )
+
+        response = await designer_llm.ainvoke(self._render_messages(final_cv))
+        return self._strip_fences(response.content)
@@ -1,36 +1,25 @@
-import os
+import asyncio
 import base64
-import requests
-from supabase import create_client
+from typing import Callable
 
+from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
 
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.schemas.email_schema import EmailDraft
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+from app.agents.registry import get_llm, get_structured_llm
+from app.agents.gmail_session import gmail_sessions
+from app.agents.cv_agent import CV_MAX_BYTES
+from app.utils import blobs, db, http
 
 class EmailAgent:
     def __init__(self):
         # Using temperature 0.7 for a more natural, human-sounding email
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+        self.llm = get_llm(temperature=0.7, convert_system_message_to_human=False)
 
-    def draft_email(self, cv_data, job_data, is_backup=False) -> EmailDraft:
-        """
-        Generates a personalized subject line and body for the job application.
-        """
-        structured_llm = self.llm.with_structured_output(EmailDraft)
-        
+    @staticmethod
+    def _draft_messages(cv_data, job_data):
         system_prompt = """
 You are a professional job application assistant.
 
@@ -61,66 +50,119 @@ Requirements:
         
         Write the subject line and email body.
         """
-        
-        return structured_llm.invoke([SystemMessage(content=system_prompt), HumanMessage(content=human_prompt)])
 
-    def send_gmail(self, draft: EmailDraft, recipient_email: str, storage_path: str, refresh_token: str, candidate_name: str):
+        return [SystemMessage(content=system_prompt), HumanMessage(content=human_prompt)]
+
+    def _structured_llm(self):
+        return get_structured_llm(
+            EmailDraft, temperature=0.7, convert_system_message_to_human=False
+        )
+
+    def draft_email(self, cv_data, job_data, is_backup=False) -> EmailDraft:
         """
-        Uses the Refresh Token to generate an Access Token and send the email.
-        Matches the Next.js logic of using the refresh flow.
+        Generates a personalized subject line and body for the job application.
         """
-        # 1. Initialize Credentials using ONLY the refresh token
-        # The 'token' (access token) is initially None; the library will fetch it.
-        
-        signed_url_res = supabase.storage.from_("cvs").create_signed_url(
-            storage_path,
-            600 
-        )
+        return self._structured_llm().invoke(self._draft_messages(cv_data, job_data))
+
+    async def adraft_email(self, cv_data, job_data, is_backup=False) -> EmailDraft:
+        return await self._structured_llm().ainvoke(self._draft_messages(cv_data, job_data))
+
+    # --------------------------------------
+    # GMAIL HELPERS
+    # --------------------------------------
+    @staticmethod
+    def _build_raw_message(draft: EmailDraft, recipient_email: str, pdf_bytes, candidate_name: str) -> str:
+        # Construct Multipart Email (Matches Next.js logic but with attachment)
+        message = MIMEMultipart()
+        message['to'] = recipient_email
+        message['subject'] = draft.subject
+        message.attach(MIMEText(draft.body, 'plain'))
+
+        # Add PDF Attachment, base64-encoded straight from the (possibly shared) buffer
+        part = MIMEBase("application", "pdf")
+        part.set_payload(base64.encodebytes(pdf_bytes).decode("ascii"))
+        part["Content-Transfer-Encoding"] = "base64"
+        part.add_header('Content-Disposition', 'attachment', filename=f"CV_{candidate_name}.pdf")
+        message.attach(part)
+
+        # Encode to Base64 (URL safe)
+        return base64.urlsafe_b64encode(message.as_bytes()).decode()
+
+    @staticmethod
+    def _deliver(user_id: str, load_refresh_token: Callable[[], str], raw_message: str):
+        from google.auth.exceptions import RefreshError
 
-        pdf_url = signed_url_res["signedURL"]
-        
-        creds = Credentials(
-            token=None, 
-            refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=os.getenv("GOOGLE_CLIENT_ID"),
-            client_secret=os.getenv("GOOGLE_CLIENT_SECRET")
-        )
+        try:
+            return gmail_sessions.send(user_id, load_refresh_token, raw_message)
+        except RefreshError:
+            # Revoked or rotated grant: next send reloads the stored token
+            gmail_sessions.invalidate(user_id)
+            raise
+
+    # --------------------------------------
+    # SEND
+    # --------------------------------------
+    def send_gmail(
+        self,
+        draft: EmailDraft,
+        recipient_email: str,
+        storage_path: str,
+        user_id: str,
+        load_refresh_token: Callable[[], str],
+        candidate_name: str,
+    ):
+        """
+        Sends through the user's cached Gmail session. `load_refresh_token`
+        (fetch + decrypt) only runs when the user has no live session;
+        the access token is refreshed only shortly before it expires.
+        """
+        try:
+            # Rendered in this process: reuse the bytes pdf_node handed over
+            pdf_bytes = blobs.get(storage_path)
 
-        # 2. Force Refresh (Optional but recommended to verify the token works)
-        # This is the Python equivalent of oauth2Client.getAccessToken() in your JS code
-        creds.refresh(Request())
-        print(f"✅ Generated Fresh Access Token: {creds.token[:10]}...")
+            if pdf_bytes is None:
+                # Download the PDF CV (e.g. resumed in another process)
+                response = http.fetch(db.signed_cv_url(storage_path, 600), max_bytes=CV_MAX_BYTES)
 
+                if response.status_code != 200:
+                    raise Exception("Failed to download CV from storage.")
+                pdf_bytes = response.content
+
+            raw_message = self._build_raw_message(draft, recipient_email, pdf_bytes, candidate_name)
+            result = self._deliver(user_id, load_refresh_token, raw_message)
+            blobs.release(storage_path)
+            return result
+
+        except Exception as e:
+            print(f"❌ Gmail API Error: {str(e)}")
+            raise e
+
+    async def asend_gmail(
+        self,
+        draft: EmailDraft,
+        recipient_email: str,
+        storage_path: str,
+        user_id: str,
+        load_refresh_token: Callable[[], str],
+        candidate_name: str,
+    ):
+        """Async variant of `send_gmail`; blocking Google SDK calls run in threads."""
         try:
-            service = build('gmail', 'v1', credentials=creds)
-
-            # 3. Download the PDF CV
-            response = requests.get(pdf_url)
-            
-            if response.status_code != 200:
-                raise Exception("Failed to download CV from storage.")
-
-            # 4. Construct Multipart Email (Matches Next.js logic but with attachment)
-            message = MIMEMultipart()
-            message['to'] = recipient_email
-            message['subject'] = draft.subject
-            message.attach(MIMEText(draft.body, 'plain'))
-
-            # Add PDF Attachment
-            part = MIMEApplication(response.content, _subtype="pdf")
-            part.add_header('Content-Disposition', 'attachment', filename=f"CV_{candidate_name}.pdf")
-            message.attach(part)
-
-            # 5. Encode to Base64 (URL safe)
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-
-            # 6. Send via Gmail API
-            return service.users().messages().send(
-                userId='me', 
-                body={'raw': raw_message}
-            ).execute()
+            pdf_bytes = blobs.get(storage_path)
+
+            if pdf_bytes is None:
+                pdf_url = await db.asigned_cv_url(storage_path, 600)
+                response = await http.afetch(pdf_url, max_bytes=CV_MAX_BYTES)
+
+                if response.status_code != 200:
+                    raise Exception("Failed to download CV from storage.")
+                pdf_bytes = response.content
+
+            raw_message = self._build_raw_message(draft, recipient_email, pdf_bytes, candidate_name)
+            result = await asyncio.to_thread(self._deliver, user_id, load_refresh_token, raw_message)
+            blobs.release(storage_path)
+            return result
 
         except Exception as e:
             print(f"❌ Gmail API Error: {str(e)}")
-            raise e
\ No newline at end of file
+            raise e
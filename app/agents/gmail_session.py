@@ -0,0 +1,190 @@
+# ==========================================
+# GMAIL SESSION CACHE
+# ==========================================
+# Per-user Gmail credentials + API service, reused across sends so a batch
+# refreshes the access token and builds the client once per user instead
+# of once per email. Entries (and the plaintext refresh token they hold)
+# are wiped after GMAIL_SESSION_TTL by a background sweep, and at most
+# GMAIL_SESSION_MAX users are held at once.
+
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+GMAIL_SESSION_TTL = float(os.getenv("GMAIL_SESSION_TTL", "1800"))
+GMAIL_SESSION_MAX = int(os.getenv("GMAIL_SESSION_MAX", "256"))
+# How often idle sessions are checked for expiry (the sweep stops when empty)
+GMAIL_SESSION_SWEEP = float(os.getenv("GMAIL_SESSION_SWEEP", "60"))
+# Refresh the access token this long before Google expires it
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=int(os.getenv("GMAIL_TOKEN_EXPIRY_MARGIN", "300")))
+
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+_discovery_doc: Optional[Dict[str, Any]] = None
+_discovery_lock = threading.Lock()
+
+
+def _gmail_discovery() -> Dict[str, Any]:
+    """The bundled Gmail v1 discovery document, parsed once per process."""
+    global _discovery_doc
+
+    from googleapiclient import discovery_cache
+
+    with _discovery_lock:
+        if _discovery_doc is None:
+            _discovery_doc = json.loads(discovery_cache.get_static_doc("gmail", "v1"))
+        return _discovery_doc
+
+
+class SessionWiped(RuntimeError):
+    """The session was expired/invalidated while a send was waiting for it."""
+
+
+class GmailSession:
+    def __init__(self, refresh_token: str):
+        # Google client libraries load with the first session, not at import
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build_from_document
+
+        self.lock = threading.Lock()
+        self.expires_at = time.time() + GMAIL_SESSION_TTL
+        self.creds = Credentials(
+            token=None,
+            refresh_token=refresh_token,
+            token_uri=TOKEN_URI,
+            client_id=os.getenv("GOOGLE_CLIENT_ID"),
+            client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
+        )
+        self.service = build_from_document(_gmail_discovery(), credentials=self.creds)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def _token_fresh(self) -> bool:
+        if not self.creds.token or self.creds.expiry is None:
+            return False
+        # google-auth keeps `expiry` as naive UTC
+        return self.creds.expiry - TOKEN_EXPIRY_MARGIN > datetime.utcnow()
+
+    def send(self, raw_message: str):
+        # httplib2 (under the service) is not thread-safe: one request per user at a time
+        with self.lock:
+            if self.service is None:
+                raise SessionWiped("Gmail session expired, retry the send.")
+
+            if not self._token_fresh():
+                from google.auth.transport.requests import Request
+
+                self.creds.refresh(Request())
+                print("✅ Refreshed Gmail access token")
+
+            return self.service.users().messages().send(
+                userId="me",
+                body={"raw": raw_message},
+            ).execute()
+
+    def wipe(self) -> None:
+        """Drop the tokens from the credentials object before it is discarded."""
+        with self.lock:
+            self.creds.token = None
+            self.creds._refresh_token = None
+            self.service = None
+
+
+class GmailSessionCache:
+    def __init__(self, max_sessions: int = GMAIL_SESSION_MAX, sweep_interval: float = GMAIL_SESSION_SWEEP):
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        # Insertion order == expiry order (one TTL for all), oldest first
+        self._sessions: Dict[str, GmailSession] = {}
+        self._sweeper: Optional[threading.Thread] = None
+
+    def get(self, user_id: str, load_refresh_token: Callable[[], str]) -> GmailSession:
+        """
+        Session for `user_id`; `load_refresh_token` (fetch + decrypt) only
+        runs when there is no live session.
+        """
+        self._evict_expired()
+
+        with self._lock:
+            session = self._sessions.get(user_id)
+        if session is not None:
+            return session
+
+        session = GmailSession(load_refresh_token())
+
+        evicted = []
+        with self._lock:
+            # Another thread may have created one meanwhile; keep the first
+            existing = self._sessions.setdefault(user_id, session)
+            if existing is session:
+                while len(self._sessions) > self.max_sessions:
+                    evicted.append(self._sessions.pop(next(iter(self._sessions))))
+                self._start_sweeper()
+
+        if existing is not session:
+            evicted.append(session)
+        for stale in evicted:
+            stale.wipe()
+        return existing
+
+    def send(self, user_id: str, load_refresh_token: Callable[[], str], raw_message: str):
+        """Send through the user's session, reloading it once if it was wiped mid-wait."""
+        session = self.get(user_id, load_refresh_token)
+        try:
+            return session.send(raw_message)
+        except SessionWiped:
+            self._discard(user_id, session)
+            return self.get(user_id, load_refresh_token).send(raw_message)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a session whose token was rejected (e.g. revoked grant)."""
+        with self._lock:
+            session = self._sessions.pop(user_id, None)
+        if session is not None:
+            session.wipe()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _discard(self, user_id: str, session: GmailSession) -> None:
+        with self._lock:
+            if self._sessions.get(user_id) is session:
+                del self._sessions[user_id]
+        session.wipe()
+
+    def _evict_expired(self) -> None:
+        with self._lock:
+            expired = [uid for uid, s in self._sessions.items() if s.expired]
+            sessions = [self._sessions.pop(uid) for uid in expired]
+
+        for session in sessions:
+            session.wipe()
+
+    # --------------------------------------
+    # BACKGROUND SWEEP
+    # --------------------------------------
+    def _start_sweeper(self) -> None:
+        # Caller holds self._lock
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="gmail-session-sweep", daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self) -> None:
+        """Wipe expired sessions even for users who never send again; exits once empty."""
+        while True:
+            time.sleep(self.sweep_interval)
+            self._evict_expired()
+            with self._lock:
+                if not self._sessions:
+                    self._sweeper = None
+                    return
+
+
+gmail_sessions = GmailSessionCache()
@@ -2,19 +2,46 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import re
+import asyncio
+import json
 from typing import Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.schemas.job_schema import JobStructured
+from app.agents.registry import get_llm, get_structured_llm
+from app.utils.cache import content_hash, get_cache
+
+
+SYSTEM_PROMPT = """
+You are an ATS job description parser.
+
+STRICT RULES:
+- Extract structured data ONLY.
+- DO NOT repeat the input text.
+- DO NOT add explanations.
+- DO NOT add formatting, markdown, or extra spacing.
+- DO NOT include line breaks in values.
+- Follow the schema exactly.
+- If a field is missing, return null or an empty list.
+"""
+
+# Prompt/schema changes invalidate previously cached analyses
+ANALYSIS_VERSION = content_hash(
+    SYSTEM_PROMPT,
+    json.dumps(JobStructured.model_json_schema(), sort_keys=True),
+)[:16]
+
+# Sanitized analyses keyed by hash of the cleaned posting text (contact_email excluded)
+job_analysis_cache = get_cache(
+    "job_analysis",
+    memory_entries=1024,
+    disk_entries=50_000,
+    ttl=30 * 24 * 3600,
+)
 
 
 class JobAnalyzerAgent:
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0,
-            convert_system_message_to_human=True
-        )
+        self.llm = get_llm(temperature=0)
 
     # --------------------------------------------------
     # EMAIL EXTRACTION (NEW ✅)
@@ -90,6 +117,33 @@ class JobAnalyzerAgent:
 
         return data
 
+    # --------------------------------------------------
+    # PROMPT
+    # --------------------------------------------------
+    @staticmethod
+    def _messages(cleaned_text: str):
+        return [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=cleaned_text),
+        ]
+
+    @staticmethod
+    def _cache_key(cleaned_text: str) -> str:
+        return content_hash(ANALYSIS_VERSION, cleaned_text)
+
+    def _sanitize(self, result: JobStructured, cache_key: str) -> dict:
+        # Final sanitization
+        data = self._clean_output(result.model_dump())
+        data.pop("contact_email", None)
+
+        job_analysis_cache.set(cache_key, data)
+        return data
+
+    @staticmethod
+    def _finalize(data: dict, contact_email: Optional[str]) -> JobStructured:
+        # ✅ Inject email into schema (optional field)
+        return JobStructured(**data, contact_email=contact_email)
+
     # --------------------------------------------------
     # MAIN ANALYSIS
     # --------------------------------------------------
@@ -99,31 +153,28 @@ class JobAnalyzerAgent:
 
         # Clean text for LLM
         cleaned_text = self._clean_input(raw_text)
+        cache_key = self._cache_key(cleaned_text)
 
-        structured_llm = self.llm.with_structured_output(JobStructured)
+        data = job_analysis_cache.get(cache_key)
+        if data is None:
+            structured_llm = get_structured_llm(JobStructured)
 
-        system_prompt = """
-You are an ATS job description parser.
+            result = structured_llm.invoke(self._messages(cleaned_text))
+            data = self._sanitize(result, cache_key)
 
-STRICT RULES:
-- Extract structured data ONLY.
-- DO NOT repeat the input text.
-- DO NOT add explanations.
-- DO NOT add formatting, markdown, or extra spacing.
-- DO NOT include line breaks in values.
-- Follow the schema exactly.
-- If a field is missing, return null or an empty list.
-"""
+        return self._finalize(data, contact_email)
 
-        result = structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=cleaned_text),
-        ])
+    async def aanalyze_job_text(self, raw_text: str) -> JobStructured:
+        contact_email = self._extract_email(raw_text)
+        cleaned_text = self._clean_input(raw_text)
+        cache_key = self._cache_key(cleaned_text)
 
-        # Final sanitization
-        data = self._clean_output(result.model_dump())
+        # Cache reads/writes hit SQLite: run them in a worker thread
+        data = await asyncio.to_thread(job_analysis_cache.get, cache_key)
+        if data is None:
+            structured_llm = get_structured_llm(JobStructured)
 
-        # ✅ Inject email into schema (optional field)
-        data["contact_email"] = contact_email
+            result = await structured_llm.ainvoke(self._messages(cleaned_text))
+            data = await asyncio.to_thread(self._sanitize, result, cache_key)
 
-        return JobStructured(**data)
+        return self._finalize(data, contact_email)
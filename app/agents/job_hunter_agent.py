@@ -7,22 +7,46 @@ load_dotenv()
 # ==========================================
 # STANDARD LIBRARIES
 # ==========================================
-from typing import List, Dict, Union
+import os
+import time
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from typing import Callable, List, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
 # ==========================================
 # THIRD-PARTY LIBRARIES
 # ==========================================
-import requests
-from bs4 import BeautifulSoup
-
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 
 # ==========================================
 # LOCAL IMPORTS
 # ==========================================
 from app.schemas.job_schema import JobStructured
+from app.agents.registry import get_llm, get_structured_llm
+from app.tools import scrape_cache
+from app.tools.job_extractor import extract_job_text
+from app.utils import http
+
+
+# Search results scraped concurrently in title mode
+JOB_SEARCH_RESULTS = int(os.getenv("JOB_SEARCH_RESULTS", "2"))
+# Overall budget for scraping all candidates of one search
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", "15"))
+# Politeness: concurrent requests per host (process-wide)
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "2"))
+# A result at least this long wins immediately; shorter ones only if nothing better arrives
+SCRAPE_MIN_CHARS = int(os.getenv("SCRAPE_MIN_CHARS", "500"))
+
+SCRAPE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    )
+}
 
 
 # ==========================================
@@ -31,54 +55,257 @@ from app.schemas.job_schema import JobStructured
 class JobHunterAgent:
     def __init__(self) -> None:
         # Gemini Flash
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0,
-            convert_system_message_to_human=True
-        )
+        self.llm = get_llm(temperature=0)
+
+        # DuckDuckGo Search (مستقر); langchain_community is heavy, import on first agent
+        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 
-        # DuckDuckGo Search (مستقر)
         self.search_wrapper = DuckDuckGoSearchAPIWrapper(
             time="w"  # weekly
         )
 
+        # URLs with a background revalidation in flight
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self._background_tasks = set()
+
+        # Per-host caps (threads for the sync path, asyncio for the async one).
+        # asyncio semaphores bind to the loop that first waits on them, so the
+        # agent (shared process-wide) keeps one set per running loop.
+        self._host_lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._ahost_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
     # --------------------------------------
     # HELPERS
     # --------------------------------------
     def _is_url(self, text: str) -> bool:
         return text.strip().startswith(("http://", "https://"))
 
+    @staticmethod
+    def _extract_text(content: bytes, encoding: Optional[str] = None) -> str:
+        # Main job-description block only, priority sections first (limits tokens)
+        return extract_job_text(content, encoding=encoding)
+
+    # --------------------------------------
+    # SCRAPING (cached, see app/tools/scrape_cache.py)
+    # --------------------------------------
+    def _claim_revalidation(self, url: str) -> bool:
+        key = scrape_cache.normalize_url(url)
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _release_revalidation(self, url: str) -> None:
+        with self._revalidating_lock:
+            self._revalidating.discard(scrape_cache.normalize_url(url))
+
+    def _fetch(self, url: str, entry: Optional[scrape_cache.ScrapeEntry]) -> str:
+        headers = {**SCRAPE_HEADERS, **(entry.conditional_headers() if entry else {})}
+        response = http.fetch(url, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            return scrape_cache.touch(url, entry, response.headers).text
+
+        response.raise_for_status()
+        text = self._extract_text(response.content, response.encoding)
+        return scrape_cache.store(url, text, response.headers).text
+
+    async def _afetch(self, url: str, entry: Optional[scrape_cache.ScrapeEntry]) -> str:
+        headers = {**SCRAPE_HEADERS, **(entry.conditional_headers() if entry else {})}
+        response = await http.afetch(url, headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            updated = await asyncio.to_thread(scrape_cache.touch, url, entry, response.headers)
+            return updated.text
+
+        response.raise_for_status()
+
+        # HTML parsing is CPU-bound, keep it off the event loop
+        text = await asyncio.to_thread(self._extract_text, response.content, response.encoding)
+        await asyncio.to_thread(scrape_cache.store, url, text, response.headers)
+        return text
+
+    def _revalidate(self, url: str, entry: scrape_cache.ScrapeEntry) -> None:
+        try:
+            self._fetch(url, entry)
+        except Exception as e:
+            print(f"⚠️ Background revalidation failed for {url}: {e}")
+        finally:
+            self._release_revalidation(url)
+
+    async def _arevalidate(self, url: str, entry: scrape_cache.ScrapeEntry) -> None:
+        try:
+            await self._afetch(url, entry)
+        except Exception as e:
+            print(f"⚠️ Background revalidation failed for {url}: {e}")
+        finally:
+            self._release_revalidation(url)
+
     def _scrape_url(self, url: str) -> str:
         try:
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0 Safari/537.36"
-                )
-            }
+            entry = scrape_cache.get_entry(url)
 
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            if entry is not None and entry.fresh:
+                return entry.text
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            if entry is not None and entry.servable_stale:
+                if self._claim_revalidation(url):
+                    threading.Thread(
+                        target=self._revalidate, args=(url, entry), daemon=True
+                    ).start()
+                return entry.text
 
-            for tag in soup(["script", "style", "nav", "footer", "header"]):
-                tag.decompose()
+            return self._fetch(url, entry)
 
-            text = soup.get_text(separator="\n")
-            clean_text = "\n".join(
-                line.strip()
-                for line in text.splitlines()
-                if line.strip()
-            )
+        except Exception as e:
+            raise RuntimeError(f"Error scraping URL: {e}")
+
+    async def _ascrape_url(self, url: str) -> str:
+        try:
+            entry = await asyncio.to_thread(scrape_cache.get_entry, url)
 
-            # Limit tokens
-            return clean_text[:10_000]
+            if entry is not None and entry.fresh:
+                return entry.text
+
+            if entry is not None and entry.servable_stale:
+                if self._claim_revalidation(url):
+                    task = asyncio.create_task(self._arevalidate(url, entry))
+                    self._background_tasks.add(task)
+                    task.add_done_callback(self._background_tasks.discard)
+                return entry.text
+
+            return await self._afetch(url, entry)
 
         except Exception as e:
             raise RuntimeError(f"Error scraping URL: {e}")
 
+    # --------------------------------------
+    # CONCURRENT FIRST-SUCCESS SCRAPING
+    # --------------------------------------
+    @staticmethod
+    def _candidate_urls(urls: List[str]) -> List[str]:
+        seen, unique = set(), []
+        for url in urls:
+            key = scrape_cache.normalize_url(url) if url else None
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(url)
+        return unique
+
+    @staticmethod
+    def _better(current: Optional[Tuple[str, str]], url: str, text: str) -> Tuple[str, str]:
+        if current is None or len(text) > len(current[1]):
+            return url, text
+        return current
+
+    def _record(
+        self, best: Optional[Tuple[str, str]], url: str, result: Callable[[], str]
+    ) -> Tuple[Optional[Tuple[str, str]], bool]:
+        """Fold one finished scrape into `best`; True once it is good enough to stop."""
+        try:
+            text = result()
+        except Exception as e:
+            print(f"⚠ Failed scraping {url}: {e}")
+            return best, False
+
+        best = self._better(best, url, text)
+        return best, len(best[1]) >= SCRAPE_MIN_CHARS
+
+    def _scrape_limited(self, url: str, deadline: float) -> str:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            limit = self._host_limits.setdefault(host, threading.BoundedSemaphore(SCRAPE_PER_HOST))
+
+        if not limit.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise RuntimeError(f"Host busy: {host}")
+        try:
+            return self._scrape_url(url)
+        finally:
+            limit.release()
+
+    async def _ascrape_limited(self, url: str) -> str:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            limits = self._ahost_limits.setdefault(asyncio.get_running_loop(), {})
+            limit = limits.setdefault(host, asyncio.Semaphore(SCRAPE_PER_HOST))
+
+        async with limit:
+            return await self._ascrape_url(url)
+
+    def scrape_first(self, urls: List[str], deadline: float = SCRAPE_DEADLINE) -> Tuple[str, str]:
+        """
+        Scrape all candidate URLs concurrently; return (url, text) of the first
+        substantial page, or the longest success once all finish or time runs out.
+        """
+        urls = self._candidate_urls(urls)
+        if not urls:
+            raise RuntimeError("No job URLs to scrape.")
+
+        until = time.monotonic() + deadline
+        best = None
+        pool = ThreadPoolExecutor(max_workers=len(urls))
+
+        try:
+            futures = {pool.submit(self._scrape_limited, url, until): url for url in urls}
+
+            for future in as_completed(futures, timeout=deadline):
+                best, enough = self._record(best, futures[future], future.result)
+                if enough:
+                    break
+
+        except FutureTimeout:
+            print(f"⏱ Scrape deadline of {deadline:g}s reached")
+
+        finally:
+            # Losers keep their threads until their own timeout, results are ignored
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if best is None:
+            raise RuntimeError("All job URLs failed to scrape.")
+        return best
+
+    async def ascrape_first(self, urls: List[str], deadline: float = SCRAPE_DEADLINE) -> Tuple[str, str]:
+        """Async variant of `scrape_first`; pending scrapes are cancelled once a winner is found."""
+        urls = self._candidate_urls(urls)
+        if not urls:
+            raise RuntimeError("No job URLs to scrape.")
+
+        until = time.monotonic() + deadline
+        best = None
+        tasks = {asyncio.create_task(self._ascrape_limited(url)): url for url in urls}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                remaining = until - time.monotonic()
+                if remaining <= 0:
+                    print(f"⏱ Scrape deadline of {deadline:g}s reached")
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                enough = False
+                for task in done:
+                    best, enough = self._record(best, tasks[task], task.result)
+
+                if enough:
+                    break
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if best is None:
+            raise RuntimeError("All job URLs failed to scrape.")
+        return best
+
     def _search_jobs(self, query: str) -> List[Dict[str, str]]:
         """
         Search for 1–2 job postings only.
@@ -88,7 +315,7 @@ class JobHunterAgent:
 
             results = self.search_wrapper.results(
                 search_query,
-                max_results=2   
+                max_results=JOB_SEARCH_RESULTS
             )
 
             jobs = []
@@ -106,6 +333,19 @@ class JobHunterAgent:
         except Exception as e:
             raise RuntimeError(f"Job search failed: {e}")
 
+    @staticmethod
+    def _messages(raw_text: str):
+        system_prompt = """
+            You are an expert HR Tech Recruiter.
+            Extract ONLY factual job requirements.
+            Ignore fluff and company branding.
+            """
+
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=raw_text),
+        ]
+
     # --------------------------------------
     # MAIN ENTRY
     # --------------------------------------
@@ -116,21 +356,24 @@ class JobHunterAgent:
 
             raw_text = self._scrape_url(job_input)
 
-            structured_llm = self.llm.with_structured_output(JobStructured)
-
-            system_prompt = """
-            You are an expert HR Tech Recruiter.
-            Extract ONLY factual job requirements.
-            Ignore fluff and company branding.
-            """
-
-            result = structured_llm.invoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=raw_text),
-            ])
+            structured_llm = get_structured_llm(JobStructured)
 
-            return result
+            return structured_llm.invoke(self._messages(raw_text))
 
         # ========= TITLE MODE =========
         print(f"🔍 Searching jobs for title: {job_input}")
         return self._search_jobs(job_input)
+
+    async def aparse_job(self, job_input: str) -> Union[JobStructured, List[Dict]]:
+        if self._is_url(job_input):
+            print(f"🌐 Scraping job URL: {job_input}")
+
+            raw_text = await self._ascrape_url(job_input)
+
+            structured_llm = get_structured_llm(JobStructured)
+
+            return await structured_llm.ainvoke(self._messages(raw_text))
+
+        print(f"🔍 Searching jobs for title: {job_input}")
+        # DuckDuckGo wrapper is blocking only
+        return await asyncio.to_thread(self._search_jobs, job_input)
@@ -0,0 +1,83 @@
+# ==========================================
+# LLM RESPONSE CACHE
+# ==========================================
+# Content-addressed cache for the Gemini clients handed out by the
+# registry, plugged in as LangChain's per-model `cache`.
+# Key = model params + bound kwargs (output schema) + messages.
+
+import os
+import asyncio
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+
+from app.utils.cache import TieredCache, content_hash, get_cache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_DISK_ENTRIES = int(os.getenv("LLM_CACHE_DISK_ENTRIES", "20000"))
+
+
+def llm_cache():
+    return get_cache(
+        "llm",
+        memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+        disk_entries=LLM_CACHE_DISK_ENTRIES,
+        ttl=LLM_CACHE_TTL,
+    )
+
+
+class TieredLLMCache(BaseCache):
+    """
+    LangChain response cache on the shared TieredCache. Set as a chat model's
+    `cache`, it serves every call path (invoke, batch, `prompt | llm`, `.bind()`,
+    `.with_structured_output()`): LangChain keys it by the serialized messages
+    and an `llm_string` covering the model params and bound kwargs (tools,
+    output schema), so a schema change misses the old entries.
+    """
+
+    def __init__(self, cache: Optional[TieredCache] = None):
+        self._cache = cache
+
+    @property
+    def cache(self) -> TieredCache:
+        # The shared "llm" namespace is opened on first lookup, not at import
+        return self._cache or llm_cache()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return content_hash(llm_string, prompt)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        return self.cache.get(self._key(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if return_val:
+            self.cache.set(self._key(prompt, llm_string), list(return_val))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
+
+    # The disk tier is blocking SQLite I/O: keep it off the event loop
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await asyncio.to_thread(self.clear)
+
+
+response_cache = TieredLLMCache()
+
+
+def should_cache(temperature: float, cache: Optional[bool]) -> bool:
+    """Deterministic calls are cached by default; temperature > 0 is opt-in."""
+    if not LLM_CACHE_ENABLED:
+        return False
+    if cache is None:
+        return temperature == 0
+    return cache
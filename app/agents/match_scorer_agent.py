@@ -1,7 +1,18 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import os
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
+
+from app.agents.registry import get_llm, get_structured_llm
+from app.tools.match_engine import score_match
+
+
+# llm: Gemini only | local: deterministic engine only |
+# gated: local engine, Gemini only when the local score is near the threshold
+SCORING_MODES = ("llm", "local", "gated")
+DEFAULT_SCORING_MODE = os.getenv("SCORING_MODE", "llm")
+SCORING_GATE_MARGIN = int(os.getenv("SCORING_GATE_MARGIN", "10"))
+DEFAULT_THRESHOLD = 75
 
 
 class MatchResult(BaseModel):
@@ -10,18 +21,40 @@ class MatchResult(BaseModel):
     analysis: str = Field(description="Short factual explanation of the score")
 
 
+SYSTEM_PROMPT = """
+You are a strict ATS (Applicant Tracking System).
+
+RULES:
+- The JOB DESCRIPTION is the source of truth.
+- Score is based ONLY on overlap between CV and JOB.
+- Missing required hard skills MUST reduce score.
+- Similar tools may partially compensate but NOT fully replace.
+- Never give 0 unless CV clearly lacks core requirements.
+- Scores above 85 should be rare.
+
+SCORING GUIDE:
+- 90–100: Almost perfect match
+- 75–89: Strong match with minor gaps
+- 60–74: Partial match, noticeable gaps
+- 40–59: Weak match
+- <40: Poor match
+
+OUTPUT:
+- score (0–100)
+- missing_keywords (hard skills only)
+- analysis (short, factual, no praise)
+"""
+
+
 class MatchScorerAgent:
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0,
-            convert_system_message_to_human=True
-        )
+        self.llm = get_llm(temperature=0)
 
     def _to_dict(self, data):
         return data.model_dump() if hasattr(data, "model_dump") else data
 
-    def calculate_match(self, cv_data, job_data) -> MatchResult:
+    def _prepare(self, cv_data, job_data):
+        """Return either an early MatchResult or the messages to send."""
         cv = self._to_dict(cv_data)
         job = self._to_dict(job_data)
 
@@ -31,7 +64,7 @@ class MatchScorerAgent:
                 score=0,
                 missing_keywords=job.get("required_skills", []),
                 analysis="Missing critical data for evaluation."
-            )
+            ), None
 
         cv_payload = {
             "skills": cv.get("skills", []),
@@ -48,37 +81,70 @@ class MatchScorerAgent:
             "education": job.get("education")
         }
 
-        structured_llm = self.llm.with_structured_output(MatchResult)
+        messages = [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(
+                content=f"JOB REQUIREMENTS:\n{job_payload}\n\nCANDIDATE CV:\n{cv_payload}"
+            )
+        ]
 
-        system_prompt = """
-You are a strict ATS (Applicant Tracking System).
+        return None, messages
 
-RULES:
-- The JOB DESCRIPTION is the source of truth.
-- Score is based ONLY on overlap between CV and JOB.
-- Missing required hard skills MUST reduce score.
-- Similar tools may partially compensate but NOT fully replace.
-- Never give 0 unless CV clearly lacks core requirements.
-- Scores above 85 should be rare.
+    @staticmethod
+    def _local_match(cv_data, job_data, mode: str, threshold: int) -> Optional[MatchResult]:
+        """Local engine result, or None when the LLM must be consulted."""
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {mode}")
 
-SCORING GUIDE:
-- 90–100: Almost perfect match
-- 75–89: Strong match with minor gaps
-- 60–74: Partial match, noticeable gaps
-- 40–59: Weak match
-- <40: Poor match
+        if mode == "llm":
+            return None
 
-OUTPUT:
-- score (0–100)
-- missing_keywords (hard skills only)
-- analysis (short, factual, no praise)
-"""
+        local = score_match(cv_data, job_data)
+
+        if mode == "gated" and abs(local.score - threshold) <= SCORING_GATE_MARGIN:
+            print(f"⚖️ Local score {local.score} is near {threshold}, asking the LLM...")
+            return None
+
+        return MatchResult(
+            score=local.score,
+            missing_keywords=local.missing_keywords,
+            analysis=local.analysis,
+        )
+
+    def calculate_match(
+        self,
+        cv_data,
+        job_data,
+        mode: Optional[str] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+    ) -> MatchResult:
+        local = self._local_match(cv_data, job_data, mode or DEFAULT_SCORING_MODE, threshold)
+        if local is not None:
+            return local
+
+        early, messages = self._prepare(cv_data, job_data)
+        if early is not None:
+            return early
 
         print("⚖️ Calculating Match Score...")
 
-        return structured_llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(
-                content=f"JOB REQUIREMENTS:\n{job_payload}\n\nCANDIDATE CV:\n{cv_payload}"
-            )
-        ])
+        return get_structured_llm(MatchResult).invoke(messages)
+
+    async def acalculate_match(
+        self,
+        cv_data,
+        job_data,
+        mode: Optional[str] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+    ) -> MatchResult:
+        local = self._local_match(cv_data, job_data, mode or DEFAULT_SCORING_MODE, threshold)
+        if local is not None:
+            return local
+
+        early, messages = self._prepare(cv_data, job_data)
+        if early is not None:
+            return early
+
+        print("⚖️ Calculating Match Score...")
+
+        return await get_structured_llm(MatchResult).ainvoke(messages)
@@ -0,0 +1,98 @@
+# ==========================================
+# AGENT / LLM REGISTRY
+# ==========================================
+# Process-wide owner of the Gemini clients, the pre-bound
+# structured-output runnables and the agent instances, so a
+# pipeline run never re-creates HTTP clients. Deterministic clients
+# carry the content-addressed response cache (llm_cache.py).
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.agents.llm_cache import response_cache, should_cache
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+T = TypeVar("T")
+
+_lock = threading.RLock()
+_llms: Dict[Tuple, "ChatGoogleGenerativeAI"] = {}
+_structured: Dict[Tuple, Any] = {}
+_agents: Dict[type, Any] = {}
+
+
+def _client(
+    temperature: float,
+    model: str,
+    convert_system_message_to_human: bool,
+    cached: bool,
+) -> "ChatGoogleGenerativeAI":
+    key = (model, temperature, convert_system_message_to_human, cached)
+
+    llm = _llms.get(key)
+    if llm is not None:
+        return llm
+
+    with _lock:
+        if key not in _llms:
+            # Heavy (google-genai + protobufs): imported with the first client
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            _llms[key] = ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                convert_system_message_to_human=convert_system_message_to_human,
+                # Every call path of the client (and runnables derived from it)
+                # goes through the cache; False also ignores any global cache
+                cache=response_cache if cached else False,
+            )
+        return _llms[key]
+
+
+def get_llm(
+    temperature: float = 0,
+    model: str = DEFAULT_MODEL,
+    convert_system_message_to_human: bool = True,
+    cache: Optional[bool] = None,
+):
+    """
+    Return the shared chat client for this model/temperature.
+    `cache` defaults to caching only temperature-0 calls.
+    """
+    return _client(temperature, model, convert_system_message_to_human, should_cache(temperature, cache))
+
+
+def get_structured_llm(
+    schema: Type,
+    temperature: float = 0,
+    model: str = DEFAULT_MODEL,
+    convert_system_message_to_human: bool = True,
+    cache: Optional[bool] = None,
+):
+    """Return the shared `with_structured_output(schema)` runnable."""
+    cached = should_cache(temperature, cache)
+    key = (schema, model, temperature, convert_system_message_to_human, cached)
+
+    runnable = _structured.get(key)
+    if runnable is None:
+        with _lock:
+            if key not in _structured:
+                llm = _client(temperature, model, convert_system_message_to_human, cached)
+                _structured[key] = llm.with_structured_output(schema)
+            runnable = _structured[key]
+    return runnable
+
+
+def get_agent(agent_cls: Type[T]) -> T:
+    """Return the process-wide instance of an agent class."""
+    agent = _agents.get(agent_cls)
+    if agent is not None:
+        return agent
+
+    with _lock:
+        if agent_cls not in _agents:
+            _agents[agent_cls] = agent_cls()
+        return _agents[agent_cls]
@@ -10,17 +10,16 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-from app.graph import build_graph
-from app.schemas import CareerState
+from app.graph import get_graph
+from app.state import AgentState
+from app.agents.cv_agent import CV_UPLOAD_PREFIX
+from app.utils import blobs
 
 # ---------- CONFIG ----------
 API_KEY = os.getenv("API_KEY")
 
 app = FastAPI()
 
-# ---------- Build Graph Once ----------
-graph = build_graph()
-
 # ---------- CORS ----------
 app.add_middleware(
     CORSMiddleware,
@@ -42,16 +41,15 @@ async def analyze_resume(
     if auth != f"Bearer {API_KEY}":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # ---------- Save PDF ----------
-    temp_path = f"temp_{uuid.uuid4()}.pdf"
-    with open(temp_path, "wb") as f:
-        f.write(await cv_pdf.read())
+    # ---------- Keep PDF in memory (parsed from the buffer, no temp file) ----------
+    cv_handle = f"{CV_UPLOAD_PREFIX}{uuid.uuid4()}"
+    blobs.put(cv_handle, await cv_pdf.read())
 
     try:
-        # ---------- Create Same CareerState as main.py ----------
-        initial_state = CareerState(
-            cv_file_path=temp_path,
-            job_description=job_description
+        # ---------- Create Same AgentState as main.py ----------
+        initial_state = AgentState(
+            cv_file_path=cv_handle,
+            job_input=job_description
         )
 
         config = RunnableConfig(
@@ -59,14 +57,13 @@ async def analyze_resume(
             metadata={"version": "mvp"}
         )
 
-        # ---------- EXACT SAME CALL ----------
-        result = graph.invoke(initial_state, config=config)
+        # ---------- EXACT SAME CALL (graph compiled once, on first request) ----------
+        result = await get_graph().ainvoke(initial_state, config=config)
 
         return JSONResponse(content=jsonable_encoder(result))
 
     finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        blobs.release(cv_handle)
 
 
 # ---------- Health ----------
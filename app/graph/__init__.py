@@ -1 +1 @@
-from .builder import build_graph
\ No newline at end of file
+from .builder import build_graph, build_job_graph, get_graph, get_job_graph, configure_checkpointer
\ No newline at end of file
@@ -0,0 +1,96 @@
+# app/graph/batch.py
+
+import os
+import uuid
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.agents.cv_agent import CVAgent
+from app.agents.registry import get_agent
+from app.graph.builder import get_job_graph
+from app.graph.checkpoint import run_config
+from app.state import AgentState
+
+
+# Upper bound on concurrently running job pipelines per batch
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+
+async def run_batch(
+    cv_file_path: str,
+    jobs: List[Dict[str, Any]],
+    user_id: str,
+    user_email: str,
+    default_job_title: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    overrides: Optional[Dict[str, Any]] = None,
+    cv_id: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse the CV once, then run the per-job pipeline for every entry in
+    `jobs` (each a dict with `job_input` and optional `job_title`).
+    `overrides` are extra AgentState keys (e.g. optimization settings)
+    applied to every job.
+
+    Yields one dict per job as soon as it finishes:
+    {"index", "run_id", "job_input", "status": "success" | "failed", "result" | "error"}
+
+    Each job is checkpointed under its own run ID (`<batch_id>-<index>`).
+    """
+    concurrency = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    # ---------- Shared work: done exactly once ----------
+    print(f"📦 Batch of {len(jobs)} jobs for user: {user_id}")
+    cv_structured = await get_agent(CVAgent).aparse_cv(cv_file_path, cv_id)
+
+    graph = get_job_graph()
+    batch_id = uuid.uuid4().hex
+
+    async def run_one(index: int, job: Dict[str, Any]) -> Dict[str, Any]:
+        run_id = f"{batch_id}-{index}"
+
+        async with semaphore:
+            state: AgentState = {
+                "cv_file_path": cv_file_path,
+                "cv_id": cv_id,
+                "cv_structured": cv_structured,
+                "job_input": job["job_input"],
+                "job_title": job.get("job_title") or default_job_title,
+                "user_id": user_id,
+                "user_email": user_email,
+                **(overrides or {}),
+            }
+
+            try:
+                result = await graph.ainvoke(state, config=run_config(run_id))
+                return {
+                    "index": index,
+                    "run_id": run_id,
+                    "job_input": job["job_input"],
+                    "status": "success",
+                    "result": result,
+                }
+
+            except Exception as e:
+                print(f"❌ Batch job {index} failed: {e}")
+                return {
+                    "index": index,
+                    "run_id": run_id,
+                    "job_input": job["job_input"],
+                    "status": "failed",
+                    "error": str(e),
+                }
+
+    tasks = [
+        asyncio.create_task(run_one(i, job))
+        for i, job in enumerate(jobs)
+    ]
+
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away or the consumer stopped early
+        for task in tasks:
+            task.cancel()
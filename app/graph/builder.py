@@ -1,16 +1,19 @@
 # app/graph/builder.py
 
 import os
+import asyncio
+import threading
 from datetime import datetime
-from app import graph
-from app.tools.pdf_generator import generate_pdf_from_html
+from app.tools.pdf_generator import agenerate_pdf_from_html
+from app.tools.cv_renderer import render_cv_html
 from langgraph.graph import StateGraph, END
 
 from app.utils.encryption import decrypt as python_decrypt
-from supabase import create_client, Client
+from app.utils import db
 
 from app.state import AgentState
 from app.graph.nodes import *
+from app.graph.progress import emit_progress
 
 # Agents
 from app.agents.cv_agent import CVAgent
@@ -20,99 +23,94 @@ from app.agents.match_scorer_agent import MatchScorerAgent
 from app.agents.critique_agent import CritiqueAgent
 from app.agents.cv_optimizer_agent import CVOptimizerAgent
 from app.agents.email_agent import EmailAgent
+from app.agents.registry import get_agent
 
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") # Use service role key to bypass RLS
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
 # --------------------------------------------------
 # CV NODE
 # --------------------------------------------------
-def cv_node(state: AgentState) -> AgentState:
-    agent = CVAgent()
-    state["cv_structured"] = agent.parse_cv(state["cv_file_path"])
-    return state
+# The CV and job branches run concurrently, so their nodes return only the
+# keys they own instead of the whole state. Nodes are async only: run the
+# pipeline with ainvoke()/astream() (blocking work sits behind to_thread).
+async def cv_node(state: AgentState) -> AgentState:
+    agent = get_agent(CVAgent)
+    return {"cv_structured": await agent.aparse_cv(state["cv_file_path"], state.get("cv_id"))}
 
 
 # --------------------------------------------------
 # JOB HUNTER NODE (NO HUMAN IN LOOP)
 # --------------------------------------------------
-def job_hunter_node(state: AgentState) -> AgentState:
-    agent = JobHunterAgent()
+async def job_hunter_node(state: AgentState) -> AgentState:
+    agent = get_agent(JobHunterAgent)
 
     # ================= TITLE MODE =================
     if state["job_input_type"] == "title":
         print("🔍 Searching jobs by title...")
 
-        jobs = agent.parse_job(state["job_input"])
+        jobs = await agent.aparse_job(state["job_input"])
 
         if not jobs:
             raise RuntimeError("No job results found")
 
-        # 🔥 Try scraping each result until one works
-        for job in jobs:
-            job_url = job.get("link")
-            if not job_url:
-                continue
-
-            print(f"🌐 Attempting scrape: {job_url}")
-
-            try:
-                raw_text = agent._scrape_url(job_url)
-                state["raw_job_text"] = raw_text
-                state["selected_job_url"] = job_url
-                state["job_input_type"] = "url"
-                return state
+        # 🔥 Scrape all results concurrently, keep the first good one
+        urls = [job.get("link") for job in jobs if job.get("link")]
+        print(f"🌐 Scraping {len(urls)} results concurrently...")
 
-            except Exception as e:
-                print(f"⚠ Failed scraping {job_url}")
-                continue
-
-        raise RuntimeError("All job URLs failed to scrape.")
+        job_url, raw_text = await agent.ascrape_first(urls)
+        return {
+            "raw_job_text": raw_text,
+            "selected_job_url": job_url,
+            "job_input_type": "url",
+        }
 
     # ================= URL MODE =================
     if state["job_input_type"] == "url":
         print("🌐 Scraping job URL...")
 
-        raw_text = agent._scrape_url(state["job_input"])
-        state["raw_job_text"] = raw_text
-        return state
-
-    return state
+        return {"raw_job_text": await agent._ascrape_url(state["job_input"])}
 
+    return {}
 
 
 # --------------------------------------------------
 # JOB ANALYZER NODE
 # --------------------------------------------------
-def job_analyzer_node(state: AgentState) -> AgentState:
-    agent = JobAnalyzerAgent()
-
+def _job_text(state: AgentState) -> str:
     if state["job_input_type"] == "text":
-        raw_text = state["job_input"]
+        return state["job_input"]
 
-    elif state["job_input_type"] == "url":
+    if state["job_input_type"] == "url":
         raw_text = state.get("raw_job_text")
         if not raw_text:
             raise RuntimeError("raw_job_text missing for URL input")
+        return raw_text
 
-    else:
-        raise RuntimeError("Invalid job_input_type for analyzer")
+    raise RuntimeError("Invalid job_input_type for analyzer")
 
-    state["job_structured"] = agent.analyze_job_text(raw_text)
-    return state
+
+async def job_analyzer_node(state: AgentState) -> AgentState:
+    agent = get_agent(JobAnalyzerAgent)
+    return {"job_structured": await agent.aanalyze_job_text(_job_text(state))}
 
 
 # --------------------------------------------------
 # MATCH NODE
 # --------------------------------------------------
-def match_scorer_node(state: AgentState) -> AgentState:
-    agent = MatchScorerAgent()
+def _scoring_settings(state: AgentState) -> dict:
+    """Scoring engine selection for MatchScorerAgent (see SCORING_MODES)."""
+    return {
+        "mode": state.get("scoring_mode"),
+        "threshold": state.get("match_threshold") or THRESHOLD,
+    }
+
 
-    result = agent.calculate_match(
+async def match_scorer_node(state: AgentState) -> AgentState:
+    agent = get_agent(MatchScorerAgent)
+
+    result = await agent.acalculate_match(
         state["cv_structured"],
-        state["job_structured"]
+        state["job_structured"],
+        **_scoring_settings(state),
     )
 
     state["match_score"] = result.score
@@ -124,22 +122,25 @@ def match_scorer_node(state: AgentState) -> AgentState:
 # --------------------------------------------------
 # CRITIQUE NODE 🧠
 # --------------------------------------------------
-def critique_node(state: AgentState) -> AgentState:
+def _print_feedback(feedback):
+    print("✅ Critique Feedback:")
+    for item in feedback:
+        print(f"- {item}")
+
+
+async def critique_node(state: AgentState) -> AgentState:
     print("🧠 Generating CV critique feedback...")
 
-    agent = CritiqueAgent()
+    agent = get_agent(CritiqueAgent)
 
-    feedback = agent.generate_feedback(
+    feedback = await agent.agenerate_feedback(
         cv_data=state["cv_structured"],
         job_data=state["job_structured"],
         missing_keywords=state.get("missing_keywords", []),
     )
 
     state["critique_feedback"] = feedback
-
-    print("✅ Critique Feedback:")
-    for item in feedback:
-        print(f"- {item}")
+    _print_feedback(feedback)
 
     return state
 
@@ -148,54 +149,110 @@ def critique_node(state: AgentState) -> AgentState:
 # OPTIMIZATION NODE 🔥
 # app/graph/builder.py
 
-def optimization_node(state: AgentState) -> AgentState:
-    print("🔁 Starting CV Optimization Loop...")
+THRESHOLD = 75 # Increased threshold for better quality
+MAX_ITERATIONS = 2
+
+
+def _optimization_settings(state: AgentState):
+    """Per-request overrides for the loop: (threshold, iterations, candidates)."""
+    return (
+        state.get("match_threshold") or THRESHOLD,
+        state.get("max_iterations") or MAX_ITERATIONS,
+        max(1, state.get("optimization_candidates") or 1),
+    )
 
-    THRESHOLD = 75 # Increased threshold for better quality
-    MAX_ITERATIONS = 2
 
-    scorer = MatchScorerAgent()
-    optimizer = CVOptimizerAgent()
+def _best_candidate(candidates, results):
+    best = max(range(len(results)), key=lambda idx: results[idx].score)
+    return candidates[best], results[best]
+
+
+def _successes(outcomes):
+    """Indices of gather(return_exceptions=True) outcomes that succeeded; cancellation propagates."""
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+            raise outcome
+    return [idx for idx, outcome in enumerate(outcomes) if not isinstance(outcome, Exception)]
+
+
+async def _generate_candidates(optimizer, scorer, cv, feedback, job, k, scoring):
+    """Generate K candidates concurrently, score them concurrently, keep the best."""
+    strategies = optimizer.candidate_strategies(k)
+
+    generated = await asyncio.gather(
+        *(
+            optimizer.aoptimize(
+                cv_data=cv,
+                critique=optimizer.with_emphasis(feedback, emphasis),
+                job_data=job,
+                temperature=temperature,
+            )
+            for temperature, emphasis in strategies
+        ),
+        return_exceptions=True,
+    )
+
+    candidates = [generated[idx] for idx in _successes(generated)]
+    if not candidates:
+        raise generated[0]
+
+    # A failed scoring call drops its candidate, like a failed generation
+    results = await asyncio.gather(
+        *(scorer.acalculate_match(candidate, job, **scoring) for candidate in candidates),
+        return_exceptions=True,
+    )
+
+    scored = _successes(results)
+    if not scored:
+        raise results[0]
+
+    candidate, result = _best_candidate(
+        [candidates[idx] for idx in scored],
+        [results[idx] for idx in scored],
+    )
+    return candidate, result, len(scored)
+
+
+async def optimization_node(state: AgentState) -> AgentState:
+    print("🔁 Starting CV Optimization Loop...")
+
+    scorer = get_agent(MatchScorerAgent)
+    optimizer = get_agent(CVOptimizerAgent)
+    threshold, max_iterations, k = _optimization_settings(state)
 
     # Get initial values from state
     current_cv = state["cv_structured"]
     current_score = state.get("match_score", 0)
-    
+
     # We use the initial critique as the starting point
     current_feedback = state.get("critique_feedback", "")
 
     print(f"📊 Initial Score: {current_score}")
 
-    for i in range(MAX_ITERATIONS):
-        print(f"\n⚙️ Optimization attempt {i + 1}")
-
-        # 1. Optimize the CV (This generates the HTML inside the object)
-        optimized_cv = optimizer.optimize(
-            cv_data=current_cv,
-            critique=current_feedback,
-            job_data=state["job_structured"]
-        )
+    for i in range(max_iterations):
+        print(f"\n⚙️ Optimization attempt {i + 1} ({k} candidate(s))")
 
-        # 2. Score the new optimized CV
-        result = scorer.calculate_match(
-            optimized_cv,
-            state["job_structured"]
+        # 1. Optimize the CV and 2. score the new version (best of K)
+        optimized_cv, result, scored = await _generate_candidates(
+            optimizer, scorer, current_cv, current_feedback, state["job_structured"], k,
+            _scoring_settings(state),
         )
 
         print(f"📊 New Score: {result.score}")
+        emit_progress("optimization_iteration", iteration=i + 1, score=result.score, candidates=scored)
 
         # 🔥 Update if score improved
         if result.score >= current_score:
             current_cv = optimized_cv
             current_score = result.score
             state["missing_keywords"] = result.missing_keywords
-            
+
             # Update feedback for the next iteration if we don't hit the threshold
             # This tells the LLM exactly what is still missing for iteration #2
             current_feedback = f"Still missing these keywords: {', '.join(result.missing_keywords)}"
 
-        if current_score >= THRESHOLD:
-            print(f"✅ Target score {THRESHOLD} reached.")
+        if current_score >= threshold:
+            print(f"✅ Target score {threshold} reached.")
             break
 
     # Save the final results back to the state
@@ -207,45 +264,60 @@ def optimization_node(state: AgentState) -> AgentState:
     return state
 
 
-def render_node(state: AgentState) -> AgentState:
+# --------------------------------------------------
+# RENDER NODE
+# --------------------------------------------------
+# template (default): deterministic local renderer | llm: Gemini designer
+RENDER_MODE = os.getenv("RENDER_MODE", "template")
+
+
+def _render_mode(state: AgentState) -> str:
+    return state.get("render_mode") or RENDER_MODE
+
+
+async def render_node(state: AgentState) -> AgentState:
     print("🎨 Rendering final HTML...")
-    optimizer = CVOptimizerAgent()
-    
-    # Generate HTML as a raw string
-    html_string = optimizer.render_html(state["cv_structured"])
-    
-    # Store it in the new state key
-    state["cv_html"] = html_string 
+
+    if _render_mode(state) == "llm":
+        optimizer = get_agent(CVOptimizerAgent)
+        state["cv_html"] = await optimizer.arender_html(state["cv_structured"])
+    else:
+        state["cv_html"] = render_cv_html(state["cv_structured"])
+
     print("✅ HTML CV Rendered Successfully.")
     return state
 
-def pdf_node(state: AgentState) -> AgentState:
+
+# --------------------------------------------------
+# PDF NODE
+# --------------------------------------------------
+async def pdf_node(state: AgentState) -> AgentState:
     print("🛠 Converting HTML to PDF and uploading to Supabase...")
-    
-    # 1. Get HTML from previous render node
+
     html = state.get("cv_html")
     if not html:
         print("❌ No HTML found to generate PDF.")
         return state
 
-    # 2. Run the existing PDF tool
+    # Layout runs in the PDF worker pool, uploads on the async Supabase client
     try:
-        output_path = generate_pdf_from_html(
+        output_path = await agenerate_pdf_from_html(
             html_content=html,
             user_id=state["user_id"],
             job_title=state["job_title"]
         )
-        state["generated_pdf_path"] = output_path # This is the Supabase URL
-        print(f"✅ PDF Uploaded: {output_path}")
     except Exception as e:
         print(f"❌ PDF Generation failed: {e}")
+        raise
 
+    state["generated_pdf_path"] = output_path # This is the Supabase URL
+    print(f"✅ PDF Uploaded: {output_path}")
     return state
 
 # --------------------------------------------------
 # ROUTING
 # --------------------------------------------------
-def route_after_cv(state: AgentState) -> str:
+def route_job_branch(state: AgentState) -> str:
     if state["job_input_type"] in ("title", "url"):
         return "job_hunter"
     return "job_analyzer"
@@ -253,31 +325,24 @@ def route_after_cv(state: AgentState) -> str:
 
 # app/graph/builder.py
 
-def email_node(state: AgentState) -> AgentState:
-    print("📧 Starting email_node...")
-    
-    # job_data is an instance of JobStructured (Pydantic Model)
-    job_data = state["job_structured"] 
-    pdf_url = state.get("generated_pdf_path")
-    user_id = state.get("user_id")
+def _email_recipient(state: AgentState):
     user_email = state.get("user_email")
-    
+
     # FIX: Use dot notation instead of .get()
-    recipient = job_data.contact_email
-    is_backup = False
+    recipient = state["job_structured"].contact_email
 
     if not recipient:
         print(f"⚠️ No company email found. Sending backup to user: {user_email}")
-        recipient = user_email
-        is_backup = True
-    
-    if not pdf_url:
-        print("❌ No CV attachment URL found. Skipping email.")
-        return state
+        return user_email, True
 
-    # Initialize Supabase logging entry
-    log_entry = {
-        "user_id": user_id,
+    return recipient, False
+
+
+def _email_log_entry(state: AgentState, recipient: str) -> dict:
+    job_data = state["job_structured"]
+
+    return {
+        "user_id": state.get("user_id"),
         "company_name": job_data.company or "Unknown Company",
         "company_email": recipient,
         "job_title": job_data.title or "Unknown Position",
@@ -285,29 +350,51 @@ def email_node(state: AgentState) -> AgentState:
         "created_at": datetime.utcnow().isoformat()
     }
 
+
+def _refresh_token_loader(user_id: str):
+    """Fetch + decrypt, deferred until the Gmail session cache actually needs it."""
+    return lambda: python_decrypt(db.fetch_encrypted_refresh_token(user_id))
+
+
+async def _log_email(log_entry: dict) -> None:
     try:
-        # 1. Fetch encrypted refresh token
-        res = supabase.table("google_tokens").select("refresh_token").eq("user_id", user_id).single().execute()
-        
-        if not res.data:
-            raise Exception("Google tokens not found in Supabase.")
-
-        # 2. Decrypt refresh token
-        refresh_token = python_decrypt(res.data['refresh_token'])
-
-        # 3. Draft & Send
-        agent = EmailAgent()
-        draft = agent.draft_email(state["cv_structured"], job_data, is_backup=is_backup)
+        await db.ainsert_email_log(log_entry)
+    except Exception as log_error:
+        print(f"⚠️ Database logging failed: {log_error}")
+
+
+async def email_node(state: AgentState) -> AgentState:
+    print("📧 Starting email_node...")
+
+    # job_data is an instance of JobStructured (Pydantic Model)
+    job_data = state["job_structured"]
+    pdf_url = state.get("generated_pdf_path")
+
+    recipient, is_backup = _email_recipient(state)
+
+    if not pdf_url:
+        print("❌ No CV attachment URL found. Skipping email.")
+        state["email_status"] = "skipped"
+        return state
+
+    # Initialize Supabase logging entry
+    log_entry = _email_log_entry(state, recipient)
+
+    try:
+        # 1. Draft & Send (refresh token is only loaded when no Gmail session is cached)
+        agent = get_agent(EmailAgent)
+        draft = await agent.adraft_email(state["cv_structured"], job_data, is_backup=is_backup)
         log_entry["email_content"] = draft.body
 
-        agent.send_gmail(
+        await agent.asend_gmail(
             draft=draft,
             recipient_email=recipient,
             storage_path=pdf_url,
-            refresh_token=refresh_token,
+            user_id=state.get("user_id"),
+            load_refresh_token=_refresh_token_loader(state.get("user_id")),
             candidate_name=state["cv_structured"].full_name
         )
-        
+
         log_entry["status"] = "sent"
         log_entry["sent_at"] = datetime.utcnow().isoformat()
         print(f"🚀 SUCCESS: Email sent to {recipient}")
@@ -319,26 +406,23 @@ def email_node(state: AgentState) -> AgentState:
         log_entry["error_message"] = error_msg
 
     finally:
-        # 4. Log to Supabase table 'emails_sent'
-        try:
-            supabase.table("emails_sent").insert(log_entry).execute()
-        except Exception as log_error:
-            print(f"⚠️ Database logging failed: {log_error}")
+        # 2. Log to Supabase table 'emails_sent'
+        await _log_email(log_entry)
 
     state["email_draft"] = log_entry.get("email_content")
+    state["email_status"] = log_entry["status"]
     return state
 
 
-
-
 # --------------------------------------------------
 # GRAPH
 # --------------------------------------------------
-def build_graph():
+def _build_pipeline(parse_cv: bool, checkpointer=None):
     graph = StateGraph(AgentState)
 
     graph.add_node("ingest", ingest_input_node)
-    graph.add_node("cv", cv_node)
+    if parse_cv:
+        graph.add_node("cv", cv_node)
     graph.add_node("job_hunter", job_hunter_node)
     graph.add_node("job_analyzer", job_analyzer_node)
     graph.add_node("match", match_scorer_node)
@@ -347,14 +431,16 @@ def build_graph():
     graph.add_node("render", render_node)
     graph.add_node("pdf", pdf_node)
     graph.add_node("email", email_node)
-    
+
     graph.set_entry_point("ingest")
 
-    graph.add_edge("ingest", "cv")
+    # Fan out: CV parsing and job acquisition/analysis are independent
+    if parse_cv:
+        graph.add_edge("ingest", "cv")
 
     graph.add_conditional_edges(
-        "cv",
-        route_after_cv,
+        "ingest",
+        route_job_branch,
         {
             "job_hunter": "job_hunter",
             "job_analyzer": "job_analyzer",
@@ -362,7 +448,13 @@ def build_graph():
     )
 
     graph.add_edge("job_hunter", "job_analyzer")
-    graph.add_edge("job_analyzer", "match")
+
+    # Join: match waits for both branches
+    if parse_cv:
+        graph.add_edge(["cv", "job_analyzer"], "match")
+    else:
+        graph.add_edge("job_analyzer", "match")
+
     graph.add_edge("match", "critique")
     graph.add_edge("critique", "optimize")
     graph.add_edge("optimize", "render")
@@ -370,4 +462,56 @@ def build_graph():
     graph.add_edge("pdf", "email") # Direct pdf -> email
     graph.add_edge("email", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+def build_graph(checkpointer=None):
+    return _build_pipeline(parse_cv=True, checkpointer=checkpointer)
+
+
+def build_job_graph(checkpointer=None):
+    """
+    Per-job pipeline used by batch runs: expects `cv_structured`
+    to be present in the input state and never re-parses the CV.
+    """
+    return _build_pipeline(parse_cv=False, checkpointer=checkpointer)
+
+
+# --------------------------------------------------
+# COMPILED GRAPH SINGLETONS
+# --------------------------------------------------
+_compiled_graphs = {}
+_graph_lock = threading.Lock()
+_checkpointer = None
+
+
+def configure_checkpointer(checkpointer) -> None:
+    """
+    Recompile the shared graphs with `checkpointer` (see app.graph.checkpoint).
+    Once set, every invocation must pass a thread_id (the run ID).
+    """
+    global _checkpointer
+
+    with _graph_lock:
+        _checkpointer = checkpointer
+        _compiled_graphs.clear()
+
+
+def _get_compiled(name: str, factory):
+    graph = _compiled_graphs.get(name)
+    if graph is None:
+        with _graph_lock:
+            if name not in _compiled_graphs:
+                _compiled_graphs[name] = factory()
+            graph = _compiled_graphs[name]
+    return graph
+
+
+def get_graph():
+    """Compile the pipeline once per process and reuse it everywhere (async: ainvoke/astream)."""
+    return _get_compiled("pipeline", lambda: build_graph(_checkpointer))
+
+
+def get_job_graph():
+    """Compiled per-job pipeline shared by every batch run."""
+    return _get_compiled("job", lambda: build_job_graph(_checkpointer))
@@ -0,0 +1,212 @@
+# app/graph/checkpoint.py
+
+import os
+import time
+import asyncio
+import inspect
+import pkgutil
+import importlib
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+# sqlite (default) | postgres | memory | none
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+# File path for sqlite, connection string for postgres
+CHECKPOINT_DSN = os.getenv("CHECKPOINT_DSN", "checkpoints.sqlite")
+# Checkpoints hold full CV and job payloads: a run's thread is deleted once its
+# newest checkpoint is this old (it can no longer be resumed). 0 keeps them forever.
+CHECKPOINT_TTL_DAYS = float(os.getenv("CHECKPOINT_TTL_DAYS", "7"))
+CHECKPOINT_SWEEP_INTERVAL = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL", "3600"))
+
+# 100-ns intervals between the UUID epoch (1582-10-15) and the Unix epoch
+_UUID_EPOCH = 0x01B21DD213814000
+
+# Nodes a finished run can be replayed from
+RESUMABLE_NODES = ("match", "critique", "optimize", "render", "pdf", "email")
+
+
+def _schema_types() -> List[Tuple[str, str]]:
+    """(module, class) of every pydantic model in app.schemas, e.g. CVStructured in the state."""
+    from pydantic import BaseModel
+
+    import app.schemas
+
+    types = []
+    for info in pkgutil.iter_modules(app.schemas.__path__, "app.schemas."):
+        module = importlib.import_module(info.name)
+        for obj in vars(module).values():
+            if inspect.isclass(obj) and issubclass(obj, BaseModel) and obj.__module__ == module.__name__:
+                types.append((obj.__module__, obj.__name__))
+    return types
+
+
+def checkpoint_serializer():
+    """
+    JsonPlusSerializer that may revive the app's schema models, so resumed
+    runs get CVStructured/JobStructured back (not dicts), also under
+    LANGGRAPH_STRICT_MSGPACK=true.
+    """
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    # LangGraph's own safe types (messages, Send, ...) are always allowed on top
+    return JsonPlusSerializer(allowed_msgpack_modules=_schema_types())
+
+
+@asynccontextmanager
+async def open_checkpointer(
+    backend: str = CHECKPOINT_BACKEND,
+    dsn: str = CHECKPOINT_DSN,
+    ttl_days: float = CHECKPOINT_TTL_DAYS,
+) -> AsyncIterator[Optional[Any]]:
+    """
+    Open the configured LangGraph checkpointer for the lifetime of the app.
+    Every backend exposes the same BaseCheckpointSaver interface. While it is
+    open, threads older than `ttl_days` are expired in the background.
+    """
+    async with _open_saver(backend, dsn) as saver:
+        sweeper = None
+        if saver is not None and ttl_days > 0:
+            sweeper = asyncio.create_task(_sweep(saver, backend, ttl_days * 86400))
+        try:
+            yield saver
+        finally:
+            if sweeper is not None:
+                sweeper.cancel()
+                with suppress(asyncio.CancelledError):
+                    await sweeper
+
+
+@asynccontextmanager
+async def _open_saver(backend: str, dsn: str) -> AsyncIterator[Optional[Any]]:
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        # from_conn_string takes no serializer
+        async with aiosqlite.connect(dsn) as conn:
+            yield AsyncSqliteSaver(conn, serde=checkpoint_serializer())
+
+    elif backend == "postgres":
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        async with AsyncPostgresSaver.from_conn_string(dsn, serde=checkpoint_serializer()) as saver:
+            await saver.setup()
+            yield saver
+
+    elif backend == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+
+        yield MemorySaver(serde=checkpoint_serializer())
+
+    elif backend == "none":
+        yield None
+
+    else:
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+
+
+# --------------------------------------
+# RETENTION
+# --------------------------------------
+def _checkpoint_time(checkpoint_id: str) -> Optional[float]:
+    """Unix time encoded in a LangGraph checkpoint ID (a UUIDv6)."""
+    from langgraph.checkpoint.base.id import UUID
+
+    try:
+        uid = UUID(checkpoint_id)
+    except ValueError:
+        return None
+    if uid.version != 6:
+        return None
+    return (uid.time - _UUID_EPOCH) / 10_000_000
+
+
+async def _latest_checkpoints(saver, backend: str) -> Dict[str, str]:
+    """thread_id -> newest checkpoint ID, without loading any checkpoint payload."""
+    query = "SELECT thread_id, MAX(checkpoint_id) AS checkpoint_id FROM checkpoints GROUP BY thread_id"
+
+    if backend == "sqlite":
+        await saver.setup()
+        async with saver.lock, saver.conn.execute(query) as cur:
+            return {thread_id: checkpoint_id for thread_id, checkpoint_id in await cur.fetchall()}
+
+    if backend == "postgres":
+        async with saver._cursor() as cur:
+            await cur.execute(query)
+            return {row["thread_id"]: row["checkpoint_id"] for row in await cur.fetchall()}
+
+    if backend == "memory":
+        return {
+            thread_id: max(checkpoint_id for checkpoints in namespaces.values() for checkpoint_id in checkpoints)
+            for thread_id, namespaces in list(saver.storage.items())
+            if any(namespaces.values())
+        }
+
+    raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+
+
+async def expire_checkpoints(saver, backend: str, max_age: float) -> List[str]:
+    """Delete every thread whose newest checkpoint is older than `max_age` seconds."""
+    cutoff = time.time() - max_age
+    expired = []
+
+    for thread_id, checkpoint_id in (await _latest_checkpoints(saver, backend)).items():
+        created = _checkpoint_time(checkpoint_id)
+        if created is not None and created < cutoff:
+            await saver.adelete_thread(thread_id)
+            expired.append(thread_id)
+
+    return expired
+
+
+async def _sweep(saver, backend: str, max_age: float) -> None:
+    while True:
+        try:
+            expired = await expire_checkpoints(saver, backend, max_age)
+            if expired:
+                print(f"🧹 Expired checkpoints of {len(expired)} run(s)")
+        except Exception as e:
+            print(f"⚠️ Checkpoint cleanup failed: {e}")
+        await asyncio.sleep(CHECKPOINT_SWEEP_INTERVAL)
+
+
+def run_config(run_id: str) -> Dict[str, Any]:
+    """Graph config that keys checkpoints by run ID."""
+    return {"configurable": {"thread_id": run_id}}
+
+
+async def resume_run(graph, run_id: str, from_node: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Continue a checkpointed run without repeating completed nodes.
+
+    - Interrupted run (a node raised): continue from the failed node.
+    - Finished run: replay from `from_node`, or from `email` when the
+      previous email attempt failed.
+    """
+    config = run_config(run_id)
+    snapshot = await graph.aget_state(config)
+
+    if not snapshot.values:
+        raise KeyError(f"No checkpoint found for run {run_id}")
+
+    if snapshot.next and from_node is None:
+        print(f"♻️ Resuming run {run_id} at {', '.join(snapshot.next)}")
+        return await graph.ainvoke(None, config)
+
+    if from_node is None:
+        if snapshot.values.get("email_status") != "failed":
+            print(f"ℹ️ Run {run_id} already completed, nothing to resume.")
+            return snapshot.values
+        from_node = "email"
+
+    if from_node not in RESUMABLE_NODES:
+        raise ValueError(f"Cannot resume from node: {from_node}")
+
+    # Newest first: the latest checkpoint scheduled to run `from_node`
+    async for past in graph.aget_state_history(config):
+        if from_node in past.next:
+            print(f"♻️ Replaying run {run_id} from {from_node}")
+            return await graph.ainvoke(None, past.config)
+
+    raise ValueError(f"Run {run_id} never reached node: {from_node}")
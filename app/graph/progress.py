@@ -0,0 +1,88 @@
+# app/graph/progress.py
+
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langgraph.config import get_stream_writer
+
+
+# State keys surfaced on node_finished events (everything else stays server-side)
+PROGRESS_KEYS = (
+    "job_input_type",
+    "selected_job_url",
+    "match_score",
+    "missing_keywords",
+    "critique_feedback",
+    "generated_pdf_path",
+)
+
+
+def emit_progress(event: str, **data: Any) -> None:
+    """
+    Push a custom progress event from inside a node. No-op when the graph
+    is not being streamed with the "custom" mode.
+    """
+    try:
+        writer = get_stream_writer()
+    except Exception:
+        return
+
+    writer({"event": event, **data})
+
+
+async def stream_progress(
+    graph,
+    state: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run `graph` and yield progress events:
+    node_started / node_finished (with duration_ms), custom node events,
+    then a final `completed` event carrying the final state.
+    """
+    started: Dict[str, float] = {}
+    final_state: Dict[str, Any] = {}
+    run_started = time.perf_counter()
+
+    async for mode, chunk in graph.astream(
+        state,
+        config=config,
+        stream_mode=["debug", "custom", "values"],
+    ):
+        if mode == "values":
+            final_state = chunk
+            continue
+
+        if mode == "custom":
+            yield chunk
+            continue
+
+        # ---------- debug: task lifecycle ----------
+        payload = chunk.get("payload", {})
+        node = payload.get("name")
+
+        if chunk.get("type") == "task":
+            started[payload.get("id")] = time.perf_counter()
+            yield {"event": "node_started", "node": node, "step": chunk.get("step")}
+
+        elif chunk.get("type") == "task_result":
+            begin = started.pop(payload.get("id"), None)
+            duration_ms = round((time.perf_counter() - begin) * 1000) if begin else None
+
+            writes = dict(payload.get("result") or [])
+            event = {
+                "event": "node_finished",
+                "node": node,
+                "duration_ms": duration_ms,
+                "updates": {k: writes[k] for k in PROGRESS_KEYS if k in writes},
+            }
+            if payload.get("error"):
+                event["error"] = str(payload["error"])
+
+            yield event
+
+    yield {
+        "event": "completed",
+        "duration_ms": round((time.perf_counter() - run_started) * 1000),
+        "state": final_state,
+    }
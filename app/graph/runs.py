@@ -0,0 +1,256 @@
+# app/graph/runs.py
+
+import os
+import uuid
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.graph.builder import get_graph, get_job_graph
+from app.graph.checkpoint import resume_run, run_config
+from app.state import AgentState
+
+
+# Size these against the Gemini quota: each worker runs one pipeline at a time
+RUN_WORKERS = int(os.getenv("RUN_WORKERS", "4"))
+RUN_QUEUE_SIZE = int(os.getenv("RUN_QUEUE_SIZE", "100"))
+# Finished runs kept in memory for polling before the oldest are dropped
+RUN_HISTORY_LIMIT = int(os.getenv("RUN_HISTORY_LIMIT", "1000"))
+WEBHOOK_TIMEOUT = float(os.getenv("RUN_WEBHOOK_TIMEOUT", "10"))
+# Webhooks are POSTed from inside the server, so only these hosts may receive
+# them (".example.com" also matches subdomains). Empty disables webhooks.
+RUN_WEBHOOK_HOSTS = tuple(
+    h.strip().lower() for h in os.getenv("RUN_WEBHOOK_HOSTS", "").split(",") if h.strip()
+)
+RUN_WEBHOOK_SCHEMES = tuple(
+    s.strip().lower() for s in os.getenv("RUN_WEBHOOK_SCHEMES", "https").split(",") if s.strip()
+)
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class RunConflictError(RuntimeError):
+    """The run is still queued or running."""
+
+
+class WebhookNotAllowedError(ValueError):
+    pass
+
+
+def validate_webhook_url(
+    url: Optional[str],
+    hosts: Optional[Tuple[str, ...]] = None,
+    schemes: Optional[Tuple[str, ...]] = None,
+) -> Optional[str]:
+    """Return `url` if it targets an allowed scheme and host, else raise WebhookNotAllowedError."""
+    if not url:
+        return None
+
+    hosts = RUN_WEBHOOK_HOSTS if hosts is None else hosts
+    schemes = RUN_WEBHOOK_SCHEMES if schemes is None else schemes
+
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        parts.port  # raises ValueError on a malformed port
+    except ValueError:
+        raise WebhookNotAllowedError("Malformed webhook_url")
+
+    if parts.scheme.lower() not in schemes:
+        raise WebhookNotAllowedError(f"webhook_url scheme must be one of: {', '.join(schemes)}")
+    if parts.username or parts.password:
+        raise WebhookNotAllowedError("webhook_url must not contain credentials")
+    if not host or not any(
+        host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+        for allowed in hosts
+    ):
+        raise WebhookNotAllowedError(f"webhook_url host is not allowed: {host or '?'}")
+
+    return url.strip()
+
+
+@dataclass
+class RunRecord:
+    run_id: str
+    state: AgentState
+    webhook_url: Optional[str] = None
+    # Set when the record re-runs an existing checkpointed run
+    resume: bool = False
+    resume_from: Optional[str] = None
+    # Batch job runs are checkpointed by the per-job graph
+    job_graph: bool = False
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class RunManager:
+    """
+    In-process worker pool for submitted pipeline runs.
+    `serialize` turns the final graph state into the JSON-safe result
+    stored on the record and sent to the webhook.
+    """
+
+    def __init__(
+        self,
+        serialize: Callable[[dict], Dict[str, Any]],
+        workers: int = RUN_WORKERS,
+        queue_size: int = RUN_QUEUE_SIZE,
+        history_limit: int = RUN_HISTORY_LIMIT,
+    ):
+        self.serialize = serialize
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.history_limit = history_limit
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._runs: "OrderedDict[str, RunRecord]" = OrderedDict()
+
+    # --------------------------------------
+    # LIFECYCLE
+    # --------------------------------------
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.workers)
+        ]
+        print(f"🧵 Run workers started: {self.workers} (queue size {self.queue_size})")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --------------------------------------
+    # PUBLIC API
+    # --------------------------------------
+    def submit(self, state: AgentState, webhook_url: Optional[str] = None) -> RunRecord:
+        record = RunRecord(
+            run_id=uuid.uuid4().hex,
+            state=state,
+            webhook_url=validate_webhook_url(webhook_url),
+        )
+        return self._enqueue(record)
+
+    def submit_resume(
+        self,
+        run_id: str,
+        from_node: Optional[str] = None,
+        webhook_url: Optional[str] = None,
+        job_graph: bool = False,
+    ) -> RunRecord:
+        """
+        Queue a checkpoint resume; the record replaces any previous finished
+        one for `run_id`. Raises RunConflictError while the run is still active.
+        """
+        record = RunRecord(
+            run_id=run_id,
+            state={},
+            webhook_url=validate_webhook_url(webhook_url),
+            resume=True,
+            resume_from=from_node,
+            job_graph=job_graph,
+        )
+        return self._enqueue(record)
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        return self._runs.get(run_id)
+
+    # --------------------------------------
+    # INTERNALS
+    # --------------------------------------
+    def _enqueue(self, record: RunRecord) -> RunRecord:
+        if self._queue is None:
+            raise RuntimeError("RunManager is not started")
+
+        # Two runs on one checkpoint thread would interleave their writes
+        previous = self._runs.get(record.run_id)
+        if previous is not None and previous.status in ("queued", "running"):
+            raise RunConflictError(f"Run {record.run_id} is still {previous.status}")
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            raise QueueFullError("Run queue is full, try again later")
+
+        self._runs.pop(record.run_id, None)
+        self._remember(record)
+        return record
+
+    def _remember(self, record: RunRecord) -> None:
+        self._runs[record.run_id] = record
+
+        while len(self._runs) > self.history_limit:
+            oldest_id, oldest = next(iter(self._runs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            self._runs.pop(oldest_id)
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            record = await self._queue.get()
+            try:
+                await self._execute(record)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, record: RunRecord) -> None:
+        record.status = "running"
+        record.started_at = datetime.utcnow().isoformat()
+        print(f"🚀 Run {record.run_id} started")
+
+        try:
+            graph = get_job_graph() if record.job_graph else get_graph()
+
+            if record.resume:
+                result = await resume_run(graph, record.run_id, record.resume_from)
+            else:
+                result = await graph.ainvoke(record.state, config=run_config(record.run_id))
+            record.result = self.serialize(result)
+            record.status = "succeeded"
+
+        except Exception as e:
+            print(f"❌ Run {record.run_id} failed: {e}")
+            record.error = str(e)
+            record.status = "failed"
+
+        finally:
+            record.finished_at = datetime.utcnow().isoformat()
+            # Inputs are no longer needed once the run is over
+            record.state = {}
+
+        if record.webhook_url:
+            await self._notify(record)
+
+    async def _notify(self, record: RunRecord) -> None:
+        try:
+            # Redirects are not followed: they could leave the allowed hosts
+            async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, follow_redirects=False) as client:
+                response = await client.post(record.webhook_url, json=record.to_dict())
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ Webhook delivery failed for run {record.run_id}: {e}")
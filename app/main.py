@@ -3,8 +3,11 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from app.graph.builder import build_graph
+import asyncio
+
+from app.graph.builder import get_graph
 from app.state import AgentState
+from app.utils import db, http
 
 from app.tools.pdf_generator import generate_pdf_from_html
 
@@ -13,8 +16,16 @@ from app.tools.pdf_generator import generate_pdf_from_html
 
 # ... (imports stay same) ...
 
+async def run_pipeline(state: AgentState) -> AgentState:
+    """One event loop for the whole run: the graph nodes are async-only."""
+    try:
+        return await get_graph().ainvoke(state)
+    finally:
+        await db.aclose()
+        await http.aclose()
+
+
 def main():
-    graph = build_graph()
     job_input = input("Enter job title / URL / job description:\n").strip()
 
     state: AgentState = {
@@ -53,7 +64,7 @@ email : islamelsohrb@gmail.com
     # ==========================
     # RUN PIPELINE (PDF & Email happen inside)
     # ==========================
-    result = graph.invoke(state)
+    result = asyncio.run(run_pipeline(state))
 
     # ==========================
     # FINAL OUTPUT
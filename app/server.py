@@ -1,16 +1,53 @@
 import os
+import json
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 # Import your graph and state
-from app.graph.builder import build_graph
+from app.graph.builder import get_graph, configure_checkpointer
+from app.graph.checkpoint import open_checkpointer, run_config
+from app.graph.batch import run_batch
+from app.graph.runs import RunManager, QueueFullError, RunConflictError, WebhookNotAllowedError
+from app.graph.progress import stream_progress
 from app.state import AgentState
+from app.utils.cache import cache_stats
+from app.tools.pdf_renderer import start_pdf_pool, shutdown_pdf_pool
+from app.tools.pdf_parser import shutdown_parse_pool
+from app.utils import db, http
 
-app = FastAPI(title="AI Career Automation API")
+
+def _serialize_result(result: dict) -> dict:
+    return _to_response(result).model_dump()
+
+
+run_manager = RunManager(serialize=_serialize_result)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(start_pdf_pool)
+    async with open_checkpointer() as checkpointer:
+        configure_checkpointer(checkpointer)
+        await run_manager.start()
+        yield
+        await run_manager.stop()
+        configure_checkpointer(None)
+    await asyncio.to_thread(shutdown_pdf_pool)
+    await asyncio.to_thread(shutdown_parse_pool)
+    await db.aclose()
+    await http.aclose()
+
+
+app = FastAPI(title="AI Career Automation API", lifespan=lifespan)
 
 # ✅ Enable CORS for your Next.js frontend
 app.add_middleware(
@@ -23,60 +60,262 @@ app.add_middleware(
 
 # --- API Schemas ---
 
-class OptimizationRequest(BaseModel):
+class OptimizationOptions(BaseModel):
+    # Optimization loop overrides; None keeps the pipeline defaults
+    match_threshold: Optional[int] = Field(default=None, ge=0, le=100)
+    max_iterations: Optional[int] = Field(default=None, ge=1, le=5)
+    optimization_candidates: Optional[int] = Field(default=None, ge=1, le=8)
+    # llm | local | gated (local engine, LLM only near the threshold)
+    scoring_mode: Optional[Literal["llm", "local", "gated"]] = None
+    # template (default, local) | llm (Gemini designer)
+    render_mode: Optional[Literal["template", "llm"]] = None
+
+    def overrides(self) -> dict:
+        return self.model_dump(
+            include={"match_threshold", "max_iterations", "optimization_candidates", "scoring_mode", "render_mode"},
+            exclude_none=True,
+        )
+
+class OptimizationRequest(OptimizationOptions):
     user_id: str
     user_email: str
     cv_file_path: str  # This can be a local path or a Supabase URL
+    cv_id: Optional[str] = None  # `cvs` row to cache the parsed CV on
     job_input: str
     job_title: Optional[str] = "Machine Learning Engineer"
+    # "async" enqueues the run and returns a run ID immediately
+    mode: Literal["sync", "async"] = "sync"
+    webhook_url: Optional[str] = None
 
 class OptimizationResponse(BaseModel):
+    run_id: Optional[str] = None
     status: str
     match_score: int
     missing_keywords: List[str]
     pdf_url: Optional[str]
     email_sent: bool
+    # sent | failed (POST /api/runs/{run_id}/resume retries the send) | skipped
+    email_status: Optional[Literal["sent", "failed", "skipped"]] = None
     email_draft: Optional[str]
 
+class RunSubmission(BaseModel):
+    run_id: str
+    status: str
+    status_url: str
+
+class RunStatus(BaseModel):
+    run_id: str
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
+
+class ResumeRequest(BaseModel):
+    # Replay a finished run from this node (e.g. "email"); default: failed node
+    from_node: Optional[str] = None
+    webhook_url: Optional[str] = None
+    # True for run IDs returned by /api/optimize/batch
+    batch_job: bool = False
+
+class BatchJob(BaseModel):
+    job_input: str
+    job_title: Optional[str] = None
+
+class BatchOptimizationRequest(OptimizationOptions):
+    user_id: str
+    user_email: str
+    cv_file_path: str
+    cv_id: Optional[str] = None
+    jobs: List[BatchJob] = Field(min_length=1)
+    job_title: Optional[str] = "Machine Learning Engineer"
+    max_concurrency: Optional[int] = None
+
+class BatchJobResponse(BaseModel):
+    index: int
+    run_id: Optional[str] = None
+    job_input: str
+    status: str
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
+
+
+def _to_response(result: dict, run_id: Optional[str] = None) -> OptimizationResponse:
+    return OptimizationResponse(
+        run_id=run_id,
+        status="success",
+        match_score=result.get("match_score", 0),
+        missing_keywords=result.get("missing_keywords", []),
+        pdf_url=result.get("generated_pdf_path"),
+        email_sent=result.get("email_status") == "sent",
+        email_status=result.get("email_status"),
+        email_draft=result.get("email_draft")
+    )
+
 # --- Endpoints ---
 
+def _initial_state(request: OptimizationRequest) -> AgentState:
+    # Note: If cv_file_path is a URL, ensure your CVAgent can handle URLs
+    return {
+        "cv_file_path": request.cv_file_path,
+        "cv_id": request.cv_id,
+        "job_input": request.job_input,
+        "user_id": request.user_id,
+        "user_email": request.user_email,
+        "job_title": request.job_title,
+        **request.overrides(),
+    }
+
 @app.post("/api/optimize", response_model=OptimizationResponse)
 async def optimize_cv(request: OptimizationRequest):
+    # ---------- Submit mode ----------
+    if request.mode == "async":
+        try:
+            record = run_manager.submit(_initial_state(request), webhook_url=request.webhook_url)
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        except WebhookNotAllowedError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        print(f"📥 Queued run {record.run_id} for user: {request.user_id}")
+        submission = RunSubmission(
+            run_id=record.run_id,
+            status=record.status,
+            status_url=f"/api/runs/{record.run_id}",
+        )
+        return JSONResponse(status_code=202, content=submission.model_dump())
+
+    # Checkpoints are keyed by run ID so a failed run can be resumed
+    run_id = uuid.uuid4().hex
+
     try:
-        # 1. Initialize Graph
-        graph = build_graph()
+        # 1. Reuse the process-wide compiled graph
+        graph = get_graph()
 
         # 2. Prepare Initial State
-        # Note: If cv_file_path is a URL, ensure your CVAgent can handle URLs
-        initial_state: AgentState = {
-            "cv_file_path": request.cv_file_path,
-            "job_input": request.job_input,
-            "user_id": request.user_id,
-            "user_email": request.user_email,
-            "job_title": request.job_title,
-        }
+        initial_state = _initial_state(request)
 
         # 3. Run Pipeline
-        print(f"🚀 Starting pipeline for user: {request.user_id}")
-        result = graph.invoke(initial_state)
+        print(f"🚀 Starting pipeline for user: {request.user_id} (run {run_id})")
+        result = await graph.ainvoke(initial_state, config=run_config(run_id))
 
         # 4. Format Response
-        return OptimizationResponse(
-            status="success",
-            match_score=result.get("match_score", 0),
-            missing_keywords=result.get("missing_keywords", []),
-            pdf_url=result.get("generated_pdf_path"),
-            email_sent=True if result.get("email_draft") else False,
-            email_draft=result.get("email_draft")
-        )
+        return _to_response(result, run_id)
 
     except Exception as e:
         print(f"❌ API Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail={"error": str(e), "run_id": run_id})
+
+def _sse(event: dict) -> str:
+    name = event.get("event", "message")
+    return f"event: {name}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+
+@app.post("/api/optimize/stream")
+async def optimize_cv_stream(request: OptimizationRequest):
+    """
+    Server-Sent Events: node_started / node_finished (with duration_ms),
+    optimization_iteration scores, then `completed` with the final response.
+
+    POST only, so a browser `EventSource` (GET-only) cannot consume it:
+    read the body with fetch() streaming (see README "Progress Streaming").
+    """
+    run_id = uuid.uuid4().hex
+
+    async def stream():
+        yield _sse({"event": "run_started", "run_id": run_id})
+        try:
+            async for event in stream_progress(
+                get_graph(), _initial_state(request), config=run_config(run_id)
+            ):
+                if event["event"] == "completed":
+                    event = {
+                        "event": "completed",
+                        "duration_ms": event["duration_ms"],
+                        "result": _to_response(event["state"], run_id).model_dump(),
+                    }
+                yield _sse(event)
+
+        except Exception as e:
+            print(f"❌ Stream API Error: {str(e)}")
+            yield _sse({"event": "error", "detail": str(e)})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/runs/{run_id}", response_model=RunStatus)
+async def get_run(run_id: str):
+    record = run_manager.get(run_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return RunStatus(**record.to_dict())
+
+@app.post("/api/runs/{run_id}/resume", status_code=202, response_model=RunSubmission)
+async def resume_run_endpoint(run_id: str, request: ResumeRequest):
+    """
+    Re-run only the failed tail of a checkpointed run
+    (e.g. pdf or email) without repeating the LLM stages.
+    """
+    try:
+        record = run_manager.submit_resume(
+            run_id,
+            from_node=request.from_node,
+            webhook_url=request.webhook_url,
+            job_graph=request.batch_job,
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except RunConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except WebhookNotAllowedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RunSubmission(
+        run_id=record.run_id,
+        status=record.status,
+        status_url=f"/api/runs/{record.run_id}",
+    )
+
+@app.post("/api/optimize/batch")
+async def optimize_cv_batch(request: BatchOptimizationRequest):
+    """
+    One CV against many postings. The CV is parsed once; results are
+    streamed back as NDJSON (one BatchJobResponse per line) as each job finishes.
+    """
+    async def stream():
+        try:
+            async for item in run_batch(
+                cv_file_path=request.cv_file_path,
+                cv_id=request.cv_id,
+                jobs=[job.model_dump() for job in request.jobs],
+                user_id=request.user_id,
+                user_email=request.user_email,
+                default_job_title=request.job_title,
+                max_concurrency=request.max_concurrency,
+                overrides=request.overrides(),
+            ):
+                response = BatchJobResponse(
+                    index=item["index"],
+                    run_id=item["run_id"],
+                    job_input=item["job_input"],
+                    status=item["status"],
+                    result=_to_response(item["result"], item["run_id"]) if "result" in item else None,
+                    error=item.get("error"),
+                )
+                yield response.model_dump_json() + "\n"
+
+        except Exception as e:
+            print(f"❌ Batch API Error: {str(e)}")
+            yield json.dumps({"status": "failed", "error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "caches": cache_stats(), "fetch": http.fetch_stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,15 @@
-from typing import TypedDict, List, Dict, Any, Optional, Literal
+from typing import TypedDict, List, Dict, Any, Optional, Literal, Annotated
+
+
+def merge_branch(left: Any, right: Any) -> Any:
+    """
+    Reducer for keys written by the parallel CV / job branches.
+    Keeps the newest non-empty value so concurrent updates merge:
+    None, "", {} and [] never overwrite an existing value (0 / False do).
+    """
+    if right is None or (isinstance(right, (str, dict, list)) and not right):
+        return left
+    return right
 
 
 class AgentState(TypedDict, total=False):
@@ -6,14 +17,17 @@ class AgentState(TypedDict, total=False):
     # 🔹 USER INPUT
     # ======================================================
     cv_file_path: str
+    # Optional `cvs` row ID: the parsed CV is cached in its structured_data
+    cv_id: Optional[str]
     job_input: str
     user_id: str
+    user_email: str
     job_title: str
 
     # ======================================================
     # 🔹 JOB INPUT DETECTION
     # ======================================================
-    job_input_type: Literal["title", "url", "text"]
+    job_input_type: Annotated[Literal["title", "url", "text"], merge_branch]
     is_job_link: bool
 
     # ======================================================
@@ -21,24 +35,26 @@ class AgentState(TypedDict, total=False):
     # ======================================================
     job_search_results: List[Dict[str, str]]
     selected_job_index: Optional[int]
-    selected_job_url: Optional[str]
+    selected_job_url: Annotated[Optional[str], merge_branch]
 
     # ======================================================
     # 🔹 RAW TEXT
     # ======================================================
-    raw_job_text: Optional[str]
+    raw_job_text: Annotated[Optional[str], merge_branch]
 
     # ======================================================
     # 🔹 STRUCTURED DATA
     # ======================================================
-    cv_structured: Dict[str, Any]
-    job_structured: Dict[str, Any]
+    cv_structured: Annotated[Dict[str, Any], merge_branch]
+    job_structured: Annotated[Dict[str, Any], merge_branch]
 
     # ======================================================
     # 🔹 MATCHING
     # ======================================================
     match_score: int
     missing_keywords: List[str]
+    scoring_mode: Optional[Literal["llm", "local", "gated"]]
+    render_mode: Optional[Literal["template", "llm"]]
 
     # ======================================================
     # 🔹 OPTIMIZATION LOOP
@@ -47,6 +63,11 @@ class AgentState(TypedDict, total=False):
     revision_count: int
     critique_feedback: List[str]
 
+    # Per-request loop settings (defaults live in app/graph/builder.py)
+    match_threshold: Optional[int]
+    max_iterations: Optional[int]
+    optimization_candidates: Optional[int]  # K speculative candidates per round
+
     # ======================================================
     # 🔹 FINAL OUTPUTS
     # ======================================================
@@ -54,6 +75,7 @@ class AgentState(TypedDict, total=False):
     cv_html: str
     generated_pdf_path: Optional[str]
     email_draft: Optional[str]
+    email_status: Optional[Literal["sent", "failed", "skipped"]]
 
     # ======================================================
     # 🔹 HUMAN IN LOOP
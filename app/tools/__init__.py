@@ -1 +1 @@
-from .pdf_parser import extract_text_from_pdf
\ No newline at end of file
+from .pdf_parser import extract_pdf, extract_text_from_pdf
\ No newline at end of file
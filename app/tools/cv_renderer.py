@@ -1,146 +1,154 @@
-# def render_cv_html(cv):
-#     if hasattr(cv, "model_dump"):
-#         data = cv.model_dump()
-#     else:
-#         data = cv
-
-#     skills = data.get("skills", [])
-#     experience = data.get("experience", [])
-#     education = data.get("education", [])
-#     projects = data.get("projects", [])
-
-#     return f"""
-# <!DOCTYPE html>
-# <html lang="en">
-# <head>
-# <meta charset="UTF-8">
-# <title>{data.get("full_name", "")} - CV</title>
-
-# <script src="https://cdn.tailwindcss.com"></script>
-
-# <style>
-# @page {{
-#     size: A4;
-#     margin: 16mm;
-# }}
-
-# body {{
-#     font-family: ui-sans-serif, system-ui, -apple-system;
-# }}
-# </style>
-
-# </head>
-
-# <body class="bg-white text-gray-800">
-
-# <div class="max-w-[820px] mx-auto px-10 py-10 text-[13px] leading-relaxed">
-
-#     <!-- Header -->
-#     <header class="mb-8">
-#         <h1 class="text-3xl font-bold tracking-tight">
-#             {data.get("full_name", "")}
-#         </h1>
-#         <p class="text-gray-500 mt-2 text-sm">
-#             {data.get("contact", {}).get("email", "")} •
-#             {data.get("contact", {}).get("phone", "")} •
-#             {data.get("contact", {}).get("location", "")}
-#         </p>
-#     </header>
-
-#     <!-- Summary -->
-#     <section class="mb-8">
-#         <h2 class="text-sm font-semibold uppercase tracking-widest text-gray-600 mb-3">
-#             Profile
-#         </h2>
-#         <p class="text-gray-700">
-#             {data.get("summary", "")}
-#         </p>
-#     </section>
-
-#     <!-- Skills as Compact Paragraph Instead of List -->
-#     <section class="mb-8">
-#         <h2 class="text-sm font-semibold uppercase tracking-widest text-gray-600 mb-3">
-#             Core Skills
-#         </h2>
-#         <p class="text-gray-700">
-#             {", ".join(skills)}
-#         </p>
-#     </section>
-
-#     <!-- Experience -->
-#     <section class="mb-8">
-#         <h2 class="text-sm font-semibold uppercase tracking-widest text-gray-600 mb-4">
-#             Professional Experience
-#         </h2>
-
-#         {''.join(f'''
-#             <div class="mb-6">
-#                 <div class="flex justify-between items-baseline">
-#                     <p class="font-semibold text-gray-900">
-#                         {exp.get("title", "")}
-#                     </p>
-#                     <span class="text-xs text-gray-500">
-#                         {exp.get("duration", "")}
-#                     </span>
-#                 </div>
-
-#                 <p class="text-gray-600 mb-2">
-#                     {exp.get("company", "")}
-#                 </p>
-
-#                 <ul class="list-disc pl-5 space-y-1 text-gray-700">
-#                     {''.join(f"<li>{point}</li>" for point in exp.get("description", [])) if isinstance(exp.get("description"), list)
-#                     else f"<li>{exp.get('description','')}</li>"}
-#                 </ul>
-#             </div>
-#         ''' for exp in experience if isinstance(exp, dict))}
-#     </section>
-
-#     <!-- Projects -->
-#     <section class="mb-8">
-#         <h2 class="text-sm font-semibold uppercase tracking-widest text-gray-600 mb-4">
-#             Selected Projects
-#         </h2>
-
-#         {''.join(f'''
-#             <div class="mb-6">
-#                 <div class="flex justify-between items-baseline">
-#                     <p class="font-semibold text-gray-900">
-#                         {proj.get("title","")}
-#                     </p>
-#                     <span class="text-xs text-gray-500">
-#                         {proj.get("duration","")}
-#                     </span>
-#                 </div>
-
-#                 <ul class="list-disc pl-5 space-y-1 text-gray-700 mt-2">
-#                     {''.join(f"<li>{point}</li>" for point in proj.get("description", [])) if isinstance(proj.get("description"), list)
-#                     else f"<li>{proj.get('description','')}</li>"}
-#                 </ul>
-#             </div>
-#         ''' for proj in projects if isinstance(proj, dict))}
-#     </section>
-
-#     <!-- Education -->
-#     <section>
-#         <h2 class="text-sm font-semibold uppercase tracking-widest text-gray-600 mb-4">
-#             Education
-#         </h2>
-
-#         {''.join(f'''
-#             <div class="mb-4">
-#                 <p class="font-semibold text-gray-900">
-#                     {edu.get("degree", "")}
-#                 </p>
-#                 <p class="text-gray-600 text-sm">
-#                     {edu.get("institution", "")} • {edu.get("year", "")}
-#                 </p>
-#             </div>
-#         ''' for edu in education if isinstance(edu, dict))}
-#     </section>
-
-# </div>
-
-# </body>
-# </html>
-# """
+# ==========================================
+# TEMPLATE RENDERER
+# ==========================================
+# Deterministic CVStructured -> HTML using the design system mandated by
+# CVOptimizerAgent's RENDER_SYSTEM_PROMPT (same classes, single column).
+
+import re
+from html import escape
+from typing import Any, Dict, Iterable, List, Optional
+
+DOCUMENT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<script src="https://cdn.tailwindcss.com"></script>
+<style>
+@page {{ size: A4; margin: 12mm; }}
+</style>
+</head>
+<body class="font-sans text-slate-800">
+<div class="max-w-4xl mx-auto p-2 px-5">
+{header}
+{sections}
+</div>
+</body>
+</html>
+"""
+
+HEADER_TEMPLATE = """<header class="text-center border-b pb-4">
+<h1 class="text-3xl font-bold">{name}</h1>
+{subtitle}<div class="mt-2 text-sm space-y-1">
+{contact}</div>
+</header>"""
+
+SECTION_TEMPLATE = """<section class="mt-2">
+<h2 class="text-xl font-semibold border-b mb-2">{title}</h2>
+{body}
+</section>"""
+
+PARAGRAPH_TEMPLATE = '<p class="text-sm leading-relaxed">{text}</p>'
+LIST_TEMPLATE = '<ul class="list-disc list-inside text-sm">\n{items}\n</ul>'
+GROUP_TEMPLATE = '<div class="text-sm space-y-2">\n{items}\n</div>'
+
+LINK_SCHEMES = ("http", "https", "mailto")
+
+# Browsers drop these inside URLs, so "java\tscript:" still runs as javascript:
+_URL_IGNORED = re.compile(r"[\x00-\x20\x7f]+")
+# "linkedin.com/in/x" has no scheme; "host:8080" is a port, not a scheme
+_URL_SCHEME = re.compile(r"^([a-z][a-z0-9+.-]*):(?!\d)", re.IGNORECASE)
+
+
+def _e(value: Any) -> str:
+    return escape(str(value).strip()) if value else ""
+
+
+def _link(url: Optional[str]) -> str:
+    if not url:
+        return ""
+    href = _URL_IGNORED.sub("", url)
+    scheme = _URL_SCHEME.match(href)
+    if scheme is None:
+        href = f"https://{href}"
+    elif scheme.group(1).lower() not in LINK_SCHEMES:
+        # javascript:, data:, vbscript:, ... are shown as text, never linked
+        return _e(url)
+    return f'<a href="{escape(href, quote=True)}">{_e(url)}</a>'
+
+
+def _paragraph(text: str) -> str:
+    return PARAGRAPH_TEMPLATE.format(text=text)
+
+
+def _bullets(items: Iterable[Any]) -> str:
+    return LIST_TEMPLATE.format(items="\n".join(f"<li>{_e(item)}</li>" for item in items if item))
+
+
+def _section(title: str, body: str) -> str:
+    return SECTION_TEMPLATE.format(title=title, body=body)
+
+
+def _header(data: Dict[str, Any]) -> str:
+    contact = data.get("contact") or {}
+    experience = data.get("experience") or []
+
+    subtitle = ""
+    if experience and experience[0].get("title"):
+        subtitle = f'<p class="text-lg font-medium">{_e(experience[0]["title"])}</p>\n'
+
+    plain = [_e(contact.get(k)) for k in ("email", "phone", "location") if contact.get(k)]
+    links = [_link(contact.get(k)) for k in ("linkedin", "github", "portfolio") if contact.get(k)]
+
+    lines = [" • ".join(group) for group in (plain, links) if group]
+
+    return HEADER_TEMPLATE.format(
+        name=_e(data.get("full_name")),
+        subtitle=subtitle,
+        contact="".join(f"<p>{line}</p>\n" for line in lines),
+    )
+
+
+def _experience(items: List[Dict[str, Any]]) -> str:
+    blocks = []
+    for exp in items:
+        company = f" — {_e(exp.get('company'))}" if exp.get("company") else ""
+        duration = f'<span class="float-right">{_e(exp.get("duration"))}</span>' if exp.get("duration") else ""
+        block = f"<div>\n<p><strong>{_e(exp.get('title'))}</strong>{company}{duration}</p>"
+        if exp.get("description"):
+            block += "\n" + _paragraph(_e(exp["description"]))
+        blocks.append(block + "\n</div>")
+    return GROUP_TEMPLATE.format(items="\n".join(blocks))
+
+
+def _education(items: List[Dict[str, Any]]) -> str:
+    blocks = []
+    for edu in items:
+        institution = f" — {_e(edu.get('institution'))}" if edu.get("institution") else ""
+        year = f'<span class="float-right">{_e(edu.get("year"))}</span>' if edu.get("year") else ""
+        blocks.append(f"<p><strong>{_e(edu.get('degree'))}</strong>{institution}{year}</p>")
+    return GROUP_TEMPLATE.format(items="\n".join(blocks))
+
+
+def render_cv_html(cv: Any) -> str:
+    """Render a CVStructured (or its dict) to a standalone A4 HTML document."""
+    data = cv.model_dump() if hasattr(cv, "model_dump") else dict(cv)
+
+    # Field order follows CVStructured
+    sections = []
+    if data.get("summary"):
+        sections.append(_section("Summary", _paragraph(_e(data["summary"]))))
+    if data.get("skills"):
+        sections.append(_section(
+            "Skills",
+            _paragraph(", ".join(_e(s) for s in data["skills"] if s)),
+        ))
+    if data.get("experience"):
+        sections.append(_section("Experience", _experience(data["experience"])))
+    if data.get("education"):
+        sections.append(_section("Education", _education(data["education"])))
+    if data.get("projects"):
+        sections.append(_section("Projects", _bullets(data["projects"])))
+    if data.get("certifications"):
+        sections.append(_section("Certifications", _bullets(data["certifications"])))
+    if data.get("languages"):
+        sections.append(_section(
+            "Languages",
+            _paragraph(", ".join(_e(l) for l in data["languages"] if l)),
+        ))
+
+    return DOCUMENT_TEMPLATE.format(
+        title=f"{_e(data.get('full_name')) or 'Candidate'} - CV",
+        header=_header(data),
+        sections="\n".join(sections),
+    )
@@ -0,0 +1,313 @@
+# app/tools/job_extractor.py
+#
+# Main-content extraction for scraped job postings, built on lxml.
+# Finds the job-description block (JSON-LD JobPosting first, then text
+# density + section headings) and returns compact, section-aware text.
+
+import re
+import json
+from html import escape, unescape
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Bump when the output format changes so cached scrapes are refreshed
+EXTRACTOR_VERSION = "lxml-2"
+
+MAX_CHARS = 10_000
+MIN_BLOCK_CHARS = 200
+
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "template", "svg", "iframe", "form",
+    "button", "nav", "footer", "header", "aside", "select", "input",
+)
+BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "dd", "dt", "pre", "blockquote"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Elements whose content starts on its own line
+STRUCTURAL_TAGS = BLOCK_TAGS | {
+    "div", "section", "article", "main", "ul", "ol", "dl", "table", "tbody", "thead", "tr",
+}
+
+SECTION_HEADING = re.compile(
+    r"\b(requirements?|responsibilit(?:y|ies)|qualifications?|skills|experience|"
+    r"what you(?:'|’)?ll do|what we(?:'|’)?re looking for|about (?:the|this) (?:role|job|position)|"
+    r"duties|must have|nice to have|preferred|benefits|about you|the role)\b",
+    re.IGNORECASE,
+)
+# Kept first when the text has to be shortened
+PRIORITY_SECTION = re.compile(
+    r"requirement|qualification|responsibilit|skill|experience|must have|what you|looking for|duties",
+    re.IGNORECASE,
+)
+NEGATIVE_HINT = re.compile(r"comment|cookie|footer|header|menu|nav|related|share|sidebar|social|promo", re.IGNORECASE)
+POSITIVE_HINT = re.compile(r"job|description|posting|vacancy|content|article|main|details", re.IGNORECASE)
+
+# <br> is marked with U+2028 so it survives whitespace collapsing as a line break
+LINE_BREAK = "\u2028"
+_SPACES = re.compile(r"[^\S\u2028]+")
+_MARKUP = re.compile(r"<[^>]*>")
+_SCRIPTS = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+def _clean(text: Optional[str]) -> str:
+    return _SPACES.sub(" ", text or "").strip()
+
+
+def _split(text: Optional[str]) -> List[str]:
+    """Cleaned lines of `text`, split at <br> marks."""
+    return [line for line in (_clean(part) for part in (text or "").split(LINE_BREAK)) if line]
+
+
+def _strip_markup(page: str) -> str:
+    """Last-resort text for pages lxml cannot parse: never hand markup to the LLM."""
+    text = _MARKUP.sub(" ", _SCRIPTS.sub(" ", page))
+    return " ".join(unescape(text).split())
+
+
+def _tag(el) -> str:
+    return el.tag.lower() if isinstance(el.tag, str) else ""
+
+
+def _json_ld_description(doc) -> Optional[str]:
+    """Description of a schema.org JobPosting, which most job boards embed."""
+    for script in doc.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text or "")
+        except ValueError:
+            continue
+
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            kind = item.get("@type")
+            kinds = kind if isinstance(kind, list) else [kind]
+            if "JobPosting" in kinds and isinstance(item.get("description"), str):
+                return _json_ld_html(item.get("title"), item["description"])
+    return None
+
+
+def _json_ld_html(title, description: str) -> str:
+    # Some boards entity-escape the HTML, others send plain text with newlines
+    if "<" not in description and "&lt;" in description:
+        description = unescape(description)
+    if "<" not in description:
+        description = escape(description).replace("\n", "<br>")
+
+    heading = f"<h1>{escape(title)}</h1>" if isinstance(title, str) and title.strip() else ""
+    return heading + description
+
+
+def _class_weight(el) -> int:
+    hints = f"{el.get('class', '')} {el.get('id', '')}"
+    weight = 0
+    if POSITIVE_HINT.search(hints):
+        weight += 25
+    if NEGATIVE_HINT.search(hints):
+        weight -= 25
+    return weight
+
+
+def _link_density(el, text_len: int) -> float:
+    if not text_len:
+        return 1.0
+    link_len = sum(len(_clean(a.text_content())) for a in el.iter("a"))
+    return min(1.0, link_len / text_len)
+
+
+# --------------------------------------------------
+# BLOCK SELECTION
+# --------------------------------------------------
+def _best_block(body):
+    """Readability-style scoring: text blocks credit their parent and grandparent."""
+    scores: Dict[object, float] = {}
+
+    for el in body.iter(*BLOCK_TAGS):
+        text = _clean(el.text_content())
+        if len(text) < 20 and _tag(el) not in HEADING_TAGS:
+            continue
+
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        if _tag(el) in HEADING_TAGS and SECTION_HEADING.search(text):
+            score += 10
+
+        parent = el.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+
+    best, best_score = None, 0.0
+    for el, score in scores.items():
+        text_len = len(_clean(el.text_content()))
+        final = (score + _class_weight(el)) * (1 - _link_density(el, text_len))
+        if final > best_score:
+            best, best_score = el, final
+
+    if best is None:
+        return body
+
+    # Climb while the parent adds section headings the block is missing
+    while best.getparent() is not None and best.getparent() is not body:
+        parent = best.getparent()
+        if _heading_count(parent) > _heading_count(best) and _link_density(
+            parent, len(_clean(parent.text_content()))
+        ) < 0.3:
+            best = parent
+        else:
+            break
+
+    return best
+
+
+def _heading_count(el) -> int:
+    return sum(
+        1 for h in el.iter(*HEADING_TAGS, "strong", "b")
+        if SECTION_HEADING.search(_clean(h.text_content()))
+    )
+
+
+# --------------------------------------------------
+# TEXT RENDERING
+# --------------------------------------------------
+def _is_heading(tag: str, text: str) -> bool:
+    if tag in HEADING_TAGS:
+        return True
+    # <p><strong>Requirements:</strong></p> style headings
+    return len(text) <= 60 and SECTION_HEADING.search(text) is not None and (
+        tag in ("strong", "b") or text.endswith(":")
+    )
+
+
+def _render(tag: str, text: Optional[str]) -> Iterable[str]:
+    for i, line in enumerate(_split(text)):
+        if _is_heading(tag, line):
+            yield "## " + line.rstrip(":")
+        elif tag == "li" and i == 0:
+            yield "- " + line
+        else:
+            yield line
+
+
+def _is_leaf(el) -> bool:
+    return not any(_tag(c) in STRUCTURAL_TAGS for c in el.iterdescendants())
+
+
+def _lines(el) -> Iterable[str]:
+    """Document-order lines: leaf blocks whole, containers as text + children + tails."""
+    tag = _tag(el)
+    if not tag:
+        return
+
+    if _is_leaf(el):
+        yield from _render(tag, el.text_content())
+        return
+
+    # Mixed content: the container's own text and the text between its children
+    yield from _render(tag, el.text)
+    for child in el:
+        yield from _lines(child)
+        yield from _render("", child.tail)
+
+
+def _sections(lines: Iterable[str]) -> List[Tuple[str, List[str]]]:
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    previous = None
+    for line in lines:
+        if line == previous:
+            continue
+        previous = line
+        if line.startswith("## "):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    return [s for s in sections if s[0] or s[1]]
+
+
+def _fit(sections: List[Tuple[str, List[str]]], max_chars: int) -> str:
+    """Keep priority sections first when over budget; output stays in page order."""
+    blocks = ["\n".join(([head] if head else []) + body) for head, body in sections]
+
+    if sum(len(b) + 1 for b in blocks) <= max_chars:
+        return "\n".join(blocks)
+
+    order = sorted(
+        range(len(blocks)),
+        key=lambda i: (not PRIORITY_SECTION.search(sections[i][0]), i),
+    )
+
+    kept, budget = {}, max_chars
+    for i in order:
+        if budget <= 0:
+            break
+        block = blocks[i][:budget]
+        kept[i] = block
+        budget -= len(block) + 1
+
+    return "\n".join(kept[i] for i in sorted(kept))
+
+
+# --------------------------------------------------
+# MAIN ENTRY
+# --------------------------------------------------
+def _parse(page: Union[str, bytes], encoding: Optional[str] = None):
+    from lxml import html as lxml_html
+
+    # Bytes with an explicit encoding: str input with an XML declaration is rejected by lxml
+    if isinstance(page, str):
+        page, encoding = page.encode("utf-8"), "utf-8"
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+
+    doc = lxml_html.document_fromstring(page, parser=parser)
+    for br in doc.iter("br"):
+        br.tail = LINE_BREAK + (br.tail or "")
+    return doc
+
+
+def extract_job_text(
+    page: Union[str, bytes],
+    max_chars: int = MAX_CHARS,
+    encoding: Optional[str] = None,
+) -> str:
+    """
+    Compact, section-aware text of the job description in an HTML page.
+    Bytes are decoded with `encoding` (or the page's own charset when None).
+    """
+    if not page or not page.strip():
+        return ""
+
+    # Imported on first scrape: scrape_cache only needs EXTRACTOR_VERSION
+    from lxml import etree
+
+    try:
+        doc = _parse(page, encoding)
+    except (etree.ParserError, ValueError):
+        if isinstance(page, bytes):
+            page = page.decode(encoding or "utf-8", errors="replace")
+        return _strip_markup(page)[:max_chars]
+
+    description = _json_ld_description(doc)
+    if description and len(description) >= MIN_BLOCK_CHARS:
+        try:
+            doc = _parse(f"<html><body>{description}</body></html>")
+        except (etree.ParserError, ValueError):
+            pass
+        else:
+            return _fit(_sections(_lines(doc.body)), max_chars)
+
+    etree.strip_elements(doc, *BOILERPLATE_TAGS, with_tail=False)
+    etree.strip_elements(doc, etree.Comment, with_tail=False)
+
+    body = doc.body if doc.find("body") is not None else doc
+    block = _best_block(body)
+
+    text = _fit(_sections(_lines(block)), max_chars)
+    if len(text) < MIN_BLOCK_CHARS and block is not body:
+        text = _fit(_sections(_lines(body)), max_chars)
+    if not text:
+        text = "\n".join(_split(body.text_content()))[:max_chars]
+
+    return text
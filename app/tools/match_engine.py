@@ -0,0 +1,292 @@
+# app/tools/match_engine.py
+#
+# Deterministic, local CV <-> job scoring. Used as a fast path in front of
+# the Gemini-based MatchScorerAgent.
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Score weights (sum to 100)
+SKILLS_WEIGHT = 70
+EXPERIENCE_WEIGHT = 20
+EDUCATION_WEIGHT = 10
+
+# Common spellings -> canonical skill name. Also applied token-by-token to
+# free text, so keep ambiguous short forms (e.g. "cv", "rest") out of it.
+SKILL_SYNONYMS = {
+    "js": "javascript",
+    "python3": "python",
+    "sklearn": "scikit learn",
+    "scikitlearn": "scikit learn",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "llm": "large language models",
+    "llms": "large language models",
+    "genai": "generative ai",
+    "gen ai": "generative ai",
+    "rag": "retrieval augmented generation",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "aws": "amazon web services",
+    "azure cloud": "azure",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "hugging face": "huggingface",
+    "hf transformers": "transformers",
+    "ci/cd": "ci cd",
+    "cicd": "ci cd",
+    "mongo": "mongodb",
+    "golang": "go",
+    "c sharp": "c#",
+    "cpp": "c++",
+    "restful api": "rest api",
+    "restful apis": "rest api",
+    "rest apis": "rest api",
+    "sql server": "mssql",
+    "ms sql": "mssql",
+}
+
+# Canonical names that are ordinary words in prose ("go to market", "R&D").
+# They only match the CV skills list, or an unambiguous alias ("golang") in text.
+AMBIGUOUS_SKILLS = frozenset({"go", "r", "c", "d", "rust", "swift", "dart", "julia"})
+
+EDUCATION_LEVELS = (
+    (4, ("phd", "ph.d", "doctorate", "doctor of")),
+    (3, ("master", "msc", "m.sc", "m.s.", "mba", "meng", "m.eng")),
+    (2, ("bachelor", "bsc", "b.sc", "b.s.", "beng", "b.eng")),
+    (1, ("diploma", "associate", "certificate")),
+    # Generic wording, only when nothing more specific matched ("Associate degree" is 1)
+    (2, ("undergraduate", "degree")),
+)
+
+_NON_SKILL_CHARS = re.compile(r"[^a-z0-9+#./ ]+")
+_SPACES = re.compile(r"\s+")
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+# "2020", "Jan 2020", "January 2020", "03/2020", "3.2020"
+_DATE = r"(?:([a-z]{3})[a-z]*\.?\s+|(\d{1,2})\s*[/.]\s*)?((?:19|20)\d{2})"
+_DATE_RANGE = re.compile(
+    _DATE + r"\s*(?:-|–|—|to)\s*(?:" + _DATE + r"|(present|current|now|today))",
+    re.IGNORECASE,
+)
+_YEARS_COUNT = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)", re.IGNORECASE)
+_MONTHS_COUNT = re.compile(r"(\d+)\s*(?:months?|mos?)", re.IGNORECASE)
+
+
+@dataclass
+class LocalMatch:
+    score: int
+    missing_keywords: List[str]
+    analysis: str
+    matched_skills: List[str] = field(default_factory=list)
+    cv_experience_years: float = 0.0
+    breakdown: Dict[str, float] = field(default_factory=dict)
+
+
+# --------------------------------------------------
+# NORMALIZATION
+# --------------------------------------------------
+@lru_cache(maxsize=4096)
+def normalize_skill(skill: str) -> str:
+    text = _NON_SKILL_CHARS.sub(" ", str(skill).lower())
+    text = _SPACES.sub(" ", text).strip(" ./")
+    return SKILL_SYNONYMS.get(text, text)
+
+
+@lru_cache(maxsize=4096)
+def _phrase_pattern(canonical: str) -> re.Pattern:
+    return re.compile(r"(?<![a-z0-9])" + re.escape(canonical) + r"(?![a-z0-9+#])")
+
+
+def _normalize_text(text: str, synonyms: bool = True) -> str:
+    # Run each token through the synonym map so "k8s" in prose matches "kubernetes"
+    words = _SPACES.sub(" ", _NON_SKILL_CHARS.sub(" ", text.lower())).split(" ")
+    if synonyms:
+        words = [SKILL_SYNONYMS.get(w, w) for w in words]
+    return " " + " ".join(words) + " "
+
+
+@lru_cache(maxsize=256)
+def _text_aliases(canonical: str) -> Tuple[str, ...]:
+    """Unambiguous spellings of an AMBIGUOUS_SKILLS name ("golang" for "go")."""
+    return tuple(alias for alias, name in SKILL_SYNONYMS.items() if name == canonical)
+
+
+def _to_dict(data: Any) -> Dict[str, Any]:
+    if data is None:
+        return {}
+    return data.model_dump() if hasattr(data, "model_dump") else data
+
+
+def _iter_text(cv: Dict[str, Any]) -> Iterable[str]:
+    if cv.get("summary"):
+        yield cv["summary"]
+    for exp in cv.get("experience") or []:
+        yield exp.get("title") or ""
+        yield exp.get("description") or ""
+    for item in (cv.get("projects") or []) + (cv.get("certifications") or []):
+        yield str(item)
+
+
+# --------------------------------------------------
+# COMPONENTS
+# --------------------------------------------------
+def _skill_overlap(cv: Dict[str, Any], required: List[str]) -> Tuple[List[str], List[str]]:
+    cv_skills = {normalize_skill(s) for s in cv.get("skills") or [] if s}
+    cv_text = raw_text = None
+
+    matched, missing = [], []
+    for skill in required:
+        canonical = normalize_skill(skill)
+        if not canonical:
+            continue
+
+        if canonical in cv_skills:
+            matched.append(skill)
+            continue
+
+        # Fall back to a whole-phrase search over experience/projects/summary
+        if cv_text is None:
+            joined = " ".join(_iter_text(cv))
+            cv_text = _normalize_text(joined)
+            raw_text = _normalize_text(joined, synonyms=False)
+
+        if canonical in AMBIGUOUS_SKILLS:
+            # Synonym rewriting would turn "golang" into "go"; search the aliases as written
+            found = any(_phrase_pattern(alias).search(raw_text) for alias in _text_aliases(canonical))
+        else:
+            found = _phrase_pattern(canonical).search(cv_text)
+
+        if found:
+            matched.append(skill)
+        else:
+            missing.append(skill)
+
+    return matched, missing
+
+
+def _month_index(name: str, number: str, year: str) -> int:
+    """Months since year 0; a missing or unreadable month counts as January."""
+    if name.lower() in _MONTHS:
+        month = _MONTHS.index(name.lower()) + 1
+    elif number and 1 <= int(number) <= 12:
+        month = int(number)
+    else:
+        month = 1
+    return int(year) * 12 + month - 1
+
+
+def experience_years(cv: Dict[str, Any]) -> float:
+    """Best-effort total years from experience durations."""
+    today = date.today()
+    total = 0.0
+
+    for exp in cv.get("experience") or []:
+        duration = exp.get("duration") or ""
+
+        ranges = _DATE_RANGE.findall(duration)
+        if ranges:
+            for s_name, s_num, s_year, e_name, e_num, e_year, ongoing in ranges:
+                start = _month_index(s_name, s_num, s_year)
+                end = today.year * 12 + today.month - 1 if ongoing else _month_index(e_name, e_num, e_year)
+                total += max(0, end - start) / 12
+            continue
+
+        years = _YEARS_COUNT.search(duration)
+        if years:
+            total += float(years.group(1))
+            continue
+
+        months = _MONTHS_COUNT.search(duration)
+        if months:
+            total += int(months.group(1)) / 12
+
+    return round(total, 1)
+
+
+def education_level(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    lowered = text.lower()
+    for level, markers in EDUCATION_LEVELS:
+        if any(marker in lowered for marker in markers):
+            return level
+    return 0
+
+
+def _cv_education_level(cv: Dict[str, Any]) -> int:
+    levels = [
+        education_level(f"{edu.get('degree') or ''} {edu.get('institution') or ''}")
+        for edu in cv.get("education") or []
+    ]
+    return max(levels, default=0)
+
+
+# --------------------------------------------------
+# MAIN ENTRY
+# --------------------------------------------------
+def score_match(cv_data: Any, job_data: Any) -> LocalMatch:
+    """Score a CV against a job using skill overlap, experience years and education."""
+    cv = _to_dict(cv_data)
+    job = _to_dict(job_data)
+
+    required = job.get("required_skills") or []
+    if not cv.get("skills") or not required:
+        return LocalMatch(
+            score=0,
+            missing_keywords=list(required),
+            analysis="Missing critical data for evaluation.",
+        )
+
+    # ---------- Skills ----------
+    matched, missing = _skill_overlap(cv, required)
+    skills_ratio = len(matched) / max(1, len(matched) + len(missing))
+
+    # ---------- Experience ----------
+    required_years = job.get("required_experience_years") or 0
+    cv_years = experience_years(cv)
+    experience_ratio = 1.0 if required_years <= 0 else min(1.0, cv_years / required_years)
+
+    # ---------- Education ----------
+    required_level = education_level(job.get("education"))
+    cv_level = _cv_education_level(cv)
+    if required_level == 0 or cv_level >= required_level:
+        education_ratio = 1.0
+    elif cv_level == 0:
+        education_ratio = 0.5  # unknown rather than absent
+    else:
+        education_ratio = cv_level / required_level
+
+    score = round(
+        SKILLS_WEIGHT * skills_ratio
+        + EXPERIENCE_WEIGHT * experience_ratio
+        + EDUCATION_WEIGHT * education_ratio
+    )
+
+    analysis = (
+        f"Matched {len(matched)}/{len(matched) + len(missing)} required skills; "
+        f"experience {cv_years:g}/{required_years} years; "
+        f"education {'meets' if education_ratio >= 1 else 'below'} requirement."
+    )
+
+    return LocalMatch(
+        score=int(score),
+        missing_keywords=missing,
+        analysis=analysis,
+        matched_skills=matched,
+        cv_experience_years=cv_years,
+        breakdown={
+            "skills": round(skills_ratio, 3),
+            "experience": round(experience_ratio, 3),
+            "education": round(education_ratio, 3),
+        },
+    )
@@ -0,0 +1,77 @@
+# app/tools/pdf_assets.py
+#
+# Offline asset resolution for WeasyPrint: known CDN URLs map to files in
+# app/tools/assets, everything else remote is blocked (or, when allowed,
+# fetched once and served from the shared cache afterwards).
+
+import os
+import mimetypes
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from weasyprint import default_url_fetcher
+
+from app.utils.cache import get_cache
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+TAILWIND_CSS_PATH = os.path.join(ASSETS_DIR, "tailwind-cv.css")
+
+# Opt-in: fetch unknown remote assets (images, fonts) once and cache them
+PDF_ALLOW_REMOTE_ASSETS = os.getenv("PDF_ALLOW_REMOTE_ASSETS", "false").lower() == "true"
+
+# Remote URL prefix -> local file served instead
+LOCAL_ASSETS = {
+    "https://cdn.tailwindcss.com": TAILWIND_CSS_PATH,
+}
+
+_remote_cache = get_cache("pdf_assets", memory_entries=64, disk_entries=1000, ttl=30 * 24 * 3600)
+
+
+@lru_cache(maxsize=None)
+def _read_asset(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _local_asset(path: str) -> dict:
+    return {
+        "string": _read_asset(path),
+        "mime_type": mimetypes.guess_type(path)[0] or "text/css",
+        "filename": os.path.basename(path),
+    }
+
+
+def _blocked(url: str) -> dict:
+    print(f"⚠️ Blocked remote asset during PDF render: {url}")
+    return {"string": b"", "mime_type": "text/plain"}
+
+
+def offline_url_fetcher(url: str, *args, **kwargs) -> dict:
+    """WeasyPrint `url_fetcher` that never touches the network by default."""
+    for prefix, path in LOCAL_ASSETS.items():
+        if url.startswith(prefix):
+            return _local_asset(path)
+
+    scheme = urlsplit(url).scheme
+    if scheme not in ("http", "https"):
+        # data:, file: and friends are local
+        return default_url_fetcher(url, *args, **kwargs)
+
+    if not PDF_ALLOW_REMOTE_ASSETS:
+        return _blocked(url)
+
+    cached = _remote_cache.get(url)
+    if cached is None:
+        result = default_url_fetcher(url, *args, **kwargs)
+        body = result.get("string")
+        if body is None:
+            with result.pop("file_obj") as f:
+                body = f.read()
+        cached = {
+            "string": body,
+            "mime_type": result.get("mime_type"),
+            "encoding": result.get("encoding"),
+        }
+        _remote_cache.set(url, cached)
+
+    return dict(cached)
@@ -1,13 +1,186 @@
-from pypdf import PdfReader
+# app/tools/pdf_parser.py
+#
+# PDF text extraction straight from memory: bytes / memoryview buffers or
+# memory-mapped files, never a temp file. Long documents are split into
+# page ranges extracted in parallel worker processes; every page is timed.
 
+import io
+import os
+import mmap
+import time
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
 
-def extract_text_from_pdf(file_path: str) -> str:
-    reader = PdfReader(file_path)
-    text = ""
+if TYPE_CHECKING:
+    from pypdf import PdfReader
 
-    for page in reader.pages:
-        extracted = page.extract_text()
-        if extracted:
-            text += extracted + "\n"
+# 0 extracts every page in the calling process
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+# Shorter documents are not worth shipping to the workers (most CVs are 1-3 pages)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
 
-    return text
+# A file path (memory-mapped) or the PDF bytes themselves
+PdfSource = Union[str, bytes, bytearray, memoryview]
+
+
+@dataclass
+class PageText:
+    index: int
+    text: str
+    elapsed_ms: float
+
+
+@dataclass
+class PdfText:
+    pages: List[PageText]
+    elapsed_ms: float
+    parallel: bool = False
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages if page.text)
+
+    def timings(self) -> dict:
+        """Per-page extraction time (ms) plus the overall wall time."""
+        slowest = max(self.pages, key=lambda p: p.elapsed_ms, default=None)
+        return {
+            "pages": len(self.pages),
+            "parallel": self.parallel,
+            "total_ms": self.elapsed_ms,
+            "page_ms": [page.elapsed_ms for page in self.pages],
+            "slowest_page": slowest.index if slowest else None,
+        }
+
+
+# --------------------------------------------------
+# READING (shared by the caller and the workers)
+# --------------------------------------------------
+@contextmanager
+def _open(source: PdfSource) -> Iterator[io.IOBase]:
+    if isinstance(source, str):
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"PDF file not found at: {source}")
+        if os.path.getsize(source) == 0:
+            raise ValueError(f"PDF file is empty: {source}")
+
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+    else:
+        # BytesIO shares an immutable `bytes` buffer instead of copying it
+        yield io.BytesIO(source)
+
+
+def _reader(stream) -> "PdfReader":
+    from pypdf import PdfReader
+
+    reader = PdfReader(stream)
+    if reader.is_encrypted:
+        # Owner-password-only PDFs open with an empty user password
+        reader.decrypt("")
+    return reader
+
+
+def _extract_page(reader: "PdfReader", index: int) -> PageText:
+    started = time.perf_counter()
+    text = reader.pages[index].extract_text() or ""
+    return PageText(index, text, round((time.perf_counter() - started) * 1000, 2))
+
+
+def _extract_range(source: PdfSource, start: int, stop: int) -> List[PageText]:
+    with _open(source) as stream:
+        reader = _reader(stream)
+        return [_extract_page(reader, i) for i in range(start, stop)]
+
+
+# --------------------------------------------------
+# POOL
+# --------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _parallel(source: PdfSource, reader: "PdfReader", count: int) -> List[PageText]:
+    # Paths are re-mapped by each worker; buffers have to be pickled over
+    payload = source if isinstance(source, str) else bytes(source)
+
+    # The caller takes the first range itself, the workers the rest
+    size = -(-count // (PDF_PARSE_WORKERS + 1))
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_range, payload, start, min(start + size, count))
+        for start in range(size, count, size)
+    ]
+
+    pages = [_extract_page(reader, i) for i in range(min(size, count))]
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+def extract_pdf(source: PdfSource) -> PdfText:
+    """Text of every page with per-page timings; raises ValueError for unreadable PDFs."""
+    started = time.perf_counter()
+    parallel = False
+
+    try:
+        with _open(source) as stream:
+            reader = _reader(stream)
+            count = len(reader.pages)
+
+            if PDF_PARSE_WORKERS > 0 and count >= PDF_PARALLEL_MIN_PAGES:
+                try:
+                    pages = _parallel(source, reader, count)
+                    parallel = True
+                except BrokenProcessPool:
+                    shutdown_parse_pool()
+                    pages = [_extract_page(reader, i) for i in range(count)]
+            else:
+                pages = [_extract_page(reader, i) for i in range(count)]
+
+    except (FileNotFoundError, ValueError):
+        raise
+    except Exception as e:
+        raise ValueError(f"Unreadable PDF: {e}") from e
+
+    result = PdfText(pages, round((time.perf_counter() - started) * 1000, 2), parallel)
+    if pages:
+        timings = result.timings()
+        print(
+            f"📄 Extracted {count} page(s) in {result.elapsed_ms:.0f} ms"
+            f"{' (parallel)' if parallel else ''}, slowest: page {timings['slowest_page'] + 1}"
+        )
+    return result
+
+
+def extract_text_from_pdf(source: PdfSource) -> str:
+    return extract_pdf(source).text
@@ -0,0 +1,219 @@
+# app/tools/pdf_renderer.py
+#
+# WeasyPrint rendering service: a pool of worker processes, each holding a
+# warm FontConfiguration and the pre-parsed base stylesheet, so layout never
+# runs on (or holds the GIL of) an API worker.
+
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Set, Tuple
+
+# 0 renders in the calling process (local development)
+PDF_POOL_SIZE = int(os.getenv("PDF_POOL_SIZE", "2"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "60"))
+
+
+class PDFRenderError(RuntimeError):
+    pass
+
+
+# --------------------------------------------------
+# WORKER SIDE
+# --------------------------------------------------
+_font_config = None
+_stylesheets = None
+
+
+def _init_worker() -> None:
+    """Warm fonts and stylesheets once per worker process."""
+    global _font_config, _stylesheets
+
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    from app.tools.pdf_assets import TAILWIND_CSS_PATH, offline_url_fetcher
+
+    _font_config = FontConfiguration()
+    _stylesheets = [
+        CSS(
+            filename=TAILWIND_CSS_PATH,
+            font_config=_font_config,
+            url_fetcher=offline_url_fetcher,
+        )
+    ]
+
+
+def _render(html_content: str) -> bytes:
+    from weasyprint import HTML
+
+    from app.tools.pdf_assets import offline_url_fetcher
+
+    if _font_config is None:
+        _init_worker()
+
+    return HTML(string=html_content, url_fetcher=offline_url_fetcher).write_pdf(
+        stylesheets=_stylesheets,
+        font_config=_font_config,
+    )
+
+
+# --------------------------------------------------
+# POOL
+# --------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Unfinished renders per pool, so a retired pool can drain before it is killed
+_inflight: Dict[ProcessPoolExecutor, Set[Future]] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_POOL_SIZE,
+                # spawn: workers must not inherit the parent's sockets/threads
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            print(f"🖨️ PDF render pool started: {PDF_POOL_SIZE} workers")
+        return _pool
+
+
+def _submit(html_content: str) -> Tuple[ProcessPoolExecutor, Future]:
+    pool = _get_pool()
+    future = pool.submit(_render, html_content)
+
+    with _pool_lock:
+        _inflight.setdefault(pool, set()).add(future)
+    # Runs immediately if the render already finished
+    future.add_done_callback(lambda f: _forget(pool, f))
+    return pool, future
+
+
+def _forget(pool: ProcessPoolExecutor, future: Future) -> None:
+    with _pool_lock:
+        _inflight.get(pool, set()).discard(future)
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    # Kill stuck layout jobs instead of waiting for them
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _detach(pool: ProcessPoolExecutor) -> Optional[Set[Future]]:
+    """
+    New renders go to a fresh pool. Returns the old pool's unfinished renders,
+    or None when another caller already detached it.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        return _inflight.pop(pool, None)
+
+
+def _recycle_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died (every render on it already failed)."""
+    _detach(pool)
+    _terminate(pool)
+
+
+def _drain(pool: ProcessPoolExecutor, others: Set[Future]) -> None:
+    # Renders from other requests finish (up to one more timeout) before the hung worker dies
+    wait(others, timeout=PDF_RENDER_TIMEOUT)
+    _terminate(pool)
+
+
+def _timed_out(pool: ProcessPoolExecutor, future: Future, timeout: float) -> PDFRenderError:
+    """
+    Handle one render past its deadline. Still queued: just cancel it. Running:
+    its worker is stuck, so retire the pool (new renders get a fresh one) and
+    kill it once the other in-flight renders are done.
+    """
+    if not future.cancel() and not future.done():
+        inflight = _detach(pool)
+        if inflight is not None:
+            others = inflight - {future}
+            threading.Thread(target=_drain, args=(pool, others), name="pdf-pool-drain", daemon=True).start()
+            print(f"♻️ PDF render pool retired after a {timeout:g}s timeout; {len(others)} render(s) draining")
+
+    return PDFRenderError(f"PDF render timed out after {timeout:g}s")
+
+
+def start_pdf_pool() -> None:
+    """Spawn and warm the workers ahead of the first render."""
+    if PDF_POOL_SIZE > 0:
+        pool = _get_pool()
+        for future in [pool.submit(_render, "<p></p>") for _ in range(PDF_POOL_SIZE)]:
+            future.result(timeout=PDF_RENDER_TIMEOUT)
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _inflight.pop(pool, None)
+
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _to_html(document: Any) -> str:
+    if isinstance(document, str):
+        return document
+
+    # CVStructured (or its dict): use the template renderer
+    from app.tools.cv_renderer import render_cv_html
+
+    return render_cv_html(document)
+
+
+# --------------------------------------------------
+# PUBLIC API
+# --------------------------------------------------
+def render_pdf(document: Any, timeout: float = PDF_RENDER_TIMEOUT) -> bytes:
+    """Render HTML (or a CV model) to PDF bytes in the worker pool."""
+    html_content = _to_html(document)
+
+    if PDF_POOL_SIZE <= 0:
+        return _render(html_content)
+
+    pool, future = _submit(html_content)
+    try:
+        return future.result(timeout=timeout)
+
+    except FutureTimeout:
+        raise _timed_out(pool, future, timeout)
+
+    except BrokenProcessPool as e:
+        _recycle_pool(pool)
+        raise PDFRenderError(f"PDF render worker crashed: {e}")
+
+
+async def arender_pdf(document: Any, timeout: float = PDF_RENDER_TIMEOUT) -> bytes:
+    """Async variant of `render_pdf`; awaits the worker without blocking the loop."""
+    html_content = _to_html(document)
+
+    if PDF_POOL_SIZE <= 0:
+        return await asyncio.to_thread(_render, html_content)
+
+    pool, future = _submit(html_content)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+
+    except asyncio.TimeoutError:
+        raise _timed_out(pool, future, timeout)
+
+    except BrokenProcessPool as e:
+        _recycle_pool(pool)
+        raise PDFRenderError(f"PDF render worker crashed: {e}")
@@ -0,0 +1,99 @@
+# app/tools/scrape_cache.py
+#
+# Shared cache of scraped job postings (cleaned text + HTTP validators),
+# keyed by normalized URL. Freshness is tracked here rather than by the
+# cache TTL so stale entries stay available for stale-while-revalidate.
+
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.utils.cache import get_cache
+from app.tools.job_extractor import EXTRACTOR_VERSION
+
+# Served without any network call
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "3600"))
+# After the TTL: served immediately while a background revalidation runs
+SCRAPE_STALE_TTL = float(os.getenv("SCRAPE_STALE_TTL", "86400"))
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "trk", "refid", "trackingid")
+
+_cache = get_cache(
+    "scrape",
+    memory_entries=512,
+    disk_entries=50_000,
+    # Entries past the stale window are only useful for their validators
+    ttl=(SCRAPE_CACHE_TTL + SCRAPE_STALE_TTL) * 7,
+)
+
+
+@dataclass
+class ScrapeEntry:
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+    # Text from an older extractor is refetched rather than served
+    extractor: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < SCRAPE_CACHE_TTL
+
+    @property
+    def servable_stale(self) -> bool:
+        return self.age < SCRAPE_CACHE_TTL + SCRAPE_STALE_TTL
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme/host, drop fragment, tracking params and trailing slash."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def get_entry(url: str) -> Optional[ScrapeEntry]:
+    data = _cache.get(normalize_url(url))
+    if not data or data.get("extractor") != EXTRACTOR_VERSION:
+        return None
+    return ScrapeEntry(**data)
+
+
+def store(url: str, text: str, headers) -> ScrapeEntry:
+    entry = ScrapeEntry(
+        text=text,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+        fetched_at=time.time(),
+        extractor=EXTRACTOR_VERSION,
+    )
+    _cache.set(normalize_url(url), asdict(entry))
+    return entry
+
+
+def touch(url: str, entry: ScrapeEntry, headers) -> ScrapeEntry:
+    """Record a 304: same text, new validators (if sent) and a new fetch time."""
+    entry.etag = headers.get("ETag") or entry.etag
+    entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+    entry.fetched_at = time.time()
+    _cache.set(normalize_url(url), asdict(entry))
+    return entry
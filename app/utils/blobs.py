@@ -0,0 +1,65 @@
+# ==========================================
+# IN-PROCESS BLOB HANDLES
+# ==========================================
+# Hands large immutable payloads (rendered PDFs) from one graph node to a
+# later one without putting them in the checkpointed state. A handle is
+# only meaningful inside the process that created it; callers must fall
+# back to the durable copy (e.g. Supabase storage) when `get` misses.
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+BLOB_TTL = float(os.getenv("BLOB_TTL", "900"))
+BLOB_MAX_BYTES = int(os.getenv("BLOB_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_blobs: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+_total_bytes = 0
+
+
+def _drop(handle: str) -> None:
+    global _total_bytes
+    data, _ = _blobs.pop(handle)
+    _total_bytes -= len(data)
+
+
+def _evict(now: float) -> None:
+    # Oldest first: expired entries, then whatever exceeds the byte budget
+    while _blobs:
+        handle, (data, expires_at) = next(iter(_blobs.items()))
+        if expires_at > now and _total_bytes <= BLOB_MAX_BYTES:
+            break
+        _drop(handle)
+
+
+def put(handle: str, data: bytes, ttl: float = BLOB_TTL) -> None:
+    """Keep `data` (not copied) under `handle` for up to `ttl` seconds."""
+    global _total_bytes
+
+    with _lock:
+        if handle in _blobs:
+            _drop(handle)
+        _blobs[handle] = (data, time.time() + ttl)
+        _total_bytes += len(data)
+        _evict(time.time())
+
+
+def get(handle: Optional[str]) -> Optional[memoryview]:
+    """Read-only, zero-copy view of the blob, or None if this process does not hold it."""
+    if not handle:
+        return None
+
+    with _lock:
+        _evict(time.time())
+        entry = _blobs.get(handle)
+
+    return memoryview(entry[0]) if entry else None
+
+
+def release(handle: Optional[str]) -> None:
+    with _lock:
+        if handle in _blobs:
+            _drop(handle)
@@ -0,0 +1,257 @@
+# ==========================================
+# TIERED CACHE
+# ==========================================
+# In-memory LRU in front of a shared SQLite file. Values are pickled in
+# both tiers, so a hit always hands back a fresh copy the caller can mutate.
+
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Empty string keeps every cache memory-only
+CACHE_PATH = os.getenv("CACHE_PATH", "cache.sqlite")
+
+_MISSING = object()
+
+
+def content_hash(*parts: Any) -> str:
+    """SHA-256 over the repr of `parts` (callers pass canonical strings/bytes)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, bytes):
+            part = repr(part).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class _Disk:
+    """One SQLite file shared by every namespace."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_age ON cache_entries (namespace, created_at)"
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float, Optional[float]]]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT value, created_at, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+    def set(self, namespace: str, key: str, value: bytes, created_at: float, expires_at: Optional[float]) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, created_at, expires_at),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+
+    def evict(self, namespace: str, max_entries: int) -> None:
+        """Drop expired rows, then the oldest rows beyond `max_entries`."""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?",
+                (namespace, time.time()),
+            )
+            self.conn.execute(
+                """
+                DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (namespace, namespace, max_entries),
+            )
+
+    def clear(self, namespace: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+
+_disks: Dict[str, _Disk] = {}
+_caches: Dict[str, "TieredCache"] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_disk(path: str) -> Optional[_Disk]:
+    if not path:
+        return None
+    with _registry_lock:
+        if path not in _disks:
+            _disks[path] = _Disk(path)
+        return _disks[path]
+
+
+class TieredCache:
+    """
+    Memory LRU (`memory_entries`) backed by SQLite (`disk_entries`),
+    both with an optional TTL in seconds. Thread-safe.
+    """
+
+    # Run disk eviction every N writes rather than on each one
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        namespace: str,
+        memory_entries: int = 256,
+        disk_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        path: str = CACHE_PATH,
+    ):
+        self.namespace = namespace
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+        self.path = path
+        # The SQLite file is opened on first use, not when the cache is declared
+        self._disk: Optional[_Disk] = None
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[bytes, float, Optional[float]]]" = OrderedDict()
+        self._writes = 0
+        self.counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    @property
+    def disk(self) -> Optional[_Disk]:
+        if self._disk is None and self.path:
+            self._disk = _get_disk(self.path)
+        return self._disk
+
+    # --------------------------------------
+    # PUBLIC API
+    # --------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def get_entry(self, key: str, allow_expired: bool = False) -> Optional[Tuple[Any, float]]:
+        """Return (value, created_at) or None. Expired entries only with `allow_expired`."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                tier = "memory_hits"
+
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(self.namespace, key)
+            tier = "disk_hits"
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None or (not allow_expired and entry[2] is not None and entry[2] < now):
+            self._count("misses")
+            return None
+
+        self._count("hits", tier)
+        return pickle.loads(entry[0]), entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        ttl = self.ttl if ttl is _MISSING else ttl
+        now = time.time()
+        entry = (
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            now,
+            now + ttl if ttl else None,
+        )
+
+        self._remember(key, entry)
+
+        with self._lock:
+            self._writes += 1
+            self.counters["writes"] += 1
+            evict = self._writes % self.EVICT_EVERY == 0
+
+        if self.disk is not None:
+            self.disk.set(self.namespace, key, *entry)
+            if evict:
+                self.disk.evict(self.namespace, self.disk_entries)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(self.namespace, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear(self.namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "memory_size": len(self._memory),
+                "persistent": bool(self.path),
+            }
+
+    # --------------------------------------
+    # INTERNALS
+    # --------------------------------------
+    def _remember(self, key: str, entry: Tuple[bytes, float, Optional[float]]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self.counters[name] += 1
+
+
+def get_cache(namespace: str, **options: Any) -> TieredCache:
+    """Process-wide cache for `namespace` (options apply on first use only)."""
+    with _registry_lock:
+        cache = _caches.get(namespace)
+    if cache is None:
+        cache = TieredCache(namespace, **options)
+        with _registry_lock:
+            cache = _caches.setdefault(namespace, cache)
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters for every cache created in this process."""
+    with _registry_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats() for cache in caches}
@@ -0,0 +1,314 @@
+# ==========================================
+# SUPABASE DATA ACCESS
+# ==========================================
+# The only place that talks to Supabase. One lazily created sync client and
+# one async client per process, each on a pooled keep-alive httpx client;
+# the SDK itself is imported with the first client, not with this module.
+# Operations used from async graph nodes also have an `a`-prefixed variant.
+
+import os
+import json
+import asyncio
+import inspect
+import sqlite3
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+from app.utils.cache import get_cache
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+# Service role key bypasses RLS
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+
+CV_BUCKET = "cvs"
+
+# supabase: `insert_cv_version` RPC (supabase/migrations) | sqlite: local stand-in for tests
+CV_STORE_BACKEND = os.getenv("CV_STORE_BACKEND", "supabase").lower()
+CV_STORE_SQLITE_PATH = os.getenv("CV_STORE_SQLITE_PATH", "cvs.sqlite")
+
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+
+_lock = threading.Lock()
+_client: Optional["Client"] = None
+_async_client: Optional["AsyncClient"] = None
+_async_lock: Optional[asyncio.Lock] = None
+_http_clients = []
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+    )
+
+
+def _options(async_: bool):
+    """Client options on a pooled httpx client (supabase>=2.15 accepts `httpx_client`)."""
+    if async_:
+        from supabase import AsyncClientOptions as Options
+    else:
+        from supabase import ClientOptions as Options
+
+    if "httpx_client" not in inspect.signature(Options).parameters:
+        # Older SDK: it keeps its own pool, still one client per process
+        return Options(postgrest_client_timeout=SUPABASE_TIMEOUT)
+
+    # Created only once it is known to be used, so nothing leaks on old SDKs
+    if async_:
+        http = httpx.AsyncClient(limits=_limits(), timeout=SUPABASE_TIMEOUT)
+    else:
+        http = httpx.Client(limits=_limits(), timeout=SUPABASE_TIMEOUT)
+
+    _http_clients.append(http)
+    return Options(httpx_client=http)
+
+
+# --------------------------------------------------
+# CLIENTS
+# --------------------------------------------------
+def get_client() -> "Client":
+    global _client
+
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is None:
+            # supabase (postgrest, storage, realtime, auth) loads with the first client
+            from supabase import create_client
+
+            _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, options=_options(False))
+        return _client
+
+
+async def aget_client() -> "AsyncClient":
+    global _async_client, _async_lock
+
+    if _async_client is not None:
+        return _async_client
+
+    if _async_lock is None:
+        _async_lock = asyncio.Lock()
+
+    async with _async_lock:
+        if _async_client is None:
+            from supabase import acreate_client
+
+            _async_client = await acreate_client(
+                SUPABASE_URL, SUPABASE_SERVICE_KEY, options=_options(True)
+            )
+        return _async_client
+
+
+async def aclose() -> None:
+    """Release pooled connections (app shutdown)."""
+    global _client, _async_client, _async_lock
+
+    with _lock:
+        http_clients = list(_http_clients)
+        _http_clients.clear()
+        _client = _async_client = _async_lock = None
+
+    for http in http_clients:
+        if isinstance(http, httpx.AsyncClient):
+            await http.aclose()
+        else:
+            http.close()
+
+
+# --------------------------------------------------
+# PROFILES
+# --------------------------------------------------
+# Memory-only: names change rarely and a short TTL bounds staleness
+_profile_names = get_cache("profile_names", memory_entries=2048, ttl=PROFILE_CACHE_TTL, path="")
+
+
+def _display_name(user_id: str, res) -> str:
+    name = (res.data[0].get("full_name") if res.data else None) or "User"
+    _profile_names.set(user_id, name)
+    return name
+
+
+def fetch_profile_name(user_id: str) -> str:
+    cached = _profile_names.get(user_id)
+    if cached is not None:
+        return cached
+
+    res = get_client().table("profiles").select("full_name").eq("id", user_id).execute()
+    return _display_name(user_id, res)
+
+
+async def afetch_profile_name(user_id: str) -> str:
+    cached = _profile_names.get(user_id)
+    if cached is not None:
+        return cached
+
+    client = await aget_client()
+    res = await client.table("profiles").select("full_name").eq("id", user_id).execute()
+    return _display_name(user_id, res)
+
+
+# --------------------------------------------------
+# CVS (table + storage bucket)
+# --------------------------------------------------
+PDF_FILE_OPTIONS = {"content-type": "application/pdf", "upsert": "false"}
+
+
+def upload_cv_file(storage_path: str, pdf_bytes: bytes) -> None:
+    get_client().storage.from_(CV_BUCKET).upload(
+        path=storage_path, file=pdf_bytes, file_options=PDF_FILE_OPTIONS
+    )
+
+
+async def aupload_cv_file(storage_path: str, pdf_bytes: bytes) -> None:
+    client = await aget_client()
+    await client.storage.from_(CV_BUCKET).upload(
+        path=storage_path, file=pdf_bytes, file_options=PDF_FILE_OPTIONS
+    )
+
+
+def signed_cv_url(storage_path: str, expires_in: int = 600) -> str:
+    res = get_client().storage.from_(CV_BUCKET).create_signed_url(storage_path, expires_in)
+    return res["signedURL"]
+
+
+async def asigned_cv_url(storage_path: str, expires_in: int = 600) -> str:
+    client = await aget_client()
+    res = await client.storage.from_(CV_BUCKET).create_signed_url(storage_path, expires_in)
+    return res["signedURL"]
+
+
+class SQLiteCVStore:
+    """Local stand-in for the `insert_cv_version` RPC (same contract, same atomicity)."""
+
+    def __init__(self, path: str = CV_STORE_SQLITE_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cvs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                file_url TEXT,
+                file_name TEXT,
+                file_size INTEGER,
+                mime_type TEXT,
+                status TEXT,
+                version INTEGER NOT NULL,
+                structured_data TEXT,
+                created_at TEXT NOT NULL,
+                UNIQUE (user_id, version)
+            )
+            """
+        )
+
+    def insert_cv_version(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock before reading max(version)
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                (version,) = self.conn.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 FROM cvs WHERE user_id = ?",
+                    (record["user_id"],),
+                ).fetchone()
+                cursor = self.conn.execute(
+                    """
+                    INSERT INTO cvs (user_id, file_url, file_name, file_size, mime_type,
+                                     status, version, structured_data, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        record["user_id"],
+                        record.get("file_url"),
+                        record.get("file_name"),
+                        record.get("file_size"),
+                        record.get("mime_type", "application/pdf"),
+                        record.get("status", "processed"),
+                        version,
+                        json.dumps(record.get("structured_data") or {}),
+                        datetime.utcnow().isoformat(),
+                    ),
+                )
+                row = self.conn.execute(
+                    "SELECT * FROM cvs WHERE id = ?", (cursor.lastrowid,)
+                ).fetchone()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        result = dict(row)
+        result["structured_data"] = json.loads(result["structured_data"])
+        return result
+
+
+_sqlite_store: Optional[SQLiteCVStore] = None
+
+
+def _cv_store() -> SQLiteCVStore:
+    global _sqlite_store
+
+    with _lock:
+        if _sqlite_store is None:
+            _sqlite_store = SQLiteCVStore()
+        return _sqlite_store
+
+
+def insert_cv_version(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Allocate the user's next CV version and insert the row atomically; returns the row."""
+    if CV_STORE_BACKEND == "sqlite":
+        return _cv_store().insert_cv_version(record)
+
+    return get_client().rpc("insert_cv_version", {"p_record": record}).execute().data
+
+
+async def ainsert_cv_version(record: Dict[str, Any]) -> Dict[str, Any]:
+    if CV_STORE_BACKEND == "sqlite":
+        return await asyncio.to_thread(_cv_store().insert_cv_version, record)
+
+    client = await aget_client()
+    return (await client.rpc("insert_cv_version", {"p_record": record}).execute()).data
+
+
+def fetch_cv_structured_data(cv_id: str) -> Dict[str, Any]:
+    res = get_client().table("cvs").select("structured_data").eq("id", cv_id).limit(1).execute()
+    return (res.data[0].get("structured_data") or {}) if res.data else {}
+
+
+def update_cv_structured_data(cv_id: str, structured_data: Dict[str, Any]) -> None:
+    get_client().table("cvs").update({"structured_data": structured_data}).eq("id", cv_id).execute()
+
+
+# --------------------------------------------------
+# GOOGLE TOKENS / EMAILS
+# --------------------------------------------------
+def _refresh_token(res) -> str:
+    if not res.data:
+        raise Exception("Google tokens not found in Supabase.")
+    return res.data["refresh_token"]
+
+
+def fetch_encrypted_refresh_token(user_id: str) -> str:
+    res = get_client().table("google_tokens") \
+        .select("refresh_token").eq("user_id", user_id).single().execute()
+    return _refresh_token(res)
+
+
+def insert_email_log(entry: Dict[str, Any]) -> None:
+    get_client().table("emails_sent").insert(entry).execute()
+
+
+async def ainsert_email_log(entry: Dict[str, Any]) -> None:
+    client = await aget_client()
+    await client.table("emails_sent").insert(entry).execute()
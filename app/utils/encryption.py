@@ -1,23 +1,33 @@
 import os
 import base64
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from functools import lru_cache
 
-# Load key from environment
-ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+IV_LENGTH = 16
+AUTH_TAG_LENGTH = 16
 
-if not ENCRYPTION_KEY:
-    raise ValueError("ENCRYPTION_KEY environment variable is required")
+@lru_cache(maxsize=1)
+def _key_bytes() -> bytes:
+    """Loaded and validated on first use, so importing this module has no side effects."""
+    # Load key from environment
+    encryption_key = os.getenv("ENCRYPTION_KEY")
 
-# Node.js side used base64 to store the 32-byte key
-key_bytes = base64.b64decode(ENCRYPTION_KEY)
+    if not encryption_key:
+        raise ValueError("ENCRYPTION_KEY environment variable is required")
 
-if len(key_bytes) != 32:
-    raise ValueError("ENCRYPTION_KEY must be 32 bytes when decoded from base64")
+    # Node.js side used base64 to store the 32-byte key
+    key_bytes = base64.b64decode(encryption_key)
 
-IV_LENGTH = 16
-AUTH_TAG_LENGTH = 16
+    if len(key_bytes) != 32:
+        raise ValueError("ENCRYPTION_KEY must be 32 bytes when decoded from base64")
+
+    return key_bytes
+
+def _cipher(mode):
+    # cryptography is only needed when a token is actually (de)crypted
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+    from cryptography.hazmat.backends import default_backend
+
+    return Cipher(algorithms.AES(_key_bytes()), mode, backend=default_backend())
 
 def decrypt(encrypted_data_b64: str) -> str:
     """
@@ -34,11 +44,9 @@ def decrypt(encrypted_data_b64: str) -> str:
     
     # 3. Setup Decipher
     # We use modes.GCM(iv, auth_tag) to match Node's decipher.setAuthTag(authTag)
-    cipher = Cipher(
-        algorithms.AES(key_bytes),
-        modes.GCM(iv, auth_tag),
-        backend=default_backend()
-    )
+    from cryptography.hazmat.primitives.ciphers import modes
+
+    cipher = _cipher(modes.GCM(iv, auth_tag))
     decryptor = cipher.decryptor()
     
     # 4. Decrypt
@@ -51,13 +59,11 @@ def encrypt(text: str) -> str:
     Matches the TypeScript encrypt function.
     Layout: [IV (16 bytes)] + [AuthTag (16 bytes)] + [Ciphertext (N bytes)]
     """
+    from cryptography.hazmat.primitives.ciphers import modes
+
     iv = os.urandom(IV_LENGTH)
     
-    cipher = Cipher(
-        algorithms.AES(key_bytes),
-        modes.GCM(iv),
-        backend=default_backend()
-    )
+    cipher = _cipher(modes.GCM(iv))
     encryptor = cipher.encryptor()
     
     ciphertext = encryptor.update(text.encode('utf-8')) + encryptor.finalize()
@@ -0,0 +1,263 @@
+# ==========================================
+# SHARED HTTP FETCH LAYER
+# ==========================================
+# Outbound fetches for scraping and CV downloads: keep-alive pools
+# (HTTP/2 when `h2` is installed), per-host token-bucket rate limits,
+# streamed bodies with a hard byte cap and per-host timing metrics.
+
+import os
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+# Bodies larger than this are rejected while streaming
+HTTP_MAX_BYTES = int(os.getenv("HTTP_MAX_BYTES", str(5 * 1024 * 1024)))
+# Token bucket per host: sustained requests/second and burst size
+HTTP_HOST_RATE = float(os.getenv("HTTP_HOST_RATE", "2"))
+HTTP_HOST_BURST = int(os.getenv("HTTP_HOST_BURST", "4"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class FetchError(RuntimeError):
+    pass
+
+
+class ResponseTooLarge(FetchError):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    headers: httpx.Headers
+    content: bytes
+    encoding: str
+    elapsed_ms: float
+    http_version: str
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise FetchError(f"HTTP {self.status_code} for {self.url}")
+
+
+# --------------------------------------------------
+# RATE LIMITING
+# --------------------------------------------------
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket(host: str) -> TokenBucket:
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(HTTP_HOST_RATE, HTTP_HOST_BURST)
+        return _buckets[host]
+
+
+# --------------------------------------------------
+# METRICS
+# --------------------------------------------------
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(host: str, elapsed_ms: float, size: int, error: bool) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(
+            host,
+            {"requests": 0, "errors": 0, "bytes": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        stats["requests"] += 1
+        stats["errors"] += int(error)
+        stats["bytes"] += size
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def fetch_stats() -> Dict[str, Dict[str, float]]:
+    """Per-host request counts, bytes and latency (ms)."""
+    with _stats_lock:
+        return {
+            host: {**s, "avg_ms": round(s["total_ms"] / s["requests"], 1)}
+            for host, s in _stats.items()
+        }
+
+
+# --------------------------------------------------
+# CLIENTS
+# --------------------------------------------------
+_client: Optional[httpx.Client] = None
+_async_client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    return {
+        "http2": HTTP2,
+        "timeout": HTTP_TIMEOUT,
+        "follow_redirects": True,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        ),
+    }
+
+
+def get_client() -> httpx.Client:
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+def aget_client() -> httpx.AsyncClient:
+    global _async_client
+
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        # AsyncClient pools are bound to the loop that created them
+        if _async_client is None or _async_client[0] is not loop:
+            _async_client = (loop, httpx.AsyncClient(**_client_options()))
+        return _async_client[1]
+
+
+async def aclose() -> None:
+    global _client, _async_client
+
+    with _client_lock:
+        client, _client = _client, None
+        async_client, _async_client = _async_client, None
+
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client[1].aclose()
+
+
+# --------------------------------------------------
+# FETCH
+# --------------------------------------------------
+def _check_length(response: httpx.Response, max_bytes: int) -> None:
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseTooLarge(f"{response.url} declares {declared} bytes (limit {max_bytes})")
+
+
+def _result(url: str, response: httpx.Response, chunks, started: float) -> FetchResult:
+    return FetchResult(
+        url=str(response.url),
+        status_code=response.status_code,
+        headers=response.headers,
+        content=b"".join(chunks),
+        encoding=response.encoding or "utf-8",
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        http_version=response.http_version,
+    )
+
+
+def fetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = HTTP_MAX_BYTES,
+    timeout: Optional[float] = None,
+) -> FetchResult:
+    """GET `url` through the shared pool; does not raise on HTTP error statuses."""
+    host = urlsplit(url).netloc.lower()
+    wait = _bucket(host).reserve()
+    if wait:
+        time.sleep(wait)
+
+    started = time.perf_counter()
+    size, error = 0, True
+    try:
+        with get_client().stream("GET", url, headers=headers, timeout=timeout or HTTP_TIMEOUT) as response:
+            _check_length(response, max_bytes)
+
+            chunks = []
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"{url} exceeded {max_bytes} bytes")
+                chunks.append(chunk)
+
+            error = response.status_code >= 400
+            return _result(url, response, chunks, started)
+
+    except httpx.HTTPError as e:
+        raise FetchError(f"Request to {url} failed: {e}") from e
+
+    finally:
+        _record(host, (time.perf_counter() - started) * 1000, size, error)
+
+
+async def afetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = HTTP_MAX_BYTES,
+    timeout: Optional[float] = None,
+) -> FetchResult:
+    """Async variant of `fetch`."""
+    host = urlsplit(url).netloc.lower()
+    wait = _bucket(host).reserve()
+    if wait:
+        await asyncio.sleep(wait)
+
+    started = time.perf_counter()
+    size, error = 0, True
+    try:
+        async with aget_client().stream("GET", url, headers=headers, timeout=timeout or HTTP_TIMEOUT) as response:
+            _check_length(response, max_bytes)
+
+            chunks = []
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"{url} exceeded {max_bytes} bytes")
+                chunks.append(chunk)
+
+            error = response.status_code >= 400
+            return _result(url, response, chunks, started)
+
+    except httpx.HTTPError as e:
+        raise FetchError(f"Request to {url} failed: {e}") from e
+
+    finally:
+        _record(host, (time.perf_counter() - started) * 1000, size, error)
@@ -0,0 +1,181 @@
+# ==========================================
+# COLD-START IMPORT BENCHMARK
+# ==========================================
+# Imports each entry module in a fresh interpreter with `-X importtime`,
+# reports the slowest modules and fails when the budget is exceeded or a
+# dependency that should load lazily is imported at startup.
+#
+#   python scripts/import_benchmark.py
+#   python scripts/import_benchmark.py --json import-times.json --budget-ms 1500
+#   python scripts/import_benchmark.py --baseline import-times.json --tolerance 1.5
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = ("app.server", "app.api", "app.graph.builder")
+
+# Heavy dependencies the agents/tools load on first use, never at import
+LAZY_MODULES = (
+    "langchain_google_genai",
+    "langchain_community",
+    "weasyprint",
+    "googleapiclient",
+    "google.oauth2",
+    "supabase",
+    "pypdf",
+    "lxml",
+    "cryptography",
+)
+
+# An entry module counts as regressed when its total import time is this much
+# slower than the baseline (single modules are too noisy to gate on)
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 100.0
+
+
+# --------------------------------------------------
+# MEASURE
+# --------------------------------------------------
+def _parse(stderr: str) -> Dict[str, Tuple[float, float]]:
+    """`-X importtime` output -> {module: (self_ms, cumulative_ms)}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        times[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def measure(target: str, runs: int) -> Dict:
+    samples: List[Dict[str, Tuple[float, float]]] = []
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            return {"target": target, "error": error}
+        samples.append(_parse(proc.stderr))
+
+    # Fastest run per module: scheduler/disk noise only ever adds time
+    modules = {}
+    for name in samples[0]:
+        runs_with = [s[name] for s in samples if name in s]
+        modules[name] = {
+            "self_ms": round(min(t[0] for t in runs_with), 2),
+            "cumulative_ms": round(min(t[1] for t in runs_with), 2),
+        }
+
+    eager = sorted(
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in modules)
+    )
+
+    return {
+        "target": target,
+        "total_ms": modules.get(target, {}).get("cumulative_ms", 0.0),
+        "modules": modules,
+        "eager_heavy_imports": eager,
+    }
+
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+def _print_report(result: Dict, top: int) -> None:
+    if "error" in result:
+        print(f"❌ {result['target']}: import failed: {result['error']}")
+        return
+
+    print(f"\n⏱️ {result['target']}: {result['total_ms']:.1f} ms")
+
+    slowest = sorted(result["modules"].items(), key=lambda kv: kv[1]["self_ms"], reverse=True)[:top]
+    print(f"   {'self ms':>9} {'cumul ms':>9}  module")
+    for name, t in slowest:
+        print(f"   {t['self_ms']:>9.1f} {t['cumulative_ms']:>9.1f}  {name}")
+
+    if result["eager_heavy_imports"]:
+        print(f"⚠️ Imported at startup (should be lazy): {', '.join(result['eager_heavy_imports'])}")
+
+
+def _regression(result: Dict, baseline: Dict, ratio: float = REGRESSION_RATIO, top: int = 5) -> List[str]:
+    """Empty when within the baseline; else the total plus the modules that grew most."""
+    previous = baseline.get(result["target"])
+    if not previous or "error" in previous or "error" in result:
+        return []
+
+    before, after = previous["total_ms"], result["total_ms"]
+    if after - before < REGRESSION_MIN_MS or after < before * ratio:
+        return []
+
+    # Self time added per module, new imports included
+    grown = sorted(
+        (
+            (t["self_ms"] - previous["modules"].get(name, {}).get("self_ms", 0.0), name)
+            for name, t in result["modules"].items()
+        ),
+        reverse=True,
+    )[:top]
+    return [f"total {before:.1f} -> {after:.1f} ms"] + [
+        f"  +{delta:.1f} ms  {name}" for delta, name in grown if delta > 0
+    ]
+
+
+# --------------------------------------------------
+# MAIN ENTRY
+# --------------------------------------------------
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time per module.")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target (fastest kept)")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to print")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if a target imports slower")
+    parser.add_argument("--json", dest="json_path", default=None, help="write the full results here")
+    parser.add_argument("--baseline", default=None, help="earlier --json output (same machine) to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=REGRESSION_RATIO,
+        help="allowed slowdown vs the baseline as a ratio (raise on noisy CI runners)",
+    )
+    args = parser.parse_args()
+
+    results = {target: measure(target, max(1, args.runs)) for target in args.targets}
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failed = False
+    for result in results.values():
+        _print_report(result, args.top)
+
+        if "error" in result or result["eager_heavy_imports"]:
+            failed = True
+        if args.budget_ms is not None and result.get("total_ms", 0.0) > args.budget_ms:
+            print(f"❌ {result['target']} exceeds the {args.budget_ms:g} ms budget")
+            failed = True
+        regression = _regression(result, baseline, args.tolerance)
+        if regression:
+            print(f"📈 Regression in {result['target']}: " + "\n".join(regression))
+            failed = True
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Saved import times to {args.json_path}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+-- Allocate the next per-user CV version and insert the `cvs` row in one
+-- atomic call. Concurrent calls for the same user serialize on an
+-- advisory lock, so version numbers never collide.
+--
+-- Called from app/utils/db.py: supabase.rpc("insert_cv_version", {"p_record": {...}})
+
+create or replace function public.insert_cv_version(p_record jsonb)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_user_id uuid := (p_record ->> 'user_id')::uuid;
+    v_version integer;
+    v_row public.cvs;
+begin
+    perform pg_advisory_xact_lock(hashtextextended('cvs_version:' || v_user_id::text, 0));
+
+    select coalesce(max(version), 0) + 1
+      into v_version
+      from public.cvs
+     where user_id = v_user_id;
+
+    insert into public.cvs (
+        user_id, file_url, file_name, file_size, mime_type, status, version, structured_data
+    )
+    values (
+        v_user_id,
+        p_record ->> 'file_url',
+        p_record ->> 'file_name',
+        (p_record ->> 'file_size')::bigint,
+        coalesce(p_record ->> 'mime_type', 'application/pdf'),
+        coalesce(p_record ->> 'status', 'processed'),
+        v_version,
+        coalesce(p_record -> 'structured_data', '{}'::jsonb)
+    )
+    returning * into v_row;
+
+    return to_jsonb(v_row);
+end;
+$$;
+
+revoke all on function public.insert_cv_version(jsonb) from public, anon, authenticated;
+grant execute on function public.insert_cv_version(jsonb) to service_role;
@@ -0,0 +1,87 @@
+import time
+
+from app.utils import cache as cache_module
+from app.utils.cache import TieredCache, content_hash
+
+
+def test_values_round_trip_as_fresh_copies():
+    cache = TieredCache("t", path="")
+    value = {"skills": ["Python"]}
+    cache.set("k", value)
+
+    hit = cache.get("k")
+    hit["skills"].append("Go")
+
+    assert cache.get("k") == value
+    assert cache.get("missing", "default") == "default"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = TieredCache("t", path="", ttl=10)
+    cache.set("k", "v")
+    cache.set("forever", "v", ttl=None)
+
+    now[0] += 11
+
+    assert cache.get("k") is None
+    assert cache.get_entry("k", allow_expired=True) == ("v", 1000.0)
+    assert cache.get("forever") == "v"
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = TieredCache("t", memory_entries=2, path="")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["memory_size"] == 2
+
+
+def test_disk_tier_serves_entries_evicted_from_memory(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TieredCache("t", memory_entries=1, path=path)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    assert cache.counters["disk_hits"] == 1
+
+    # A second process (new cache object) sees the same file
+    assert TieredCache("t", path=path).get("b") == 2
+    assert TieredCache("other", path=path).get("b") is None
+
+
+def test_disk_eviction_runs_every_evict_every_writes(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(TieredCache, "EVICT_EVERY", 5)
+    path = str(tmp_path / "cache.sqlite")
+    cache = TieredCache("t", memory_entries=0, disk_entries=2, path=path)
+
+    cache.set("expired", 0, ttl=1)
+    now[0] += 2
+    for i in range(3):
+        now[0] += 1
+        cache.set(f"k{i}", i)
+
+    # Four writes: nothing evicted yet, the expired row is still on disk
+    assert cache.get_entry("expired", allow_expired=True) is not None
+    assert cache.get("k0") == 0
+
+    now[0] += 1
+    cache.set("k3", 3)
+
+    # Fifth write: expired rows dropped, then the oldest beyond disk_entries
+    assert cache.get_entry("expired", allow_expired=True) is None
+    assert cache.get("k0") is None and cache.get("k1") is None
+    assert cache.get("k2") == 2 and cache.get("k3") == 3
+
+
+def test_content_hash_separates_parts():
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+    assert content_hash("x", 1) == content_hash("x", 1)
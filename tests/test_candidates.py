@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app.graph.builder import _generate_candidates
+
+
+class FakeOptimizer:
+    """Generation fails for indices in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def candidate_strategies(self, k):
+        return [(0.2 * i, f"emphasis-{i}") for i in range(k)]
+
+    def with_emphasis(self, feedback, emphasis):
+        return emphasis
+
+    async def aoptimize(self, cv_data, critique, job_data, temperature):
+        if int(critique.rsplit("-", 1)[1]) in self.failing:
+            raise RuntimeError(f"generation failed for {critique}")
+        return {"emphasis": critique}
+
+
+class FakeScorer:
+    """Scores by candidate index; indices in `failing` raise."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    async def acalculate_match(self, candidate, job, **scoring):
+        idx = int(candidate["emphasis"].rsplit("-", 1)[1])
+        if idx in self.failing:
+            raise RuntimeError(f"scoring failed for {idx}")
+        return SimpleNamespace(score=10 * idx)
+
+
+def _run_async(scorer, k=3, optimizer=None):
+    return asyncio.run(_generate_candidates(optimizer or FakeOptimizer(), scorer, {}, "", {}, k, {}))
+
+
+def test_async_scoring_failure_drops_only_that_candidate():
+    candidate, result, count = _run_async(FakeScorer(failing={2}))
+
+    assert count == 2
+    assert candidate == {"emphasis": "emphasis-1"}
+    assert result.score == 10
+
+
+def test_generation_failure_drops_only_that_candidate():
+    candidate, result, count = _run_async(FakeScorer(), optimizer=FakeOptimizer(failing={2}))
+
+    assert count == 2
+    assert candidate == {"emphasis": "emphasis-1"}
+
+
+def test_all_generation_failed_raises():
+    with pytest.raises(RuntimeError, match="generation failed"):
+        _run_async(FakeScorer(), optimizer=FakeOptimizer(failing={0, 1, 2}))
+
+
+def test_async_all_scoring_failed_raises():
+    with pytest.raises(RuntimeError, match="scoring failed"):
+        _run_async(FakeScorer(failing={0, 1, 2}))
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from typing import TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from langgraph.graph import END, START, StateGraph
+
+from app.graph import checkpoint
+from app.graph.checkpoint import expire_checkpoints, open_checkpointer, run_config
+
+
+class State(TypedDict):
+    count: int
+
+
+def _graph(saver):
+    graph = StateGraph(State)
+    graph.add_node("step", lambda state: {"count": state["count"] + 1})
+    graph.add_edge(START, "step")
+    graph.add_edge("step", END)
+    return graph.compile(checkpointer=saver)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        pytest.importorskip("langgraph.checkpoint.sqlite")
+        pytest.importorskip("aiosqlite")
+    return request.param, str(tmp_path / "checkpoints.sqlite")
+
+
+async def _values(graph, run_id):
+    return (await graph.aget_state(run_config(run_id))).values
+
+
+def test_only_threads_past_the_ttl_are_deleted(backend):
+    name, dsn = backend
+
+    async def run():
+        async with open_checkpointer(name, dsn, ttl_days=0) as saver:
+            graph = _graph(saver)
+            await graph.ainvoke({"count": 0}, run_config("old"))
+            between = time.time()
+            await asyncio.sleep(0.05)
+            await graph.ainvoke({"count": 0}, run_config("recent"))
+
+            expired = await expire_checkpoints(saver, name, max_age=time.time() - between)
+            return expired, await _values(graph, "old"), await _values(graph, "recent")
+
+    expired, old, recent = asyncio.run(run())
+
+    assert expired == ["old"]
+    assert old == {}
+    assert recent == {"count": 1}
+
+
+def test_nothing_expires_within_the_ttl(backend):
+    name, dsn = backend
+
+    async def run():
+        async with open_checkpointer(name, dsn, ttl_days=0) as saver:
+            graph = _graph(saver)
+            await graph.ainvoke({"count": 0}, run_config("run-1"))
+            return await expire_checkpoints(saver, name, max_age=3600), await _values(graph, "run-1")
+
+    assert asyncio.run(run()) == ([], {"count": 1})
+
+
+def test_open_checkpointer_sweeps_in_the_background(backend, monkeypatch):
+    name, dsn = backend
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_SWEEP_INTERVAL", 0.02)
+
+    async def run():
+        # ~0.1s TTL
+        async with open_checkpointer(name, dsn, ttl_days=0.1 / 86400) as saver:
+            graph = _graph(saver)
+            await graph.ainvoke({"count": 0}, run_config("run-1"))
+            for _ in range(100):
+                if not await _values(graph, "run-1"):
+                    return True
+                await asyncio.sleep(0.02)
+            return False
+
+    assert asyncio.run(run())
@@ -0,0 +1,76 @@
+import pytest
+
+from app.tools.cv_renderer import _link, render_cv_html
+
+
+def _cv(**overrides):
+    cv = {
+        "full_name": "Ada Lovelace",
+        "contact": {"email": "ada@example.com", "linkedin": "linkedin.com/in/ada"},
+        "summary": "Engineer",
+        "skills": ["Python"],
+        "experience": [{"title": "Engineer", "company": "Acme", "duration": "2020 - 2023", "description": "Built"}],
+        "education": [],
+    }
+    cv.update(overrides)
+    return cv
+
+
+def test_renders_sections_in_order():
+    html = render_cv_html(_cv(projects=["Parser"], languages=["English"]))
+    positions = [html.index(f">{title}</h2>") for title in ("Summary", "Skills", "Experience", "Projects", "Languages")]
+    assert positions == sorted(positions)
+    assert "<title>Ada Lovelace - CV</title>" in html
+
+
+def test_escapes_every_text_field():
+    payload = '<script>alert("x")</script>'
+    html = render_cv_html(_cv(
+        full_name=payload,
+        summary=payload,
+        skills=[payload],
+        experience=[{"title": payload, "company": payload, "duration": payload, "description": payload}],
+        education=[{"degree": payload, "institution": payload, "year": payload}],
+        projects=[payload],
+        certifications=[payload],
+        languages=[payload],
+        contact={"email": payload, "phone": payload, "location": payload},
+    ))
+    assert "<script>alert" not in html
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in html
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "javascript:alert(1)",
+        "JavaScript:alert(1)",
+        " javascript:alert(1)",
+        "java\tscript:alert(1)",
+        "data:text/html;base64,PHNjcmlwdD4=",
+        "vbscript:msgbox(1)",
+    ],
+)
+def test_rejects_script_links(url):
+    rendered = _link(url)
+    assert "<a" not in rendered and "href" not in rendered
+
+
+def test_rejected_link_is_still_escaped_in_document():
+    html = render_cv_html(_cv(contact={"github": 'javascript:alert("x")'}))
+    assert "href" not in html
+    assert "javascript:alert(&quot;x&quot;)" in html
+
+
+@pytest.mark.parametrize(
+    "url, href",
+    [
+        ("https://github.com/ada", "https://github.com/ada"),
+        ("linkedin.com/in/ada", "https://linkedin.com/in/ada"),
+        ("localhost:8080/cv", "https://localhost:8080/cv"),
+        ("mailto:ada@example.com", "mailto:ada@example.com"),
+        ('https://x.io/"><script>', "https://x.io/&quot;&gt;&lt;script&gt;"),
+    ],
+)
+def test_allowed_links(url, href):
+    assert f'href="{href}"' in _link(url)
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.utils import db
+from app.utils.db import SQLiteCVStore
+
+
+def _record(user_id: str, n: int) -> dict:
+    return {"user_id": user_id, "file_url": f"{user_id}/{n}.pdf", "file_name": f"{n}.pdf", "file_size": n}
+
+
+def test_concurrent_inserts_get_distinct_consecutive_versions(tmp_path):
+    path = str(tmp_path / "cvs.sqlite")
+    # Two connections on one file, like two workers, each used by many threads
+    stores = [SQLiteCVStore(path), SQLiteCVStore(path)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        rows = list(pool.map(
+            lambda n: stores[n % 2].insert_cv_version(_record("user-1", n)),
+            range(200),
+        ))
+
+    assert sorted(row["version"] for row in rows) == list(range(1, 201))
+
+
+def test_versions_are_per_user(tmp_path):
+    store = SQLiteCVStore(str(tmp_path / "cvs.sqlite"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        rows = list(pool.map(
+            lambda n: store.insert_cv_version(_record(f"user-{n % 2}", n)),
+            range(10),
+        ))
+
+    for user in ("user-0", "user-1"):
+        assert sorted(r["version"] for r in rows if r["user_id"] == user) == [1, 2, 3, 4, 5]
+
+
+def test_insert_returns_the_row(tmp_path):
+    store = SQLiteCVStore(str(tmp_path / "cvs.sqlite"))
+
+    row = store.insert_cv_version({**_record("user-1", 7), "structured_data": {"engine": "weasyprint"}})
+
+    assert row["version"] == 1
+    assert row["file_url"] == "user-1/7.pdf"
+    assert row["mime_type"] == "application/pdf"
+    assert row["structured_data"] == {"engine": "weasyprint"}
+
+
+def test_sqlite_backend_routes_through_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "CV_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr(db, "_sqlite_store", SQLiteCVStore(str(tmp_path / "cvs.sqlite")))
+
+    assert [db.insert_cv_version(_record("user-1", n))["version"] for n in range(3)] == [1, 2, 3]
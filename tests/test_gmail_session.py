@@ -0,0 +1,159 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents import gmail_session
+from app.agents.gmail_session import GmailSession, GmailSessionCache
+
+
+class FakeService:
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        return SimpleNamespace(execute=lambda: {"id": body["raw"]})
+
+
+class FakeSession(GmailSession):
+    """GmailSession without the Google client: tokens are plain attributes."""
+
+    def __init__(self, refresh_token):
+        self.lock = threading.Lock()
+        self.expires_at = time.time() + gmail_session.GMAIL_SESSION_TTL
+        self.creds = SimpleNamespace(token="access", _refresh_token=refresh_token, expiry=None)
+        self.service = FakeService()
+
+    def _token_fresh(self):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fake_session(monkeypatch):
+    monkeypatch.setattr(gmail_session, "GmailSession", FakeSession)
+
+
+def _loader(token="refresh"):
+    calls = []
+
+    def load():
+        calls.append(token)
+        return token
+
+    return load, calls
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_get_reuses_the_session():
+    cache = GmailSessionCache()
+    load, calls = _loader()
+
+    assert cache.get("u1", load) is cache.get("u1", load)
+    assert calls == ["refresh"]
+
+
+def test_expired_session_is_wiped_and_reloaded():
+    cache = GmailSessionCache()
+    load, calls = _loader()
+    first = cache.get("u1", load)
+    first.expires_at = time.time() - 1
+
+    second = cache.get("u1", load)
+
+    assert second is not first
+    assert first.creds._refresh_token is None and first.service is None
+    assert len(calls) == 2
+
+
+def test_background_sweep_wipes_idle_sessions():
+    cache = GmailSessionCache(sweep_interval=0.01)
+    session = cache.get("u1", _loader()[0])
+    session.expires_at = time.time() - 1
+
+    assert _wait_for(lambda: len(cache) == 0)
+    assert session.creds._refresh_token is None
+    # The sweeper stops once nothing is left to watch
+    assert _wait_for(lambda: cache._sweeper is None)
+
+
+def test_oldest_session_is_wiped_beyond_max_sessions():
+    cache = GmailSessionCache(max_sessions=2)
+    oldest = cache.get("u1", _loader()[0])
+    cache.get("u2", _loader()[0])
+    cache.get("u3", _loader()[0])
+
+    assert len(cache) == 2
+    assert oldest.creds._refresh_token is None
+
+
+def test_invalidate_wipes_the_session():
+    cache = GmailSessionCache()
+    session = cache.get("u1", _loader()[0])
+
+    cache.invalidate("u1")
+
+    assert len(cache) == 0
+    assert session.creds.token is None and session.creds._refresh_token is None
+
+
+def test_concurrent_creation_keeps_one_session():
+    cache = GmailSessionCache()
+    barrier = threading.Barrier(4)
+    created, results = [], []
+
+    def load():
+        # Every thread misses the cache before any of them stores a session
+        barrier.wait()
+        return "refresh"
+
+    original = FakeSession.__init__
+
+    def tracking_init(self, token):
+        original(self, token)
+        created.append(self)
+
+    FakeSession.__init__ = tracking_init
+    try:
+        threads = [threading.Thread(target=lambda: results.append(cache.get("u1", load))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        FakeSession.__init__ = original
+
+    kept = results[0]
+    assert all(r is kept for r in results)
+    assert len(created) == 4
+    assert [s for s in created if s.service is not None] == [kept]
+
+
+def test_send_reloads_a_session_wiped_while_waiting():
+    cache = GmailSessionCache()
+    load, calls = _loader()
+    original_get = cache.get
+    handed_out = []
+
+    def get(user_id, loader):
+        session = original_get(user_id, loader)
+        if not handed_out:
+            # The sweep/invalidate wins the race before send() takes the lock
+            cache.invalidate(user_id)
+        handed_out.append(session)
+        return session
+
+    cache.get = get
+
+    assert cache.send("u1", load, "raw-message") == {"id": "raw-message"}
+    assert handed_out[0] is not handed_out[1]
+    assert len(calls) == 2
@@ -0,0 +1,176 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils import http
+from app.utils.http import FetchError, ResponseTooLarge, TokenBucket
+
+CAP = 1000
+
+
+class Body:
+    """Streamed body that records how many chunks were pulled."""
+
+    def __init__(self, chunks, size=100):
+        self.chunks = chunks
+        self.size = size
+        self.sent = 0
+
+    def __iter__(self):
+        for _ in range(self.chunks):
+            self.sent += 1
+            yield b"x" * self.size
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """url path -> httpx.Response factory, served through a MockTransport."""
+    routes = {}
+
+    def handler(request):
+        return routes[request.url.path]()
+
+    transport = httpx.MockTransport(handler)
+    options = http._client_options
+
+    monkeypatch.setattr(http, "_client_options", lambda: {**options(), "transport": transport})
+    monkeypatch.setattr(http, "_client", None)
+    monkeypatch.setattr(http, "_async_client", None)
+    # No rate limiting between test requests
+    monkeypatch.setattr(http, "_buckets", {})
+    monkeypatch.setattr(http, "HTTP_HOST_BURST", 1000)
+    yield routes
+    asyncio.run(http.aclose())
+
+
+def _fetch(mode, url):
+    if mode == "sync":
+        return http.fetch(url, max_bytes=CAP)
+    return asyncio.run(http.afetch(url, max_bytes=CAP))
+
+
+@pytest.fixture(params=["sync", "async"])
+def mode(request):
+    return request.param
+
+
+def test_body_within_the_cap_is_returned(server, mode):
+    server["/ok"] = lambda: httpx.Response(200, content=b"<html>ok</html>")
+
+    result = _fetch(mode, "https://jobs.example/ok")
+
+    assert result.status_code == 200
+    assert result.text == "<html>ok</html>"
+
+
+def test_declared_oversized_body_is_rejected_before_reading(server, mode):
+    body = Body(chunks=20)
+    server["/big"] = lambda: httpx.Response(
+        200, headers={"Content-Length": str(20 * 100)}, content=body if mode == "sync" else body.__aiter__()
+    )
+
+    with pytest.raises(ResponseTooLarge, match="declares"):
+        _fetch(mode, "https://jobs.example/big")
+    assert body.sent == 0
+
+
+def test_oversized_stream_without_length_is_aborted(server, mode):
+    body = Body(chunks=1000)
+    server["/stream"] = lambda: httpx.Response(200, content=body if mode == "sync" else body.__aiter__())
+
+    with pytest.raises(ResponseTooLarge, match="exceeded"):
+        _fetch(mode, "https://jobs.example/stream")
+    # Stopped at the first chunk over the cap, not at the end of the body
+    assert body.sent == CAP // 100 + 1
+
+
+def test_lying_content_length_is_still_capped(server, mode):
+    body = Body(chunks=1000)
+    server["/liar"] = lambda: httpx.Response(
+        200, headers={"Content-Length": "10"}, content=body if mode == "sync" else body.__aiter__()
+    )
+
+    with pytest.raises(ResponseTooLarge, match="exceeded"):
+        _fetch(mode, "https://jobs.example/liar")
+    assert body.sent == CAP // 100 + 1
+
+
+def test_transport_errors_become_fetch_errors(server, mode):
+    def fail():
+        raise httpx.ConnectError("refused")
+
+    server["/down"] = fail
+
+    with pytest.raises(FetchError, match="failed"):
+        _fetch(mode, "https://jobs.example/down")
+    assert http.fetch_stats()["jobs.example"]["errors"] >= 1
+
+
+def test_async_client_is_bound_to_its_event_loop(server):
+    server["/ok"] = lambda: httpx.Response(200, content=b"ok")
+
+    async def run():
+        client = http.aget_client()
+        assert http.aget_client() is client
+        assert (await http.afetch("https://jobs.example/ok")).text == "ok"
+        return client
+
+    # Each asyncio.run has its own loop: the pool from the previous one is not reused
+    first, second = asyncio.run(run()), asyncio.run(run())
+    assert first is not second
+
+
+# --------------------------------------------------
+# TOKEN BUCKET
+# --------------------------------------------------
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(http.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each further request waits for its own token at 2/s
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.reserve()
+
+    clock[0] += 1.0  # two tokens back
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+def test_bucket_refill_is_capped_at_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    bucket.reserve()
+
+    clock[0] += 60.0
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_fetch_waits_for_the_host_bucket(server, clock, monkeypatch):
+    server["/ok"] = lambda: httpx.Response(200, content=b"ok")
+    monkeypatch.setattr(http, "HTTP_HOST_RATE", 4)
+    monkeypatch.setattr(http, "HTTP_HOST_BURST", 1)
+    slept = []
+    monkeypatch.setattr(http.time, "sleep", slept.append)
+
+    http.fetch("https://a.example/ok")
+    http.fetch("https://a.example/ok")
+    http.fetch("https://b.example/ok")  # other hosts have their own bucket
+
+    assert slept == [0.25]
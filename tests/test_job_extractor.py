@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from app.tools.job_extractor import extract_job_text
+
+FILLER = "We build tools for hiring teams, across many countries, with care. " * 4
+
+
+def _page(body: str, head: str = "") -> str:
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+def test_xml_declaration_is_parsed_not_returned_as_markup():
+    page = "<?xml version='1.0' encoding='utf-8'?>" + _page(
+        f"<main><h2>Requirements</h2><p>Python, SQL and Docker experience. {FILLER}</p></main>"
+    )
+
+    text = extract_job_text(page)
+
+    assert "<" not in text
+    assert "## Requirements" in text
+    assert "Python, SQL and Docker" in text
+
+
+def test_xml_declaration_bytes():
+    page = ("<?xml version='1.0' encoding='utf-8'?>" + _page(f"<p>Café team. {FILLER}</p>")).encode()
+
+    assert "Café team." in extract_job_text(page, encoding="utf-8")
+
+
+def test_br_is_a_line_break():
+    page = _page(
+        "<div class='job-description'><h2>Requirements</h2>"
+        f"<p>Python in production<br>Docker<br/>Kubernetes</p><p>{FILLER}</p></div>"
+    )
+
+    lines = extract_job_text(page).splitlines()
+
+    assert "Python in production" in lines
+    assert "Docker" in lines
+    assert "Kubernetes" in lines
+    assert not any("productionDocker" in line for line in lines)
+
+
+def test_mixed_content_keeps_container_text_and_tails():
+    page = _page(
+        "<div class='job-description'>We are hiring a backend engineer."
+        f"<p>{FILLER}</p>Remote friendly."
+        "<ul><li>Own the API, end to end, with the team</li></ul>Apply today."
+        "</div>"
+    )
+
+    lines = extract_job_text(page).splitlines()
+
+    assert lines[0] == "We are hiring a backend engineer."
+    assert "Remote friendly." in lines
+    assert "- Own the API, end to end, with the team" in lines
+    assert lines[-1] == "Apply today."
+    assert lines.index("Remote friendly.") < lines.index("- Own the API, end to end, with the team")
+
+
+def test_json_ld_job_posting_keeps_title():
+    posting = {
+        "@context": "https://schema.org",
+        "@type": "JobPosting",
+        "title": "Senior Data Engineer",
+        "description": f"<p>{FILLER}</p><h3>Requirements</h3><ul><li>Spark</li><li>Airflow</li></ul>",
+    }
+    page = _page(
+        "<nav>Jobs | Companies | Sign in</nav><p>Unrelated page chrome.</p>",
+        head=f'<script type="application/ld+json">{json.dumps(posting)}</script>',
+    )
+
+    lines = extract_job_text(page).splitlines()
+
+    assert lines[0] == "## Senior Data Engineer"
+    assert "## Requirements" in lines
+    assert "- Spark" in lines and "- Airflow" in lines
+    assert "Unrelated page chrome." not in lines
+
+
+def test_json_ld_plain_text_description_keeps_newlines():
+    posting = {"@type": "JobPosting", "title": "Analyst", "description": f"{FILLER}\nRequirements:\nExcel"}
+    page = _page("", head=f'<script type="application/ld+json">{json.dumps(posting)}</script>')
+
+    lines = extract_job_text(page).splitlines()
+
+    assert "## Requirements" in lines
+    assert "Excel" in lines
+
+
+def test_budget_cut_keeps_requirements_section():
+    about = "".join(f"<p>About us paragraph {i}, {FILLER}</p>" for i in range(10))
+    page = _page(
+        f"<article class='job-description'><h2>About the company</h2>{about}"
+        "<h2>Requirements</h2><ul><li>5+ years of Python, in production</li></ul></article>"
+    )
+
+    text = extract_job_text(page, max_chars=600)
+
+    assert len(text) <= 600
+    assert "## Requirements" in text
+    assert "- 5+ years of Python, in production" in text
+    # Page order is preserved: the truncated intro still comes first
+    assert text.index("## About the company") < text.index("## Requirements")
+
+
+def test_empty_page():
+    assert extract_job_text("") == ""
+    assert extract_job_text("   ") == ""
+
+
+def test_unparseable_fallback_strips_markup():
+    from app.tools.job_extractor import _strip_markup
+
+    assert _strip_markup("<div>Python &amp; <b>SQL</b><script>track()</script></div>") == "Python & SQL"
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from app.agents import job_hunter_agent
+from app.agents.job_hunter_agent import SCRAPE_MIN_CHARS, JobHunterAgent
+
+LONG = "x" * SCRAPE_MIN_CHARS
+SHORT = "short posting"
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    import langchain_community.utilities as utilities
+
+    monkeypatch.setattr(job_hunter_agent, "get_llm", lambda **kwargs: None)
+    monkeypatch.setattr(utilities, "DuckDuckGoSearchAPIWrapper", lambda **kwargs: None)
+    return JobHunterAgent()
+
+
+def _async_pages(agent, pages, cancelled):
+    """pages: url -> (delay, text or exception)."""
+
+    async def scrape(url):
+        delay, outcome = pages[url]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    agent._ascrape_url = scrape
+
+
+def _sync_pages(agent, pages):
+    def scrape(url):
+        delay, outcome = pages[url]
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    agent._scrape_url = scrape
+
+
+def test_async_first_substantial_page_wins_and_cancels_the_rest(agent):
+    cancelled = []
+    _async_pages(agent, {
+        "https://a.example/1": (0.01, LONG),
+        "https://b.example/1": (5, LONG + "longer"),
+    }, cancelled)
+
+    async def run():
+        started = time.monotonic()
+        result = await agent.ascrape_first(["https://a.example/1", "https://b.example/1"])
+        await asyncio.sleep(0)  # let the cancellation land
+        return result, time.monotonic() - started
+
+    (url, text), elapsed = asyncio.run(run())
+
+    assert url == "https://a.example/1" and text == LONG
+    assert elapsed < 1
+    assert cancelled == ["https://b.example/1"]
+
+
+def test_async_keeps_the_longest_short_page_and_skips_failures(agent):
+    _async_pages(agent, {
+        "https://a.example/1": (0.01, SHORT),
+        "https://b.example/1": (0.02, RuntimeError("boom")),
+        "https://c.example/1": (0.03, SHORT + " with more detail"),
+    }, [])
+
+    urls = ["https://a.example/1", "https://b.example/1", "https://c.example/1"]
+
+    assert asyncio.run(agent.ascrape_first(urls))[0] == "https://c.example/1"
+
+
+def test_async_deadline_returns_what_finished(agent):
+    cancelled = []
+    _async_pages(agent, {
+        "https://a.example/1": (0.01, SHORT),
+        "https://b.example/1": (5, LONG),
+    }, cancelled)
+
+    async def run():
+        result = await agent.ascrape_first(["https://a.example/1", "https://b.example/1"], deadline=0.2)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == ("https://a.example/1", SHORT)
+    assert cancelled == ["https://b.example/1"]
+
+
+def test_async_all_failures_raise(agent):
+    _async_pages(agent, {"https://a.example/1": (0, RuntimeError("boom"))}, [])
+
+    with pytest.raises(RuntimeError, match="All job URLs failed"):
+        asyncio.run(agent.ascrape_first(["https://a.example/1"]))
+
+
+def test_async_host_limits_work_across_event_loops(agent, monkeypatch):
+    # Same process-wide agent, one loop per asyncio.run (CLI, tests, restarted lifespan)
+    monkeypatch.setattr(job_hunter_agent, "SCRAPE_MIN_CHARS", 10 ** 9)
+    scraped = []
+
+    async def scrape(url):
+        await asyncio.sleep(0.01)
+        scraped.append(url)
+        return SHORT
+
+    agent._ascrape_url = scrape
+    # More URLs than SCRAPE_PER_HOST, so some scrapes wait on the semaphore
+    urls = [f"https://a.example/{i}" for i in range(job_hunter_agent.SCRAPE_PER_HOST + 2)]
+
+    for _ in range(2):
+        scraped.clear()
+        asyncio.run(agent.ascrape_first(urls))
+        assert sorted(scraped) == sorted(urls)
+
+
+def test_async_host_limit_caps_concurrency(agent, monkeypatch):
+    monkeypatch.setattr(job_hunter_agent, "SCRAPE_MIN_CHARS", 10 ** 9)
+    active, peak = [0], [0]
+
+    async def scrape(url):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return SHORT
+
+    agent._ascrape_url = scrape
+    urls = [f"https://a.example/{i}" for i in range(6)]
+    asyncio.run(agent.ascrape_first(urls))
+
+    assert peak[0] == job_hunter_agent.SCRAPE_PER_HOST
+
+
+def test_sync_first_substantial_page_wins(agent):
+    _sync_pages(agent, {
+        "https://a.example/1": (0.01, LONG),
+        "https://b.example/1": (2, LONG + "longer"),
+    })
+
+    started = time.monotonic()
+    assert agent.scrape_first(["https://a.example/1", "https://b.example/1"]) == ("https://a.example/1", LONG)
+    assert time.monotonic() - started < 1
+
+
+def test_sync_keeps_the_longest_short_page(agent):
+    _sync_pages(agent, {
+        "https://a.example/1": (0.01, SHORT),
+        "https://b.example/1": (0.02, RuntimeError("boom")),
+        "https://c.example/1": (0.03, SHORT + " with more detail"),
+    })
+
+    assert agent.scrape_first(
+        ["https://a.example/1", "https://b.example/1", "https://c.example/1"]
+    )[0] == "https://c.example/1"
+
+
+def test_duplicate_urls_are_scraped_once(agent):
+    seen = []
+    lock = threading.Lock()
+
+    def scrape(url):
+        with lock:
+            seen.append(url)
+        return LONG
+
+    agent._scrape_url = scrape
+    agent.scrape_first(["https://a.example/1", "https://A.example/1", None])
+
+    assert len(seen) == 1
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.agents.llm_cache import TieredLLMCache
+from app.utils.cache import TieredCache
+
+
+def _llm(*responses):
+    store = TieredCache("llm-test", path="")
+    llm = FakeListChatModel(responses=list(responses), cache=TieredLLMCache(store))
+    return llm, store
+
+
+def test_repeated_invoke_is_served_from_the_cache():
+    llm, store = _llm("first", "second")
+
+    assert llm.invoke("hello").content == "first"
+    assert llm.invoke("hello").content == "first"
+    assert llm.invoke("other").content == "second"
+    assert store.stats()["hits"] == 1
+
+
+def test_prompt_pipelines_go_through_the_cache():
+    llm, store = _llm("first", "second")
+    chain = ChatPromptTemplate.from_messages([("human", "Summarize {text}")]) | llm
+
+    assert chain.invoke({"text": "a"}).content == "first"
+    assert chain.invoke({"text": "a"}).content == "first"
+    assert store.stats()["hits"] == 1
+
+
+def test_bound_kwargs_get_their_own_entries():
+    llm, store = _llm("plain", "bound")
+
+    assert llm.invoke("hello").content == "plain"
+    assert llm.bind(stop=["\n"]).invoke("hello").content == "bound"
+    assert llm.bind(stop=["\n"]).invoke("hello").content == "bound"
+    assert store.stats()["hits"] == 1
+
+
+def test_async_calls_share_the_cache():
+    llm, store = _llm("first", "second")
+
+    async def run():
+        return [(await llm.ainvoke("hello")).content for _ in range(2)]
+
+    assert asyncio.run(run()) == ["first", "first"]
+    assert llm.invoke("hello").content == "first"
+    assert store.stats()["hits"] == 2
+
+
+def test_clear_drops_cached_responses():
+    llm, store = _llm("first", "second")
+    llm.invoke("hello")
+
+    llm.cache.clear()
+
+    assert llm.invoke("hello").content == "second"
@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from app.tools.match_engine import (
+    _skill_overlap,
+    education_level,
+    experience_years,
+    normalize_skill,
+    score_match,
+)
+
+
+def _cv(skills=(), description="", duration="2019 - 2023", degree="BSc Computer Science"):
+    return {
+        "skills": list(skills),
+        "experience": [{"title": "Engineer", "description": description, "duration": duration}],
+        "education": [{"degree": degree, "institution": "Uni"}],
+    }
+
+
+def test_normalize_skill_applies_synonyms():
+    assert normalize_skill("K8s") == "kubernetes"
+    assert normalize_skill("Golang") == "go"
+    assert normalize_skill(" Python3. ") == "python"
+
+
+def test_synonym_in_prose_matches():
+    matched, missing = _skill_overlap(_cv(["Python"], "Ran services on k8s"), ["Kubernetes"])
+    assert matched == ["Kubernetes"] and missing == []
+
+
+def test_ambiguous_skill_ignores_prose():
+    cv = _cv(["Python"], "Owned the go to market plan and the go-live of R&D tooling in C")
+    matched, missing = _skill_overlap(cv, ["Go", "R", "C"])
+    assert matched == []
+    assert missing == ["Go", "R", "C"]
+
+
+def test_ambiguous_skill_matches_skills_list_and_unambiguous_alias():
+    assert _skill_overlap(_cv(["Golang"]), ["Go"])[0] == ["Go"]
+    assert _skill_overlap(_cv(["Python"], "Wrote golang microservices"), ["Go"])[0] == ["Go"]
+
+
+def test_experience_years():
+    cv = {"experience": [{"duration": "2018 - 2020"}, {"duration": "18 months"}, {"duration": "3+ years"}]}
+    assert experience_years(cv) == 6.5
+
+
+@pytest.mark.parametrize(
+    "duration, years",
+    [
+        ("Jan 2020 - Mar 2023", 3.2),
+        ("January 2020 – March 2023", 3.2),
+        ("Sept. 2019 - Jun 2020", 0.8),
+        ("03/2019 - 05/2022", 3.2),
+        ("3/2019 to 9/2019", 0.5),
+        ("2019 - Jul 2020", 1.5),
+        ("Jan 2020 - Jul 2020, Jan 2021 - Jul 2021", 1.0),
+    ],
+)
+def test_experience_years_with_months(duration, years):
+    assert experience_years({"experience": [{"duration": duration}]}) == years
+
+
+def test_experience_years_until_present():
+    today = date.today()
+    start = today.year - 2
+    cv = {"experience": [{"duration": f"{today.strftime('%b')} {start} - Present"}]}
+    assert experience_years(cv) == 2.0
+
+
+def test_education_level():
+    assert education_level("PhD in Physics") == 4
+    assert education_level("MSc Data Science") == 3
+    assert education_level("Bachelor's degree") == 2
+    assert education_level("Degree in Computer Science") == 2
+    assert education_level(None) == 0
+
+
+def test_associate_degree_is_not_a_bachelor():
+    assert education_level("Associate degree") == 1
+    assert education_level("Associate Degree in Applied Science") == 1
+
+
+def test_score_match():
+    job = {"required_skills": ["Python", "Go"], "required_experience_years": 4, "education": "Bachelor"}
+
+    full = score_match(_cv(["Python", "Go"]), job)
+    assert full.score == 100 and full.missing_keywords == []
+
+    half = score_match(_cv(["Python"], "Pushed the go to market launch"), job)
+    assert half.missing_keywords == ["Go"]
+    assert half.score == 65
+
+
+def test_score_match_without_skills():
+    result = score_match({"skills": []}, {"required_skills": ["Python"]})
+    assert result.score == 0 and result.missing_keywords == ["Python"]
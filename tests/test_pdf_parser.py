@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("pypdf")
+
+from app.tools import pdf_parser
+from app.tools.pdf_parser import extract_pdf
+
+
+def _pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+PAGES = [f"Page {i} experience" for i in range(1, 12)]
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_PARSE_WORKERS", 2)
+    monkeypatch.setattr(pdf_parser, "PDF_PARALLEL_MIN_PAGES", 8)
+    yield
+    pdf_parser.shutdown_parse_pool()
+
+
+def _serial(source, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(pdf_parser, "PDF_PARSE_WORKERS", 0)
+        result = extract_pdf(source)
+    assert not result.parallel
+    return result
+
+
+@pytest.mark.parametrize("as_path", [False, True])
+def test_parallel_extraction_matches_serial(workers, monkeypatch, tmp_path, as_path):
+    data = _pdf(PAGES)
+    source = data
+    if as_path:
+        source = str(tmp_path / "cv.pdf")
+        with open(source, "wb") as f:
+            f.write(data)
+
+    parallel = extract_pdf(source)
+    serial = _serial(source, monkeypatch)
+
+    assert parallel.parallel
+    # 11 pages over the caller + 2 workers: uneven ranges, merged back in page order
+    assert [page.index for page in parallel.pages] == list(range(len(PAGES)))
+    assert parallel.text == serial.text
+    assert [page.text for page in parallel.pages] == [page.text for page in serial.pages]
+    assert "Page 1 experience" in parallel.pages[0].text
+    assert "Page 11 experience" in parallel.pages[-1].text
+
+
+def test_short_documents_stay_in_process(workers):
+    result = extract_pdf(_pdf(PAGES[:7]))
+
+    assert not result.parallel
+    assert len(result.pages) == 7
+    assert pdf_parser._pool is None
+
+
+def test_unreadable_pdf_raises_value_error():
+    with pytest.raises(ValueError, match="Unreadable PDF"):
+        extract_pdf(b"not a pdf")
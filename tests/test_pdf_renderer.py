@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures.process import EXTRA_QUEUED_CALLS
+
+import pytest
+
+from app.tools import pdf_renderer
+from app.tools.pdf_renderer import PDFRenderError
+
+
+# Module-level so the spawned workers can unpickle them
+def fake_render(html_content: str) -> bytes:
+    # "<seconds>:<label>"
+    delay, label = html_content.split(":", 1)
+    time.sleep(float(delay))
+    return label.encode()
+
+
+def no_warmup() -> None:
+    pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "PDF_POOL_SIZE", 2)
+    monkeypatch.setattr(pdf_renderer, "_render", fake_render)
+    monkeypatch.setattr(pdf_renderer, "_init_worker", no_warmup)
+    yield
+    pdf_renderer.shutdown_pdf_pool()
+
+
+def _workers(pool):
+    return list(pool._processes.values())
+
+
+def test_timeout_spares_other_in_flight_renders(pool):
+    pdf_renderer.render_pdf("0:warm")  # spawn the workers before timing anything
+    old_pool = pdf_renderer._pool
+    old_workers = _workers(old_pool)
+
+    results = {}
+    other = threading.Thread(target=lambda: results.update(other=pdf_renderer.render_pdf("1.5:other")))
+    other.start()
+    time.sleep(0.1)
+
+    with pytest.raises(PDFRenderError, match="timed out"):
+        pdf_renderer.render_pdf("30:hung", timeout=0.5)
+
+    # New renders go to a fresh pool straight away
+    assert pdf_renderer.render_pdf("0:fresh") == b"fresh"
+    assert pdf_renderer._pool is not old_pool
+
+    # The other request's render on the retired pool still completes
+    other.join(timeout=10)
+    assert results["other"] == b"other"
+
+    # ...and only then is the hung worker killed
+    deadline = time.monotonic() + 10
+    while any(p.is_alive() for p in old_workers) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not any(p.is_alive() for p in old_workers)
+
+
+def test_async_timeout_spares_other_in_flight_renders(pool):
+    async def run():
+        await pdf_renderer.arender_pdf("0:warm")
+        other = asyncio.create_task(pdf_renderer.arender_pdf("1.5:other"))
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(PDFRenderError, match="timed out"):
+            await pdf_renderer.arender_pdf("30:hung", timeout=0.5)
+
+        return await other, await pdf_renderer.arender_pdf("0:fresh")
+
+    assert asyncio.run(run()) == (b"other", b"fresh")
+
+
+def test_queued_render_timeout_keeps_the_pool(pool):
+    pdf_renderer.render_pdf("0:warm")
+    current = pdf_renderer._pool
+
+    # Workers busy and the executor's call queue full (items there already count
+    # as running), so the next render times out while pending and is just cancelled
+    filled = 2 * pdf_renderer.PDF_POOL_SIZE + EXTRA_QUEUED_CALLS
+    busy = [threading.Thread(target=pdf_renderer.render_pdf, args=("0.5:busy",)) for _ in range(filled)]
+    for t in busy:
+        t.start()
+    time.sleep(0.2)
+
+    with pytest.raises(PDFRenderError, match="timed out"):
+        pdf_renderer.render_pdf("0:queued", timeout=0.2)
+    for t in busy:
+        t.join()
+
+    assert pdf_renderer._pool is current
+    assert all(p.is_alive() for p in _workers(current))
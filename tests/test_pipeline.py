@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app import main
+from app.agents.critique_agent import CritiqueAgent
+from app.agents.cv_agent import CVAgent
+from app.agents.cv_optimizer_agent import CVOptimizerAgent
+from app.agents.email_agent import EmailAgent
+from app.agents.job_analyzer_agent import JobAnalyzerAgent
+from app.agents.match_scorer_agent import MatchScorerAgent
+from app.graph import builder
+from app.schemas.cv_schema import CVStructured
+from app.schemas.job_schema import JobStructured
+
+JOB_TEXT = "Requirements: Python and Go. " * 20
+
+
+class FakeCV:
+    async def aparse_cv(self, path, cv_id=None):
+        return CVStructured(full_name="Ada", contact=None, summary="Engineer", skills=["Python"])
+
+
+class FakeAnalyzer:
+    async def aanalyze_job_text(self, text):
+        return JobStructured(title="ML Engineer", summary="Builds models", required_skills=["Python", "Go"],
+                             contact_email="jobs@example.com")
+
+
+class FakeScorer:
+    async def acalculate_match(self, cv, job, **scoring):
+        optimized = "Go" in cv.skills
+        return SimpleNamespace(score=90 if optimized else 50, missing_keywords=[] if optimized else ["Go"])
+
+
+class FakeCritique:
+    async def agenerate_feedback(self, cv_data, job_data, missing_keywords):
+        return [f"Add {k}" for k in missing_keywords]
+
+
+class FakeOptimizer:
+    def candidate_strategies(self, k):
+        return [(0.2, None)] * k
+
+    def with_emphasis(self, feedback, emphasis):
+        return feedback
+
+    async def aoptimize(self, cv_data, critique, job_data, temperature):
+        return cv_data.model_copy(update={"skills": cv_data.skills + ["Go"]})
+
+
+class FakeEmail:
+    def __init__(self):
+        self.sent = []
+
+    async def adraft_email(self, cv, job, is_backup=False):
+        return SimpleNamespace(body=f"Hello {job.company or 'team'}")
+
+    async def asend_gmail(self, **kwargs):
+        self.sent.append(kwargs)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    email = FakeEmail()
+    agents = {
+        CVAgent: FakeCV(),
+        JobAnalyzerAgent: FakeAnalyzer(),
+        MatchScorerAgent: FakeScorer(),
+        CritiqueAgent: FakeCritique(),
+        CVOptimizerAgent: FakeOptimizer(),
+        EmailAgent: email,
+    }
+    logs = []
+
+    async def upload(html_content, user_id, job_title):
+        assert "<h1" in html_content
+        return f"{user_id}/cv.pdf"
+
+    async def log(entry):
+        logs.append(entry)
+
+    monkeypatch.setattr(builder, "get_agent", agents.__getitem__)
+    monkeypatch.setattr(builder, "agenerate_pdf_from_html", upload)
+    monkeypatch.setattr(builder.db, "ainsert_email_log", log)
+
+    builder.configure_checkpointer(None)
+    yield SimpleNamespace(email=email, logs=logs)
+    builder.configure_checkpointer(None)
+
+
+def _state():
+    return {
+        "cv_file_path": "cv.pdf",
+        "job_input": JOB_TEXT,
+        "user_email": "ada@example.com",
+        "user_id": "user-1",
+        "job_title": "ML Engineer",
+    }
+
+
+def test_cli_runs_the_async_pipeline_end_to_end(pipeline):
+    result = asyncio.run(main.run_pipeline(_state()))
+
+    assert result["job_input_type"] == "text"
+    assert result["match_score"] == 90
+    assert result["missing_keywords"] == []
+    assert result["generated_pdf_path"] == "user-1/cv.pdf"
+    assert result["email_status"] == "sent"
+    assert pipeline.email.sent[0]["recipient_email"] == "jobs@example.com"
+    assert [entry["status"] for entry in pipeline.logs] == ["sent"]
+
+
+def test_pipeline_runs_on_separate_event_loops(pipeline):
+    # The compiled graph is shared; each asyncio.run gets a fresh loop
+    for _ in range(2):
+        assert asyncio.run(main.run_pipeline(_state()))["email_status"] == "sent"
@@ -0,0 +1,165 @@
+import asyncio
+import json
+from functools import partial
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+import httpx
+
+from app.graph import runs
+from app.graph.runs import RunConflictError, RunManager, WebhookNotAllowedError, validate_webhook_url
+
+HOSTS = ("hooks.example.com", ".partner.example")
+
+
+class FakeGraph:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = []
+
+    async def ainvoke(self, state, config=None):
+        self.calls.append((state, config))
+        await self.release.wait()
+        return {"match_score": 88, "email_status": "sent"}
+
+
+@pytest.fixture
+def webhooks(monkeypatch):
+    received = []
+
+    def handler(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(runs, "RUN_WEBHOOK_HOSTS", HOSTS)
+    monkeypatch.setattr(
+        runs.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    )
+    return received
+
+
+async def _wait_until(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://hooks.example.com/runs",
+        "https://a.partner.example/cb",
+        "HTTPS://Hooks.Example.com:8443/x",
+    ],
+)
+def test_allowed_webhooks(url):
+    assert validate_webhook_url(url, hosts=HOSTS) == url
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://hooks.example.com/runs",
+        "https://169.254.169.254/latest/meta-data",
+        "https://localhost/admin",
+        "https://hooks.example.com.evil.io/",
+        "https://evilpartner.example/",
+        "https://user:pw@hooks.example.com/",
+        "file:///etc/passwd",
+        "https://hooks.example.com:99999/",
+    ],
+)
+def test_rejected_webhooks(url):
+    with pytest.raises(WebhookNotAllowedError):
+        validate_webhook_url(url, hosts=HOSTS)
+
+
+def test_webhooks_rejected_when_no_hosts_configured():
+    with pytest.raises(WebhookNotAllowedError):
+        validate_webhook_url("https://hooks.example.com/", hosts=())
+    assert validate_webhook_url(None, hosts=()) is None
+
+
+def test_submit_poll_and_webhook(monkeypatch, webhooks):
+    graph = FakeGraph()
+    monkeypatch.setattr(runs, "get_graph", lambda: graph)
+
+    async def scenario():
+        manager = RunManager(serialize=lambda result: {"match_score": result["match_score"]}, workers=1)
+        await manager.start()
+        try:
+            record = manager.submit({"job_input": "ML Engineer"}, webhook_url="https://hooks.example.com/runs")
+            assert manager.get(record.run_id).status in ("queued", "running")
+
+            await _wait_until(lambda: manager.get(record.run_id).status == "running")
+            graph.release.set()
+            await _wait_until(lambda: webhooks)
+
+            return manager.get(record.run_id).to_dict()
+        finally:
+            await manager.stop()
+
+    status = asyncio.run(scenario())
+
+    assert status["status"] == "succeeded"
+    assert status["result"] == {"match_score": 88}
+    assert webhooks == [status]
+    # The graph ran on the run's own checkpoint thread
+    assert graph.calls[0][1]["configurable"]["thread_id"] == status["run_id"]
+
+
+def test_submit_rejects_disallowed_webhook(monkeypatch, webhooks):
+    async def scenario():
+        manager = RunManager(serialize=dict, workers=1)
+        await manager.start()
+        try:
+            with pytest.raises(WebhookNotAllowedError):
+                manager.submit({}, webhook_url="http://127.0.0.1:8000/internal")
+        finally:
+            await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_resume_is_rejected_while_active(monkeypatch):
+    release = None
+    resumed = []
+
+    async def fake_resume(graph, run_id, from_node=None):
+        resumed.append(run_id)
+        await release.wait()
+        return {}
+
+    monkeypatch.setattr(runs, "resume_run", fake_resume)
+    monkeypatch.setattr(runs, "get_graph", lambda: None)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        manager = RunManager(serialize=dict, workers=2)
+        await manager.start()
+        try:
+            manager.submit_resume("run-1", from_node="email")
+            # Still queued
+            with pytest.raises(RunConflictError, match="queued"):
+                manager.submit_resume("run-1")
+
+            await _wait_until(lambda: manager.get("run-1").status == "running")
+            with pytest.raises(RunConflictError, match="running"):
+                manager.submit_resume("run-1")
+
+            release.set()
+            await _wait_until(lambda: manager.get("run-1").status == "succeeded")
+
+            # Finished: a new resume is accepted again
+            assert manager.submit_resume("run-1").status == "queued"
+            await _wait_until(lambda: manager.get("run-1").status == "succeeded")
+        finally:
+            await manager.stop()
+
+    asyncio.run(scenario())
+    assert resumed == ["run-1", "run-1"]
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from dataclasses import asdict
+
+import httpx
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from app.agents import job_hunter_agent
+from app.agents.job_hunter_agent import JobHunterAgent
+from app.tools import scrape_cache
+from app.utils.cache import TieredCache
+from app.utils.http import FetchResult
+
+URL = "https://jobs.example/postings/42"
+TTL = scrape_cache.SCRAPE_CACHE_TTL
+STALE = scrape_cache.SCRAPE_STALE_TTL
+
+
+class FakeServer:
+    """Stands in for app.utils.http: queued responses, recorded request headers."""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+
+    def reply(self, status=200, body="", **headers):
+        self.responses.append((status, body, headers))
+
+    def fetch(self, url, headers=None, **kwargs):
+        self.requests.append(headers or {})
+        status, body, extra = self.responses.pop(0)
+        return FetchResult(
+            url=url,
+            status_code=status,
+            headers=httpx.Headers({k.replace("_", "-"): v for k, v in extra.items()}),
+            content=body.encode(),
+            encoding="utf-8",
+            elapsed_ms=1.0,
+            http_version="HTTP/1.1",
+        )
+
+    async def afetch(self, url, headers=None, **kwargs):
+        return self.fetch(url, headers=headers, **kwargs)
+
+    def conditional(self, index):
+        headers = self.requests[index]
+        return {k: v for k, v in headers.items() if k.startswith("If-")}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(scrape_cache, "_cache", TieredCache("scrape-test", path=""))
+    monkeypatch.setattr(job_hunter_agent.http, "fetch", server.fetch)
+    monkeypatch.setattr(job_hunter_agent.http, "afetch", server.afetch)
+    return server
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    import langchain_community.utilities as utilities
+
+    monkeypatch.setattr(job_hunter_agent, "get_llm", lambda **kwargs: None)
+    monkeypatch.setattr(utilities, "DuckDuckGoSearchAPIWrapper", lambda **kwargs: None)
+    agent = JobHunterAgent()
+    agent._extract_text = lambda content, encoding=None: content.decode(encoding or "utf-8")
+    return agent
+
+
+def _age(url, seconds):
+    """Move the cached entry's fetch time `seconds` into the past."""
+    entry = scrape_cache.get_entry(url)
+    entry.fetched_at -= seconds
+    scrape_cache._cache.set(scrape_cache.normalize_url(url), asdict(entry))
+
+
+def _cached(server, etag='"v1"', text="posting v1"):
+    server.reply(200, text, ETag=etag, Last_Modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+
+def _wait_revalidated(agent, timeout=2.0):
+    deadline = time.time() + timeout
+    while agent._revalidating and time.time() < deadline:
+        time.sleep(0.01)
+    assert not agent._revalidating
+
+
+# --------------------------------------------------
+# CACHE ENTRIES
+# --------------------------------------------------
+def test_normalize_url_ignores_tracking_and_cosmetic_differences():
+    assert scrape_cache.normalize_url(
+        "HTTPS://Jobs.Example/postings/42/?utm_source=x&b=2&a=1#apply"
+    ) == "https://jobs.example/postings/42?a=1&b=2"
+
+
+def test_entries_from_another_extractor_version_are_ignored(server, monkeypatch):
+    scrape_cache.store(URL, "old extraction", httpx.Headers({"ETag": '"v1"'}))
+    assert scrape_cache.get_entry(URL).text == "old extraction"
+
+    monkeypatch.setattr(scrape_cache, "EXTRACTOR_VERSION", "next")
+
+    assert scrape_cache.get_entry(URL) is None
+
+
+def test_entry_freshness_windows(server):
+    entry = scrape_cache.store(URL, "text", httpx.Headers())
+    assert entry.fresh and entry.servable_stale
+
+    entry.fetched_at -= TTL + 1
+    assert not entry.fresh and entry.servable_stale
+
+    entry.fetched_at -= STALE
+    assert not entry.fresh and not entry.servable_stale
+
+
+# --------------------------------------------------
+# SYNC SCRAPING
+# --------------------------------------------------
+def test_fresh_entry_is_served_without_a_request(server, agent):
+    _cached(server)
+
+    assert agent._scrape_url(URL) == "posting v1"
+    assert agent._scrape_url(URL + "?utm_campaign=mail") == "posting v1"
+    assert len(server.requests) == 1
+
+
+def test_stale_entry_is_served_while_revalidating_in_the_background(server, agent):
+    _cached(server)
+    agent._scrape_url(URL)
+    _age(URL, TTL + 1)
+    server.reply(304, ETag='"v2"')
+
+    # Served from cache straight away; the 304 lands in the background
+    assert agent._scrape_url(URL) == "posting v1"
+    _wait_revalidated(agent)
+
+    assert server.conditional(1) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    entry = scrape_cache.get_entry(URL)
+    assert entry.fresh and entry.etag == '"v2"' and entry.text == "posting v1"
+
+    # Fresh again: no further requests
+    assert agent._scrape_url(URL) == "posting v1"
+    assert len(server.requests) == 2
+
+
+def test_background_revalidation_stores_a_changed_posting(server, agent):
+    _cached(server)
+    agent._scrape_url(URL)
+    _age(URL, TTL + 1)
+    _cached(server, etag='"v2"', text="posting v2")
+
+    assert agent._scrape_url(URL) == "posting v1"
+    _wait_revalidated(agent)
+
+    assert agent._scrape_url(URL) == "posting v2"
+
+
+def test_only_one_background_revalidation_per_url(server, agent):
+    _cached(server)
+    agent._scrape_url(URL)
+    _age(URL, TTL + 1)
+
+    assert agent._claim_revalidation(URL)  # one already in flight
+    assert agent._scrape_url(URL) == "posting v1"
+    assert len(server.requests) == 1
+    agent._release_revalidation(URL)
+
+
+def test_expired_entry_is_revalidated_before_serving(server, agent):
+    _cached(server)
+    agent._scrape_url(URL)
+    _age(URL, TTL + STALE + 1)
+    server.reply(304)
+
+    # Too old to serve blind, but its validators still save the download
+    assert agent._scrape_url(URL) == "posting v1"
+    assert server.conditional(1)["If-None-Match"] == '"v1"'
+    assert scrape_cache.get_entry(URL).fresh
+
+
+def test_version_mismatch_refetches_without_validators(server, agent, monkeypatch):
+    _cached(server)
+    agent._scrape_url(URL)
+    monkeypatch.setattr(scrape_cache, "EXTRACTOR_VERSION", "next")
+    _cached(server, text="re-extracted")
+
+    assert agent._scrape_url(URL) == "re-extracted"
+    assert server.conditional(1) == {}
+    assert scrape_cache.get_entry(URL).extractor == "next"
+
+
+# --------------------------------------------------
+# ASYNC SCRAPING
+# --------------------------------------------------
+def test_async_stale_entry_is_revalidated_in_a_background_task(server, agent):
+    _cached(server)
+    server.reply(304, ETag='"v2"')
+
+    async def run():
+        await agent._ascrape_url(URL)
+        _age(URL, TTL + 1)
+
+        served = await agent._ascrape_url(URL)
+        assert agent._background_tasks
+        await asyncio.gather(*agent._background_tasks)
+        return served
+
+    assert asyncio.run(run()) == "posting v1"
+    assert server.conditional(1)["If-None-Match"] == '"v1"'
+    assert scrape_cache.get_entry(URL).etag == '"v2"'
+    assert not agent._revalidating
+
+
+def test_async_expired_and_version_mismatch(server, agent, monkeypatch):
+    _cached(server)
+    server.reply(304)
+
+    async def run():
+        await agent._ascrape_url(URL)
+        _age(URL, TTL + STALE + 1)
+        expired = await agent._ascrape_url(URL)
+
+        monkeypatch.setattr(scrape_cache, "EXTRACTOR_VERSION", "next")
+        _cached(server, text="re-extracted")
+        return expired, await agent._ascrape_url(URL)
+
+    assert asyncio.run(run()) == ("posting v1", "re-extracted")
+    assert server.conditional(1)["If-None-Match"] == '"v1"'
+    assert server.conditional(2) == {}
@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("langgraph")
+
+from app.server import _to_response
+
+
+@pytest.mark.parametrize(
+    "status, sent",
+    [("sent", True), ("failed", False), ("skipped", False), (None, False)],
+)
+def test_email_sent_follows_email_status(status, sent):
+    result = {"match_score": 80, "email_draft": "Dear hiring team, ...", "email_status": status}
+
+    response = _to_response(result, run_id="run-1")
+
+    assert response.email_sent is sent
+    assert response.email_status == status
+    assert response.email_draft == "Dear hiring team, ..."
@@ -0,0 +1,17 @@
+from app.state import merge_branch
+
+
+def test_merge_branch_keeps_newest_non_empty_value():
+    assert merge_branch("old", "new") == "new"
+    assert merge_branch(None, {"skills": ["python"]}) == {"skills": ["python"]}
+
+
+def test_merge_branch_ignores_empty_updates():
+    cv = {"skills": ["python"]}
+    for empty in (None, "", {}, []):
+        assert merge_branch(cv, empty) is cv
+
+
+def test_merge_branch_keeps_falsy_scalars():
+    assert merge_branch(5, 0) == 0
+    assert merge_branch(True, False) is False